@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""
+Measures the bot's cold start, without connecting to Discord:
+1) importing the bot (in a fresh interpreter each run)
+2) the first DB touch, on an empty DB (creates the schema) and on an up-to-date DB (skips it)
+3) the cache warm-up done in `on_ready`
+
+Usage: ./benchmark_startup.py [--runs N]
+Uses a temporary SQLite DB, unless `LOL_WATCHBOT_DB_CONNECTION_STRING` is set.
+"""
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+_IMPORT_SNIPPET = """
+import time
+started_at = time.perf_counter()
+from bot import watchbot
+print(time.perf_counter() - started_at)
+"""
+
+_DB_SNIPPET = """
+import time
+started_at = time.perf_counter()
+from bot.database_interface.session.session_handler import session_creator
+session_creator.session_creator
+initialized_at = time.perf_counter()
+from bot.database_interface.utils import cache_utils, felony_utils, lookup_utils
+cache_utils.accounts_cache.warm()
+felony_utils.felony_index.warm()
+cache_utils.guild_settings_cache.warm()
+lookup_utils.warm_lookup_caches()
+print(initialized_at - started_at, time.perf_counter() - initialized_at)
+"""
+
+
+def _run_snippet(snippet: str, env: dict) -> list:
+    output = subprocess.run(
+        [sys.executable, "-c", snippet],
+        env=env,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return [float(value) for value in output.split()]
+
+
+def _summarize(name: str, samples: list) -> None:
+    print(
+        f"{name:<28} median {statistics.median(samples) * 1000:8.1f}ms"
+        f"   min {min(samples) * 1000:8.1f}ms   max {max(samples) * 1000:8.1f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10, help="runs per measurement")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        use_temporary_db = "LOL_WATCHBOT_DB_CONNECTION_STRING" not in env
+        db_path = os.path.join(tmp_dir, "benchmark.db")
+
+        _summarize(
+            "import bot.watchbot",
+            [_run_snippet(_IMPORT_SNIPPET, env)[0] for _ in range(args.runs)],
+        )
+
+        cold_inits, warm_inits, warm_ups = [], [], []
+        for _ in range(args.runs):
+            if use_temporary_db:
+                # fresh (empty) DB for the cold run
+                if os.path.exists(db_path):
+                    os.remove(db_path)
+                env["LOL_WATCHBOT_DB_CONNECTION_STRING"] = f"sqlite:///{db_path}"
+                cold_inits.append(_run_snippet(_DB_SNIPPET, env)[0])
+            init, warm_up = _run_snippet(_DB_SNIPPET, env)
+            warm_inits.append(init)
+            warm_ups.append(warm_up)
+
+        if cold_inits:
+            _summarize("DB init (empty DB)", cold_inits)
+        _summarize("DB init (schema up-to-date)", warm_inits)
+        _summarize("cache warm-up", warm_ups)
+
+
+if __name__ == "__main__":
+    main()
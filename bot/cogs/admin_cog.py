@@ -0,0 +1,94 @@
+from bot.watchbot import WatchBot
+from bot.common_utils import decorators, embed_builder
+from bot.common_utils.exceptions import BadArgumentError
+
+import io
+import discord
+from discord.ext import commands
+
+# functions listed in a profile's summary
+_DEF_PROFILE_TOP_N = 10
+
+
+class AdminCog(commands.Cog, name="Admin"):
+    """
+    Operational insights into the running bot. Only usable by bot admins.
+    """
+
+    def __init__(self, bot: WatchBot):
+        self.bot = bot
+
+    @commands.command(name="queuestats", aliases=["qstats"])
+    @decorators.is_bot_admin()
+    async def queue_stats(self, ctx: commands.Context) -> None:
+        """
+        Shows the depth of the outbound alert queue and its delivery latencies.
+
+        Args:
+            ctx (commands.Context): Discord context
+        """
+        embed = embed_builder.make_admin_stats_embed(
+            title="📬 Alert queue", stats=self.bot.alert_queue.get_stats()
+        )
+        await ctx.send(embed=embed)
+
+    @commands.command(name="lagstats", aliases=["lag"])
+    @decorators.is_bot_admin()
+    async def lag_stats(self, ctx: commands.Context) -> None:
+        """
+        Shows the event loop's lag percentiles and the call sites that blocked it the longest.
+
+        Args:
+            ctx (commands.Context): Discord context
+        """
+        watchdog = self.bot.loop_watchdog
+        embed = embed_builder.make_admin_stats_embed(
+            title="🐢 Event loop lag", stats=watchdog.get_stats()
+        )
+        call_sites = [
+            f"`{blocked:.1f}s` {call_site}" for call_site, blocked in watchdog.get_top_call_sites()
+        ]
+        embed.add_field(
+            name="Top blocking call sites",
+            value="\n".join(call_sites)[:1024] or "Never blocked so far!",
+            inline=False,
+        )
+        await ctx.send(embed=embed)
+
+    @commands.command(name="profile")
+    @decorators.is_bot_admin()
+    async def profile(self, ctx: commands.Context, target: str = "sweep") -> None:
+        """
+        Runs the next surveillance sweep under a sampling profiler.
+        Replies with the hottest functions and attaches all samples as collapsed stacks (for flamegraphs).
+
+        Args:
+            ctx (commands.Context): Discord context
+            target (str, optional): What to profile; only "sweep" so far. Defaults to "sweep".
+
+        Raises:
+            BadArgumentError: When the target is unknown
+        """
+        if target.lower() != "sweep":
+            raise BadArgumentError("Only the `sweep` can be profiled!")
+        await ctx.send("Profiling the next sweep, this may take a while...")
+        profiler = await self.bot.get_cog("Surveillance").profile_next_sweep()
+
+        embed = embed_builder.make_admin_stats_embed(
+            title="🔥 Sweep profile",
+            stats={"duration": f"{profiler.duration:.1f}s", "samples": profiler.n_samples},
+        )
+        top_functions = [
+            f"`{own}/{total}` {name}"
+            for name, own, total in profiler.get_top_functions(n=_DEF_PROFILE_TOP_N)
+        ]
+        embed.add_field(
+            name="Top functions (self/total samples)",
+            value="\n".join(top_functions)[:1024] or "No samples taken!",
+            inline=False,
+        )
+        collapsed = discord.File(
+            io.BytesIO(profiler.get_collapsed_stacks().encode("utf-8")),
+            filename="sweep.collapsed.txt",
+        )
+        await ctx.send(embed=embed, file=collapsed)
@@ -1,12 +1,81 @@
-from typing import Union
+from typing import Optional, Tuple, Union
 from datetime import datetime
+import discord
+from sqlalchemy.orm import Session
 from discord.ext import commands
 from bot.watchbot import WatchBot
 from bot.common_utils.exceptions import BadArgumentError
 from bot.database_interface.tables.felonies import Felony
-from bot.database_interface.utils import query_utils
+from bot.database_interface.tables.felony_exemptions import FelonyExemption
+from bot.database_interface.utils import query_utils, felony_utils
 from bot.database_interface.session.session_handler import session_scope
-from bot.common_utils import embed_builder, league_utils
+from bot.common_utils import decorators, embed_builder, league_utils
+from bot.lol_data import champion_catalog
+
+
+def _parse_felony_options(options: Tuple[str, ...]) -> Tuple[int, Optional[str], Optional[str]]:
+    """
+    Parses the optional points and conditions of a felony, in any order,
+    e.g. `3 "map:Howling Abyss" spells:flash+ghost` or just `spells:flash+ghost`.
+
+    Raises:
+        BadArgumentError: When an option is neither points, `map:` nor `spells:`
+
+    Returns:
+        Tuple[int, Optional[str], Optional[str]]: points (defaults to 1), map and (normalized) spells;
+            each condition None, if not given.
+    """
+    points, map_name, spells = 1, None, None
+    for option in options:
+        key, _, value = option.partition(":")
+        if not value and option.lstrip("-").isdigit():
+            points = int(option)
+        elif key.lower() == "map" and value.strip():
+            map_name = value.strip()
+        elif key.lower() == "spells" and value.strip():
+            spells = felony_utils.normalize_spells(value.split("+"))
+        else:
+            raise BadArgumentError(
+                f'Unknown option `{option}`! Use points, `map:"Howling Abyss"` or `spells:flash+ghost`.'
+            )
+    return points, map_name, spells
+
+
+def _describe_felony(felony: Felony) -> str:
+    conditions = "".join(
+        (
+            f" on {felony.map}" if felony.map else "",
+            f" with {felony.spells}" if felony.spells else "",
+        )
+    )
+    return f"`{felony.id}` {felony.champion}{conditions} [{felony.points}pts]"
+
+
+def _get_active_felony(session: Session, id_or_name: Union[int, str]) -> Felony:
+    """
+    Resolves an active felony by its ID, or by its champion if that has a single active felony.
+
+    Raises:
+        BadArgumentError: When no active felony matches, or the champion has several
+
+    Returns:
+        Felony: The active felony (bound to `session`)
+    """
+    if isinstance(id_or_name, int):
+        felonies = session.query(Felony).filter_by(id=id_or_name, is_active=True).all()
+    else:
+        # if a champ name was parsed > resolve it like it was stored
+        champion = league_utils._convert_champ_name(name=id_or_name)
+        felonies = session.query(Felony).filter_by(champion=champion, is_active=True).all()
+    if not felonies:
+        raise BadArgumentError(f"No active felony exists for {id_or_name}!")
+    if len(felonies) > 1:
+        # the champion has several rules (e.g. per map) > which one is meant?
+        candidates = "\n".join(_describe_felony(felony) for felony in felonies)
+        raise BadArgumentError(
+            f"{id_or_name} has several active felonies, please use the ID of one:\n{candidates}"
+        )
+    return felonies[0]
 
 
 class FelonyCog(commands.Cog, name="Felony"):
@@ -14,45 +83,61 @@ class FelonyCog(commands.Cog, name="Felony"):
         self.bot = bot
 
     @commands.command(name="addfelony", aliases=["addf"])
-    async def add_felony(self, ctx: commands.Context, champ_name: str, points: int = 1) -> None:
+    async def add_felony(self, ctx: commands.Context, champ_name: str, *options: str) -> None:
+        """
+        Adds a felony for a champion, optionally only on a map and/or with summoner spells.
+
+        Args:
+            ctx (commands.Context): Discord context
+            champ_name (str): The champion
+            options (str): in any order: points per summon (defaults to 1),
+                `map:<map>` and/or `spells:<spell>+<spell>`
+
+        Raises:
+            BadArgumentError: When the champion or an option is invalid
+        """
+        points, map_name, spells = _parse_felony_options(options)
         if not league_utils.is_valid_champ_name(name=champ_name):
-            # if champ_name not provided or no alphabet chars contained, it's invalid
-            raise BadArgumentError("Please provide a valid champion name!")
+            # not a champion (or alias) of the catalog > it would never match
+            suggestions = champion_catalog.suggest_champions(name=champ_name)
+            hint = f" Did you mean: {', '.join(suggestions)}?" if suggestions else ""
+            raise BadArgumentError(f"Please provide a valid champion name!{hint}")
         # cases where this matters: e.g. "Rek'Sai", "Xin Zhao"
         parsed_name = league_utils._convert_champ_name(name=champ_name)
-        # check if an ACTIVE entry for this champion already exists
+        # check if an ACTIVE entry for this champion (with the same conditions) already exists
         if query_utils._check_if_something_exists(
-            model=Felony, options={"champion": parsed_name, "is_active": True}
+            model=Felony,
+            options={"champion": parsed_name, "is_active": True, "map": map_name, "spells": spells},
         ):
             await ctx.send(f"Champion {champ_name} already is an active felony!")
         else:
             # no active entry exists yet > commit it to DB
             with session_scope() as session:
                 # we LOWER CASE everything
-                felony = Felony(champion=parsed_name, points=points)
+                felony = Felony(champion=parsed_name, points=points, map=map_name, spells=spells)
                 session.add(felony)
+            felony_utils.felony_index.refresh(champion=parsed_name)
+            self.bot.invalidation_bus.publish("felonies", key=parsed_name)
             await ctx.send(
-                f"Successfully added `{parsed_name.title()}` to the database! (points: {points})"
+                f"Successfully added `{champion_catalog.get_display_name(parsed_name)}` to the database! (points: {points})"
             )
 
     @commands.command(name="inactivatefelony", aliases=["remfel", "remf", "disfel"])
     async def inactivate_felony(self, ctx: commands.Context, id_or_name: Union[int, str]) -> None:
-        which_key = "id" if isinstance(id_or_name, int) else "champion"
-        query_options = {which_key: id_or_name, "is_active": True}
-        if isinstance(id_or_name, str):
-            # if a champ name was parsed > lower case it
-            query_options[which_key] = id_or_name.lower()
-        felony = query_utils.get_latest_instance_of_something(
-            model=Felony, time_field=Felony.date_added, options=query_options
-        )
-        if felony is None:
-            await ctx.send(f"No active felony exists for {id_or_name}!")
-        else:
-            with session_scope() as session:
-                felony_object = session.query(Felony).filter_by(**felony).first()
-                felony_object.is_active = False
-                felony_object.date_closed = datetime.utcnow()
-            await ctx.send(f"Successfully altered entry for {id_or_name}!")
+        """
+        Inactivates a felony, by its ID or by its champion (if that has a single active felony).
+
+        Raises:
+            BadArgumentError: When no active felony matches, or the champion has several
+        """
+        with session_scope() as session:
+            felony = _get_active_felony(session=session, id_or_name=id_or_name)
+            felony.is_active = False
+            felony.date_closed = datetime.utcnow()
+            champion = felony.champion
+        felony_utils.felony_index.refresh(champion=champion)
+        self.bot.invalidation_bus.publish("felonies", key=champion)
+        await ctx.send(f"Successfully altered entry for {id_or_name}!")
 
     @commands.command(name="listfelonies", aliases=["listf", "allf"])
     async def list_felonies(self, ctx: commands.Context, kind: str = "all") -> None:
@@ -64,18 +149,82 @@ class FelonyCog(commands.Cog, name="Felony"):
 
     @commands.command(name="updatefelony", aliases=["updatef"])
     async def update_felony_points(
-        self, ctx: commands.Context, champ_name: str, new_points: int
+        self, ctx: commands.Context, id_or_name: Union[int, str], new_points: int
     ) -> None:
-        champ_name = league_utils._convert_champ_name(name=champ_name)
-        query_options = {"champion": champ_name, "is_active": True}
+        """
+        Updates the points of a felony, by its ID or by its champion (if that has a single active felony).
+
+        Raises:
+            BadArgumentError: When no active felony matches, or the champion has several
+        """
         with session_scope() as session:
-            felony = session.query(Felony).filter_by(**query_options).first()
-            if felony is None:
-                await ctx.send(f"No active felony posted for {champ_name}")
-                return
+            felony = _get_active_felony(session=session, id_or_name=id_or_name)
             old_points = felony.points
             felony.points = new_points
+            champion = felony.champion
+        felony_utils.felony_index.refresh(champion=champion)
+        self.bot.invalidation_bus.publish("felonies", key=champion)
 
         await ctx.send(
-            f"Successfully updated points for {champ_name} from {old_points} to {new_points}!"
+            f"Successfully updated points for {id_or_name} from {old_points} to {new_points}!"
         )
+
+    @commands.command(name="exemptfelony", aliases=["exemptf"])
+    @decorators.is_bot_admin()
+    async def exempt_from_felony(
+        self, ctx: commands.Context, felony_id: int, member: discord.Member
+    ) -> None:
+        """
+        Lets a member play a felony's champion without being summoned.
+        Only usable by bot admins.
+
+        Args:
+            ctx (commands.Context): Discord context
+            felony_id (int): ID of the (active) felony
+            member (discord.Member): The member to exempt
+        """
+        with session_scope() as session:
+            felony = session.query(Felony).filter_by(id=felony_id, is_active=True).first()
+            if felony is None:
+                await ctx.send(f"No active felony exists for {felony_id}!")
+                return
+            champion = felony.champion
+            if (
+                session.query(FelonyExemption)
+                .filter_by(felony_id=felony_id, discord_id=member.id)
+                .first()
+                is None
+            ):
+                session.add(FelonyExemption(felony_id=felony_id, discord_id=member.id))
+        felony_utils.felony_index.refresh(champion=champion)
+        self.bot.invalidation_bus.publish("felonies", key=champion)
+        await ctx.send(f"{member.display_name} is exempt from felony {felony_id} now!")
+
+    @commands.command(name="unexemptfelony", aliases=["unexemptf"])
+    @decorators.is_bot_admin()
+    async def unexempt_from_felony(
+        self, ctx: commands.Context, felony_id: int, member: discord.Member
+    ) -> None:
+        """
+        Revokes a member's exemption from a felony.
+        Only usable by bot admins.
+
+        Args:
+            ctx (commands.Context): Discord context
+            felony_id (int): ID of the felony
+            member (discord.Member): The exempt member
+        """
+        with session_scope() as session:
+            exemption = (
+                session.query(FelonyExemption)
+                .filter_by(felony_id=felony_id, discord_id=member.id)
+                .first()
+            )
+            if exemption is None:
+                await ctx.send(f"{member.display_name} isn't exempt from felony {felony_id}!")
+                return
+            champion = exemption.felony.champion
+            session.delete(exemption)
+        felony_utils.felony_index.refresh(champion=champion)
+        self.bot.invalidation_bus.publish("felonies", key=champion)
+        await ctx.send(f"{member.display_name} isn't exempt from felony {felony_id} anymore!")
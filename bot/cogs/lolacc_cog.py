@@ -1,10 +1,10 @@
 from bot.watchbot import WatchBot
 from bot.lol_data import opgg_handler
-from bot.common_utils.exceptions import OpGGParsingError, BadArgumentError
+from bot.common_utils.exceptions import OpGGParsingError, OpGGUnavailableError, BadArgumentError
 from bot.common_utils import embed_builder
 from bot.database_interface.session.session_handler import session_scope
-from bot.database_interface.tables.users import User
-from bot.database_interface.utils import query_utils
+from bot.database_interface.tables.users import User, Server
+from bot.database_interface.utils import query_utils, cache_utils
 from bot.common_utils import decorators
 
 try:
@@ -13,11 +13,16 @@ try:
 except ImportError:
     _BOT_ADMINS = []
 
+import csv
 import asyncio
 from typing import Optional, List, Tuple
 import discord
+import sqlalchemy.exc
 from discord.ext import commands
 
+# maximum amount of accounts validated against the live-game provider at the same time
+_DEF_MAX_CONCURRENT_VALIDATIONS = 8
+
 
 class LolAccCog(commands.Cog, name="LolAcc"):
     def __init__(self, bot: WatchBot):
@@ -72,7 +77,10 @@ class LolAccCog(commands.Cog, name="LolAcc"):
         opgg_url = opgg_handler.construct_url_by_name_and_server(
             league_name=league_name.lower(), server_name=server_name.lower()
         )
-        if not opgg_handler._does_url_belong_to_valid_account(url=opgg_url):
+        # blocking HTTP (incl. retry backoffs) > in an executor thread, off the event loop
+        if not await asyncio.get_event_loop().run_in_executor(
+            None, self.bot.live_game_provider.does_account_exist, league_name.lower(), server_name
+        ):
             await ctx.message.delete()
             raise OpGGParsingError(f"No valid account exists for {league_name} ({server_name})!")
         # make an embed for the confirmation message
@@ -131,6 +139,9 @@ class LolAccCog(commands.Cog, name="LolAcc"):
             with session_scope() as session:
                 session.add(new_user)
                 # TODO(jonas): load current match here (outside of task loop)?
+            cache_utils.accounts_cache.invalidate()
+            self.bot.invalidation_bus.publish("users", key=discord_member.id)
+            await self.bot.track_member(discord_id=discord_member.id)
         finally:
             # finally, delete both the invoking message and the confirmation message
             await confirmation_msg.delete()
@@ -147,10 +158,10 @@ class LolAccCog(commands.Cog, name="LolAcc"):
             ctx (commands.Context): Discord context
         """
         # get all instances of the User model
-        all_accounts = query_utils.get_all_instances_of_something(User)
+        all_accounts = cache_utils.accounts_cache.get()
         # ..and construct a nice looking embed
         # listing all accounts, grouped by discord user
-        list_embed = embed_builder.make_list_accounts_embed(accounts=all_accounts, ctx=ctx)
+        list_embed = await embed_builder.make_list_accounts_embed(accounts=all_accounts, ctx=ctx)
         list_embed.set_footer(text=self.bot.user.name, icon_url=self.bot.user.avatar_url)
         await ctx.send(embed=list_embed)
 
@@ -176,4 +187,182 @@ class LolAccCog(commands.Cog, name="LolAcc"):
 
         # get string-version of deleted model instance, and notify user
         msg = query_utils.delete_first_instance_by_filter(model=User, options=query_options)
-        await ctx.send(f"Successfully deleted user:\n{msg}")
\ No newline at end of file
+        cache_utils.accounts_cache.invalidate()
+        self.bot.invalidation_bus.publish("users")
+        await ctx.send(f"Successfully deleted user:\n{msg}")
+
+    def _save_imported_users(
+        self, new_users: List[Tuple[int, User]], failed: List[Tuple[int, str]]
+    ) -> List[Tuple[int, int]]:
+        """
+        Saves imported accounts in a single transaction; if that fails, account by account,
+        so one failing row doesn't lose the others. Rows that could not be saved are added to `failed`.
+
+        Args:
+            new_users (List[Tuple[int, User]]): (line number, new account) of all valid rows
+            failed (List[Tuple[int, str]]): (line number, reason) of failed rows
+
+        Returns:
+            List[Tuple[int, int]]: (line number, discord ID) of all saved accounts
+        """
+        # read before saving: committed instances are expired
+        rows = [
+            (line_number, user.discord_id, f"{user.league_name} ({user.server_name})", user)
+            for line_number, user in new_users
+        ]
+        if not rows:
+            return []
+        try:
+            with session_scope() as session:
+                session.add_all([user for *_, user in rows])
+            return [(line_number, discord_id) for line_number, discord_id, *_ in rows]
+        except sqlalchemy.exc.SQLAlchemyError as e:
+            # the rolled back accounts are transient again > retried one transaction each
+            self.bot.logger.warning("Could not save imported accounts at once, retrying: %s", e)
+
+        added = []
+        for line_number, discord_id, name, user in rows:
+            try:
+                with session_scope() as session:
+                    session.add(user)
+            except sqlalchemy.exc.SQLAlchemyError as e:
+                failed.append((line_number, f"{name}: could not save: {e.__class__.__name__}"))
+            else:
+                added.append((line_number, discord_id))
+        return added
+
+    @commands.command(aliases=["import", "bulk_add"])
+    @decorators.is_bot_admin()
+    async def import_users(self, ctx: commands.Context):
+        """
+        Adds all LoL accounts of an attached CSV / text file, one account per line:
+        `discord member, server, league name` (e.g. `@Faker, kr, Hide on bush`).
+        Only usable by bot admins.
+
+        Args:
+            ctx (commands.Context): Discord context
+
+        Raises:
+            BadArgumentError: When no file is attached
+        """
+        if not ctx.message.attachments:
+            raise BadArgumentError(
+                "Please attach a file with one `member, server, league name` per line!"
+            )
+        content = (await ctx.message.attachments[0].read()).decode("utf-8-sig")
+
+        # rows we can't even try to add, as (line number, reason)
+        invalid: List[Tuple[int, str]] = []
+        # rows that could not be added for now (op.gg, discord or the DB failing), as (line number, reason)
+        failed: List[Tuple[int, str]] = []
+        duplicates: List[Tuple[int, str]] = []
+        candidates: List[Tuple[int, discord.Member, str, str]] = []
+        # (league name, server) of all existing accounts and the ones in this file
+        known_accounts = {
+            (account["league_name"].lower(), account["server_name"])
+            for account in cache_utils.accounts_cache.get()
+        }
+        member_converter = commands.MemberConverter()
+
+        for line_number, row in enumerate(csv.reader(content.splitlines()), start=1):
+            row = [cell.strip() for cell in row]
+            if not any(row):
+                continue
+            if len(row) < 3:
+                invalid.append((line_number, "expected `member, server, league name`"))
+                continue
+            # league names may contain commas
+            member_arg, server_name, league_name = row[0], row[1].lower(), ",".join(row[2:])
+            try:
+                member = await member_converter.convert(ctx, member_arg)
+            except commands.BadArgument:
+                invalid.append((line_number, f"unknown member `{member_arg}`"))
+                continue
+            except discord.HTTPException as e:
+                failed.append((line_number, f"could not look up member `{member_arg}`: {e}"))
+                continue
+            if server_name not in Server.list():
+                invalid.append((line_number, f"unknown server `{server_name}`"))
+                continue
+            account_key = (league_name.lower(), server_name)
+            if account_key in known_accounts:
+                duplicates.append((line_number, f"{league_name} ({server_name})"))
+                continue
+            known_accounts.add(account_key)
+            candidates.append((line_number, member, server_name, league_name))
+
+        # validate all remaining accounts concurrently, in executor threads (blocking HTTP)
+        semaphore = asyncio.Semaphore(_DEF_MAX_CONCURRENT_VALIDATIONS)
+        loop = asyncio.get_event_loop()
+
+        async def validate(server_name: str, league_name: str) -> Tuple[Optional[str], bool]:
+            """
+            Returns:
+                Tuple[Optional[str], bool]: The row's error (None, if the account exists), and whether it failed
+            """
+            async with semaphore:
+                try:
+                    exists = await loop.run_in_executor(
+                        None,
+                        self.bot.live_game_provider.does_account_exist,
+                        league_name,
+                        server_name,
+                    )
+                except OpGGUnavailableError as e:
+                    return f"could not validate: {e}", True
+                except OpGGParsingError as e:
+                    return f"could not validate: {e}", False
+                except Exception as e:
+                    # one broken row must not abort the whole import
+                    self.bot.logger.exception(
+                        "Could not validate %s (%s)", league_name, server_name
+                    )
+                    return f"could not validate: {e.__class__.__name__}", True
+            return (None if exists else "account does not exist"), False
+
+        results = await asyncio.gather(
+            *[validate(server_name, league_name) for _, _, server_name, league_name in candidates]
+        )
+
+        # (line number, new account)
+        new_users: List[Tuple[int, User]] = []
+        for (line_number, member, server_name, league_name), (error, is_failure) in zip(
+            candidates, results
+        ):
+            if error is not None:
+                rows = failed if is_failure else invalid
+                rows.append((line_number, f"{league_name} ({server_name}): {error}"))
+                continue
+            new_users.append(
+                (
+                    line_number,
+                    User(
+                        discord_id=member.id,
+                        league_name=league_name,
+                        server_name=server_name,
+                        opgg_link=opgg_handler.construct_url_by_name_and_server(
+                            league_name=league_name.lower(), server_name=server_name
+                        ),
+                    ),
+                )
+            )
+
+        added = self._save_imported_users(new_users=new_users, failed=failed)
+        if added:
+            new_discord_ids = {discord_id for _, discord_id in added}
+            cache_utils.accounts_cache.invalidate()
+            for discord_id in new_discord_ids:
+                self.bot.invalidation_bus.publish("users", key=discord_id)
+                await self.bot.track_member(discord_id=discord_id)
+        self.bot.logger.info(
+            f"{ctx.message.author} imported {len(added)} accounts "
+            f"({len(invalid)} invalid, {len(failed)} failed, {len(duplicates)} duplicates)"
+        )
+
+        embed = embed_builder.make_bulk_import_summary_embed(
+            n_added=len(added),
+            invalid=sorted(invalid),
+            failed=sorted(failed),
+            duplicates=duplicates,
+        )
+        await ctx.send(embed=embed)
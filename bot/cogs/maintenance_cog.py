@@ -0,0 +1,115 @@
+from bot.watchbot import WatchBot
+from bot.database_interface.utils import retention_utils
+
+from datetime import datetime, timedelta
+import os
+import asyncio
+import sqlalchemy.exc
+from discord.ext import commands, tasks
+
+# matches older than this are rolled up into daily aggregates
+_DEF_MATCH_RETENTION_DAYS = int(os.environ.get("LOL_WATCHBOT_MATCH_RETENTION_DAYS", 90))
+_DEF_HOURS_BETWEEN_COMPACTIONS = 6.0
+# matches compacted per transaction, and transactions per compaction run
+_DEF_COMPACTION_CHUNK_SIZE = 500
+_DEF_MAX_CHUNKS_PER_RUN = 200
+# pause between two chunks, so other DB users (e.g. the sweep) get their turn
+_DEF_SECONDS_BETWEEN_CHUNKS = 0.5
+# journaled matches and summons are written to the DB (and fsynced) this often
+_DEF_SECONDS_BETWEEN_JOURNAL_FLUSHES = 5.0
+# changes published by other bot processes are received this often
+_DEF_SECONDS_BETWEEN_INVALIDATION_POLLS = 2.0
+
+
+class MaintenanceCog(commands.Cog, name="Maintenance"):
+    def __init__(self, bot: WatchBot):
+        self.bot = bot
+        self.compact_matches.start()
+        self.flush_journal.start()
+        self.poll_invalidations.start()
+
+    def cog_unload(self):
+        self.compact_matches.cancel()
+        self.flush_journal.cancel()
+        self.poll_invalidations.cancel()
+
+    @tasks.loop(seconds=_DEF_SECONDS_BETWEEN_INVALIDATION_POLLS)
+    async def poll_invalidations(self) -> None:
+        """
+        Drops the cache entries other bot processes changed, in an executor thread.
+        """
+        try:
+            received = await asyncio.get_event_loop().run_in_executor(
+                None, self.bot.invalidation_bus.poll
+            )
+        except sqlalchemy.exc.SQLAlchemyError as e:
+            # the events stay in the DB > received by the next run
+            self.bot.logger.warning("TASK:\tCould not poll cache invalidations: %s", e)
+            return
+        if received:
+            self.bot.logger.debug("TASK:\tReceived %d cache invalidations", received)
+
+    @poll_invalidations.before_loop
+    async def before_poll_invalidations(self):
+        await self.bot.wait_until_ready()
+
+    @tasks.loop(seconds=_DEF_SECONDS_BETWEEN_JOURNAL_FLUSHES)
+    async def flush_journal(self) -> None:
+        """
+        Writes the journaled matches and summons to the DB, in an executor thread.
+        The first run also replays whatever a previous run didn't write anymore.
+        """
+        try:
+            written = await asyncio.get_event_loop().run_in_executor(
+                None, self.bot.write_journal.flush
+            )
+        except sqlalchemy.exc.SQLAlchemyError as e:
+            # the journal keeps everything > retried by the next run
+            self.bot.logger.warning("TASK:\tCould not flush the journal: %s", e)
+            return
+        if written:
+            self.bot.logger.info("TASK:\tWrote %d journaled rows", written)
+
+    @flush_journal.after_loop
+    async def after_flush_journal(self):
+        # on shutdown, at least make sure everything journaled is on disk
+        self.bot.write_journal.sync()
+
+    @tasks.loop(hours=_DEF_HOURS_BETWEEN_COMPACTIONS)
+    async def compact_matches(self) -> None:
+        """
+        Rolls old matches up into `MatchRollup` rows in bounded chunks.
+        Each chunk runs in an executor thread, so the event loop is never blocked.
+        """
+        older_than = datetime.utcnow() - timedelta(days=_DEF_MATCH_RETENTION_DAYS)
+        loop = asyncio.get_event_loop()
+        total_compacted = 0
+        for _ in range(_DEF_MAX_CHUNKS_PER_RUN):
+            try:
+                compacted = await loop.run_in_executor(
+                    None,
+                    retention_utils.compact_matches_chunk,
+                    older_than,
+                    _DEF_COMPACTION_CHUNK_SIZE,
+                )
+            except sqlalchemy.exc.SQLAlchemyError as e:
+                # every chunk is its own transaction > the rest is compacted by the next run
+                self.bot.logger.warning(
+                    "TASK:\tCould not compact matches (%d compacted this run): %s",
+                    total_compacted,
+                    e,
+                )
+                return
+            total_compacted += compacted
+            if compacted < _DEF_COMPACTION_CHUNK_SIZE:
+                # nothing left to compact
+                break
+            await asyncio.sleep(_DEF_SECONDS_BETWEEN_CHUNKS)
+        if total_compacted:
+            self.bot.logger.info(
+                f"TASK:\tCompacted {total_compacted} matches older than {older_than.date()}"
+            )
+
+    @compact_matches.before_loop
+    async def before_compact_matches(self):
+        await self.bot.wait_until_ready()
@@ -1,19 +1,53 @@
-from typing import Union
+from typing import Union, Optional
 from datetime import datetime
+import discord
 from discord.ext import commands
 from bot.watchbot import WatchBot
 from bot.common_utils.exceptions import BadArgumentError
 from bot.database_interface.tables.felonies import Felony
-from bot.database_interface.utils import query_utils
+from bot.database_interface.utils import query_utils, leaderboard_utils
 from bot.database_interface.session.session_handler import session_scope
-from bot.common_utils import embed_builder, league_utils
+from bot.common_utils import embed_builder, league_utils, stats_utils
 
 
 class SummonsCog(commands.Cog, name="Summons"):
     def __init__(self, bot: WatchBot):
         self.bot = bot
 
-    @commands.command(name="leaderboard", aliases=["lb, lboard"])
-    async def leaderboard(self, ctx: commands.Context) -> None:
-        embed = embed_builder.make_leaderboard_embed(ctx=ctx)
-        await ctx.send(embed=embed)
\ No newline at end of file
+    @commands.command(name="leaderboard", aliases=["lb", "lboard"])
+    async def leaderboard(self, ctx: commands.Context, window: str = "all") -> None:
+        """
+        Shows the discord users with the most summon points.
+
+        Args:
+            ctx (commands.Context): Discord context
+            window (str, optional): One of "week", "month", "season" or "all". Defaults to "all".
+
+        Raises:
+            BadArgumentError: When the window is unknown
+        """
+        window = window.lower()
+        if window not in leaderboard_utils.LEADERBOARD_WINDOWS:
+            raise BadArgumentError(
+                f"Leaderboard needs to be one of `{list(leaderboard_utils.LEADERBOARD_WINDOWS)}`!"
+            )
+        leaderboard = leaderboard_utils.get_leaderboard(
+            since=leaderboard_utils.get_window_start(window=window)
+        )
+        embed = await embed_builder.make_leaderboard_embed(
+            ctx=ctx, leaderboard=leaderboard, window=window
+        )
+        await ctx.send(embed=embed)
+
+    @commands.command(name="stats")
+    async def stats(self, ctx: commands.Context, member: Optional[discord.Member] = None) -> None:
+        """
+        Shows champion frequency, abuse rate, games per weekday and abuse streaks of a discord user.
+
+        Args:
+            ctx (commands.Context): Discord context
+            member (Optional[discord.Member], optional): The user to show stats for. Defaults to the invoking user.
+        """
+        member = member or ctx.message.author
+        stats = stats_utils.get_user_stats(discord_id=member.id)
+        await ctx.send(embed=embed_builder.make_stats_embed(member=member, stats=stats))
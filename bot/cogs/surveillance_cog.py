@@ -1,54 +1,274 @@
-from bot.watchbot import WatchBot
+from bot.watchbot import WatchBot, is_presence_mode
 from bot.database_interface.session.session_handler import session_scope
-from bot.database_interface.utils import query_utils
-from bot.database_interface.tables.users import User
-from bot.database_interface.tables.felonies import Felony
+from bot.database_interface.utils import query_utils, cache_utils, felony_utils
 from bot.database_interface.tables.matches import Match
 from bot.database_interface.tables.summons import Summon
-from bot.common_utils.exceptions import MemberNotFoundError
-from bot.common_utils import embed_builder
-from bot.common_utils import league_utils, discord_utils
+from bot.database_interface.tables.guild_settings import GuildSettings
+from bot.common_utils.exceptions import (
+    BadArgumentError,
+    ChannelNotFoundError,
+    MemberNotFoundError,
+    OpGGUnavailableError,
+)
+from bot.common_utils import decorators
+from bot.common_utils import discord_utils, league_utils
+from bot.common_utils.sampling_profiler import SamplingProfiler
+from bot.common_utils.memory_tracker import memory_tracker
 from bot.lol_data import opgg_handler
 
-from typing import Dict, Any
+from typing import Dict, Any, List, Set, Tuple
+from collections import Counter
 from datetime import datetime
+import os
+import time
+import asyncio
 import discord
+import sqlalchemy.exc
 from discord.ext import commands, tasks
 
 _DEF_MINUTES_BETWEEN_MATCH_CALLS = 30.0
+# in presence mode, the timed sweep only is a safety net (e.g. for members without a visible presence)
+_DEF_MINUTES_BETWEEN_SAFETY_SWEEPS = float(
+    os.environ.get("LOL_WATCHBOT_PRESENCE_SWEEP_MINUTES", 180.0)
+)
+# op.gg only shows a live game a little while after it started
+_DEF_PRESENCE_CHECK_DELAY_SECONDS = 60.0
+_DEF_SECONDS_BETWEEN_PRESENCE_CHECKS = 5.0
+_LEAGUE_ACTIVITY_NAME = "League of Legends"
+
+
+def _is_in_league_game(member: discord.Member) -> bool:
+    """
+    Checks whether a member's presence shows a game of League
+    (the client reports e.g. "In Lobby" or "In Game" as the activity's state, if at all).
+    """
+    for activity in member.activities:
+        if activity.name == _LEAGUE_ACTIVITY_NAME:
+            state = getattr(activity, "state", None)
+            return state is None or "game" in state.lower()
+    return False
 
 
 class SurveillanceCog(commands.Cog, name="Surveillance"):
     def __init__(self, bot: WatchBot):
         self.bot = bot
+        # futures waiting for a profile of the next sweep
+        self._profile_requests: List[asyncio.Future] = []
+        # discord ID > when (`time.monotonic()`) to check their accounts; one pending check per member
+        self._pending_presence_checks: Dict[int, float] = {}
+        if is_presence_mode:
+            self.fetch_matches.change_interval(minutes=_DEF_MINUTES_BETWEEN_SAFETY_SWEEPS)
+            self.check_present_members.start()
         self.fetch_matches.start()
 
     def cog_unload(self):
         self.fetch_matches.cancel()
+        self.check_present_members.cancel()
 
     @tasks.loop(minutes=_DEF_MINUTES_BETWEEN_MATCH_CALLS)
     async def fetch_matches(self) -> None:
-        accounts = query_utils.get_all_instances_of_something(model=User)
-        # fetch possible live game data for every account we have saved
-        for account in accounts:
-            game_data = opgg_handler.get_live_game_data_played(
-                league_name=account["league_name"], server_name=account["server_name"]
+        if not self._profile_requests:
+            await self._sweep()
+            return
+        # someone asked for a profile of this sweep
+        requests, self._profile_requests = self._profile_requests, []
+        profiler = SamplingProfiler()
+        profiler.start()
+        try:
+            await self._sweep()
+        finally:
+            profiler.stop()
+            for request in requests:
+                if not request.done():
+                    request.set_result(profiler)
+
+    def profile_next_sweep(self) -> "asyncio.Future[SamplingProfiler]":
+        """
+        Requests the next sweep to run under the sampling profiler.
+
+        Returns:
+            asyncio.Future[SamplingProfiler]: Resolves to the (stopped) profiler once the sweep finished
+        """
+        request = asyncio.get_event_loop().create_future()
+        self._profile_requests.append(request)
+        return request
+
+    async def _sweep(self) -> None:
+        sweep_start = time.perf_counter()
+        # (a no-op, unless memory tracking is enabled)
+        with memory_tracker.track(name="sweep"):
+            accounts = cache_utils.accounts_cache.get()
+            # outcome > amount of accounts; logged as one summary line instead of a line per account
+            outcomes = Counter()
+            worth_checking = await self._get_accounts_worth_checking(accounts)
+            # fetch possible live game data for every account we have saved
+            for account in accounts:
+                name = league_utils.normalize_summoner_name(account["league_name"])
+                if (account["server_name"], name) not in worth_checking:
+                    outcomes["inactive"] += 1
+                    continue
+                outcomes[await self._check_account(account=account)] += 1
+
+        self.bot.logger.info(
+            "TASK:\tSwept %d accounts in %.1fs (%s)",
+            len(accounts),
+            time.perf_counter() - sweep_start,
+            ", ".join(f"{count} {outcome}" for outcome, count in sorted(outcomes.items())),
+        )
+
+    async def _check_account(self, account: Dict[str, Any]) -> str:
+        """
+        Looks up the live game of an account, and saves (and polices) it as a new match.
+
+        Returns:
+            str: The outcome for the sweep's summary
+        """
+        try:
+            # blocking HTTP (incl. retry backoffs) > in an executor thread, off the event loop
+            game_data = await asyncio.get_event_loop().run_in_executor(
+                None,
+                self.bot.live_game_provider.get_live_game_data,
+                account["league_name"],
+                account["server_name"],
             )
-            if game_data is not None:
-                # live game was found > we have data to process!
-                match = Match(
-                    user_id=account["id"],
-                    map=game_data["game_mode"],
-                    champion=league_utils._convert_champ_name(name=game_data["champion"]),
-                    summoner_one=game_data["spells"][0],
-                    summoner_two=game_data["spells"][1],
+            if game_data is None:
+                return "not ingame"
+            # live game was found > we have data to process!
+            match = Match.from_game_data(user_id=account["id"], game_data=game_data)
+            return await self._maybe_save_match(match=match, account=account)
+        except OpGGUnavailableError as e:
+            # provider (region) is failing > skip cheaply, the circuit breaker recovers on its own
+            self.bot.logger.debug("TASK:\tSkipped %s: %s", account["league_name"], e)
+            return "skipped"
+        except Exception:
+            # one broken account (or page) must not end the sweep, or the task loop
+            self.bot.logger.exception("TASK:\tFailed to check %s", account["league_name"])
+            return "failed"
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member) -> None:
+        """
+        Queues a check of a tracked member's accounts once their presence shows a game of League.
+        Members are in several guilds > the same update arrives once per guild, but is queued once.
+        """
+        if not is_presence_mode or not _is_in_league_game(after) or _is_in_league_game(before):
+            return
+        if after.id not in self.bot.get_tracked_discord_ids():
+            return
+        self._pending_presence_checks.setdefault(
+            after.id, time.monotonic() + _DEF_PRESENCE_CHECK_DELAY_SECONDS
+        )
+
+    @tasks.loop(seconds=_DEF_SECONDS_BETWEEN_PRESENCE_CHECKS)
+    async def check_present_members(self) -> None:
+        """
+        Checks the accounts of the members whose queued (presence-triggered) check is due.
+        """
+        now = time.monotonic()
+        due = {
+            discord_id
+            for discord_id, due_at in self._pending_presence_checks.items()
+            if due_at <= now
+        }
+        if not due:
+            return
+        for discord_id in due:
+            del self._pending_presence_checks[discord_id]
+
+        outcomes = Counter()
+        for account in cache_utils.accounts_cache.get():
+            if account["discord_id"] in due:
+                outcomes[await self._check_account(account=account)] += 1
+        self.bot.logger.info(
+            "TASK:\tChecked %d members on presence (%s)",
+            len(due),
+            ", ".join(f"{count} {outcome}" for outcome, count in sorted(outcomes.items())),
+        )
+
+    @check_present_members.before_loop
+    async def before_check_present_members(self):
+        await self.bot.wait_until_ready()
+
+    async def _get_accounts_worth_checking(
+        self, accounts: List[Dict[str, Any]]
+    ) -> Set[Tuple[str, str]]:
+        """
+        Pre-filters the accounts in batches per server (e.g. skipping long inactive ones),
+        before their live games are looked up one request each.
+
+        Returns:
+            Set[Tuple[str, str]]: (server name, normalized league name) of the accounts to look up
+        """
+        names_by_server: Dict[str, List[str]] = {}
+        for account in accounts:
+            names_by_server.setdefault(account["server_name"], []).append(account["league_name"])
+
+        worth_checking = set()
+        for server_name, league_names in names_by_server.items():
+            try:
+                names = await asyncio.get_event_loop().run_in_executor(
+                    None,
+                    self.bot.live_game_provider.get_accounts_worth_checking,
+                    league_names,
+                    server_name,
                 )
-                await self._maybe_save_match(match=match, account=account)
-            else:
-                self.bot.logger.info(f"No active match found for {account['league_name']}.")
+            except Exception as e:
+                # the pre-filter is an optimization only > check all accounts of the server
+                self.bot.logger.warning(
+                    "TASK:\tCouldn't pre-filter %s accounts: %s", server_name, e
+                )
+                names = set(map(league_utils.normalize_summoner_name, league_names))
+            worth_checking.update((server_name, name) for name in names)
+        return worth_checking
 
-    async def _maybe_save_match(self, match: Match, account: Dict[str, Any]) -> None:
+    async def _maybe_save_match(self, match: Match, account: Dict[str, Any]) -> str:
+        """
+        Returns:
+            str: The outcome for the sweep's summary ("duplicate", "new match" or "abuse")
+        """
         # before inserting: let's check whether our new match might be a duplicate
+        try:
+            if match.game_id is not None:
+                is_duplicate = self._is_known_game(user_id=account["id"], game_id=match.game_id)
+            else:
+                is_duplicate = self._is_probably_last_match(match=match, account=account)
+        except sqlalchemy.exc.SQLAlchemyError as e:
+            # DB is unavailable > rather risk a duplicate than lose the detection
+            self.bot.logger.warning("TASK:\tCould not check for a duplicate match: %s", e)
+            is_duplicate = False
+
+        if is_duplicate:
+            self.bot.logger.debug("TASK:\tDid not add duplicate match %s", match)
+            return "duplicate"
+
+        match.is_abuse = await self.maybe_police(match=match, account=account)
+        # written to the DB in the background (see `MaintenanceCog.flush_journal`)
+        self.bot.write_journal.append(instance=match, discord_id=account["discord_id"])
+        self.bot.logger.debug("TASK:\tAdded new match %s", match)
+        if match.game_id is not None:
+            cache_utils.recent_games_cache.add((account["id"], match.game_id))
+        return "abuse" if match.is_abuse else "new match"
+
+    def _is_known_game(self, user_id: int, game_id: int) -> bool:
+        """
+        Checks whether a game was already saved as a match of that user.
+        Only queries the DB if the game is not among the recently seen ones (e.g. after a restart).
+        """
+        key = (user_id, game_id)
+        if key in cache_utils.recent_games_cache:
+            return True
+        if query_utils._check_if_something_exists(
+            model=Match, options={"user_id": user_id, "game_id": game_id}
+        ):
+            cache_utils.recent_games_cache.add(key)
+            return True
+        return False
+
+    def _is_probably_last_match(self, match: Match, account: Dict[str, Any]) -> bool:
+        """
+        Fallback for providers not exposing a game ID:
+        compares the match with the user's last one.
+        """
         with session_scope() as session:
             last_match = (
                 session.query(Match)
@@ -60,36 +280,67 @@ class SurveillanceCog(commands.Cog, name="Surveillance"):
             # 1) the game info needs to be the same (map, champ, summoner spells)
             # 2) the time elapsed since that last match is smaller than the time we wait between task executions
             # (if last_match does not exist, it's always safe to write)
-            delta = datetime.utcnow() - (last_match.played_at if last_match else datetime.min)
-            if (
-                delta.seconds // 60 < _DEF_MINUTES_BETWEEN_MATCH_CALLS
-                and match.has_almost_same_info(other=last_match)
-            ):
-                self.bot.logger.info(f"TASK:\tDid not add duplicate match")
-            else:
-                self.bot.logger.info(f"TASK:\tAdded new match {match}")
-                if await self.maybe_police(match=match, account=account):
-                    match.is_abuse = True
-                session.add(match)
+            if last_match is None:
+                return False
+            delta = datetime.utcnow() - last_match.played_at
+            return delta.total_seconds() // 60 < _DEF_MINUTES_BETWEEN_MATCH_CALLS and (
+                match.has_almost_same_info(other=last_match)
+            )
 
     async def maybe_police(self, match: Match, account: Dict[str, Any]) -> bool:
-        felony = query_utils.get_latest_instance_of_something(
-            model=Felony,
-            time_field=Felony.date_added,
-            options={"champion": match.champion, "is_active": True},
+        felony = felony_utils.felony_index.evaluate(
+            champion=match.champion,
+            map_name=match.map,
+            spells=(match.summoner_one, match.summoner_two),
+            discord_id=account["discord_id"],
         )
         if felony is None:
             return False
 
-        # 1) save the committed felony in db
-        with session_scope() as session:
-            summon = Summon(user_id=match.user_id, felony_id=felony["id"], points=felony["points"])
-            session.add(summon)
-        # 2) push a warning message to all participating guilds
-        for guild in self.bot.guilds:
-            await self.push_punish_message(guild=guild, account=account, match=match)
+        # 1) journal the committed felony (counted in the user's leaderboard bucket once written)
+        summon = Summon(
+            user_id=match.user_id,
+            felony_id=felony["id"],
+            points=felony["points"],
+            date_added=datetime.utcnow(),
+        )
+        self.bot.write_journal.append(instance=summon, discord_id=account["discord_id"])
+        # 2) push a warning message to all guilds the offender is in (and which want alerts)
+        for guild in self.bot.get_alert_guilds(discord_id=account["discord_id"]):
+            try:
+                await self.push_punish_message(guild=guild, account=account, match=match)
+            except (ChannelNotFoundError, MemberNotFoundError) as e:
+                self.bot.logger.warning("TASK:\tCould not alert %s: %s", guild.name, e)
         return True
 
+    @commands.command(name="alerts")
+    @commands.guild_only()
+    @decorators.is_bot_admin()
+    async def alerts(self, ctx: commands.Context, state: str) -> None:
+        """
+        Enables or disables S10 abuse alerts in this server.
+        Only usable by bot admins.
+
+        Args:
+            ctx (commands.Context): Discord context
+            state (str): "on" or "off"
+
+        Raises:
+            BadArgumentError: When the state is neither "on" nor "off"
+        """
+        state = state.lower()
+        if state not in ("on", "off"):
+            raise BadArgumentError("Alerts can only be turned `on` or `off`!")
+        with session_scope() as session:
+            settings = session.query(GuildSettings).filter_by(guild_id=ctx.guild.id).first()
+            if settings is None:
+                settings = GuildSettings(guild_id=ctx.guild.id)
+                session.add(settings)
+            settings.alerts_enabled = state == "on"
+        cache_utils.guild_settings_cache.invalidate()
+        self.bot.invalidation_bus.publish("guild_settings", key=ctx.guild.id)
+        await ctx.send(f"Turned alerts {state} for {ctx.guild.name}!")
+
     @fetch_matches.before_loop
     async def before_fetch_matches(self):
         """
@@ -100,21 +351,26 @@ class SurveillanceCog(commands.Cog, name="Surveillance"):
         await self.bot.wait_until_ready()
 
     async def push_punish_message(
-        embed: discord.Embed, guild: discord.Guild, account: Dict[str, Any], match: Match
+        self, guild: discord.Guild, account: Dict[str, Any], match: Match
     ) -> None:
         # pick highest prio channel to send alert msg to
-        channel_to_broadcast = discord_utils._pick_one_text_announcement_channel(guild=guild)
+        channel_to_broadcast = discord_utils.get_announcement_channel(guild=guild)
+        # check if we can grab a member of the match's discord_id in that location
+        member = await discord_utils.get_or_fetch_member(guild=guild, user_id=account["discord_id"])
+        if member is None:
+            raise MemberNotFoundError(
+                f"A member of ID {account['discord_id']} could not be found on this server!"
+            )
         # construct the op.gg URL for live-game
         opgg_url = opgg_handler.construct_url_by_name_and_server(
             league_name=account["league_name"],
             server_name=account["server_name"],
             mode="spectator",
         )
-        # build alert embed and send it to picked channel
-        embed = embed_builder.make_announcement_embed(
-            match=match,
-            url=opgg_url,
+        # queue the alert; alerts for the same channel are coalesced into one message
+        self.bot.alert_queue.enqueue(
             channel=channel_to_broadcast,
-            user_id=account["discord_id"],
+            mention=member.mention,
+            champion=match.champion,
+            url=opgg_url,
         )
-        await channel_to_broadcast.send(embed=embed)
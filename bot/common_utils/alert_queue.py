@@ -0,0 +1,149 @@
+from typing import Any, Deque, Dict, List, NamedTuple
+from collections import deque
+import os
+import time
+import asyncio
+import logging
+import discord
+
+# alerts for the same channel within this window are sent as one message
+_DEF_COALESCE_WINDOW_SECONDS = float(os.environ.get("LOL_WATCHBOT_ALERT_WINDOW_SECONDS", 5.0))
+# delivery latencies kept to compute the reported percentiles
+_DEF_MAX_LATENCY_SAMPLES = 1000
+# alerts failing (transiently) this often are dropped; retried after another window each
+_DEF_MAX_DELIVERY_ATTEMPTS = 3
+
+
+class Alert(NamedTuple):
+    mention: str
+    champion: str
+    url: str
+    enqueued_at: float
+    attempts: int = 0
+
+
+def _get_internal_logger() -> logging.Logger:
+    return logging.getLogger("lol_watchbot")
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class AlertQueue:
+    """
+    Outbound queue per announcement channel.
+    The first alert for a channel opens a window; all alerts queued for it until the window closes
+    are delivered together, as few (combined) embeds as the embed limits allow.
+    """
+
+    def __init__(self, window: float = _DEF_COALESCE_WINDOW_SECONDS):
+        self.window = window
+        # channel ID > alerts waiting for delivery
+        self._pending: Dict[int, List[Alert]] = {}
+        self._latencies: Deque[float] = deque(maxlen=_DEF_MAX_LATENCY_SAMPLES)
+        self._n_delivered = 0
+        self._n_dropped = 0
+        self._n_messages = 0
+
+    def enqueue(self, channel: discord.TextChannel, mention: str, champion: str, url: str) -> None:
+        """
+        Queues an alert for a channel.
+
+        Args:
+            channel (discord.TextChannel): The channel to announce in
+            mention (str): Mention of the offending member
+            champion (str): (converted) champion name
+            url (str): op.gg URL of the live game
+        """
+        alert = Alert(mention=mention, champion=champion, url=url, enqueued_at=time.perf_counter())
+        self._queue(channel=channel, alerts=[alert])
+
+    def _queue(self, channel: discord.TextChannel, alerts: List[Alert]) -> None:
+        if channel.id in self._pending:
+            # a window is already open for this channel > ride along (oldest first)
+            self._pending[channel.id] = sorted(
+                self._pending[channel.id] + alerts, key=lambda alert: alert.enqueued_at
+            )
+            return
+        self._pending[channel.id] = alerts
+        asyncio.get_event_loop().create_task(self._deliver_after_window(channel))
+
+    def _drop(self, channel: discord.TextChannel, alerts: List[Alert], error: Exception) -> None:
+        _get_internal_logger().error("Dropped %d alerts for %s: %r", len(alerts), channel, error)
+        self._n_dropped += len(alerts)
+
+    def _requeue(self, channel: discord.TextChannel, alerts: List[Alert], error: Exception) -> None:
+        alerts = [alert._replace(attempts=alert.attempts + 1) for alert in alerts]
+        retried = [alert for alert in alerts if alert.attempts < _DEF_MAX_DELIVERY_ATTEMPTS]
+        if len(retried) < len(alerts):
+            exhausted = [alert for alert in alerts if alert.attempts >= _DEF_MAX_DELIVERY_ATTEMPTS]
+            self._drop(channel=channel, alerts=exhausted, error=error)
+        if retried:
+            _get_internal_logger().warning(
+                "Could not deliver %d alerts to %s, retrying: %r", len(retried), channel, error
+            )
+            self._queue(channel=channel, alerts=retried)
+
+    async def _deliver_after_window(self, channel: discord.TextChannel) -> None:
+        """
+        Delivers a channel's alerts once its window closed. Never raises, a failing channel only affects its own alerts:
+        they're dropped if the channel is unusable (or the message invalid), and retried if sending failed otherwise.
+        """
+        # (embed_builder imports the DB tables, not needed to import the bot)
+        from bot.common_utils import embed_builder
+
+        await asyncio.sleep(self.window)
+        alerts = self._pending.pop(channel.id, [])
+        try:
+            embeds = embed_builder.make_announcement_embeds(alerts=alerts)
+        except Exception as e:
+            self._drop(channel=channel, alerts=alerts, error=e)
+            return
+
+        start = 0
+        for embed in embeds:
+            # alerts of a combined announcement are one field each
+            end = start + (len(embed.fields) if len(alerts) > 1 else 1)
+            try:
+                await channel.send(embed=embed)
+            except (discord.Forbidden, discord.NotFound) as e:
+                # channel is gone, or we may not write in it (anymore)
+                self._drop(channel=channel, alerts=alerts[start:], error=e)
+                return
+            except discord.HTTPException as e:
+                if e.status >= 500:
+                    self._requeue(channel=channel, alerts=alerts[start:], error=e)
+                    return
+                # discord rejected this message > retrying won't help
+                self._drop(channel=channel, alerts=alerts[start:end], error=e)
+                start = end
+                continue
+            except Exception as e:
+                # e.g. connection errors or timeouts
+                self._requeue(channel=channel, alerts=alerts[start:], error=e)
+                return
+            self._n_messages += 1
+            delivered_at = time.perf_counter()
+            self._latencies.extend(delivered_at - alert.enqueued_at for alert in alerts[start:end])
+            self._n_delivered += end - start
+            start = end
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict[str, Any]: Current queue depth, delivered alerts and messages, and delivery latency percentiles
+        """
+        latencies = sorted(self._latencies)
+        stats = {
+            "queued alerts": sum(len(alerts) for alerts in self._pending.values()),
+            "queued channels": len(self._pending),
+            "delivered alerts": self._n_delivered,
+            "dropped alerts": self._n_dropped,
+            "sent messages": self._n_messages,
+        }
+        if latencies:
+            stats["latency p50"] = f"{_percentile(latencies, 0.5):.2f}s"
+            stats["latency p95"] = f"{_percentile(latencies, 0.95):.2f}s"
+            stats["latency max"] = f"{latencies[-1]:.2f}s"
+        return stats
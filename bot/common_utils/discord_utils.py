@@ -1,8 +1,9 @@
 from bot.common_utils.exceptions import ChannelNotFoundError
 
-from typing import Optional, Dict
+from typing import Optional, Dict, Iterable, Set
 from operator import itemgetter
 from discord import ChannelType
+import asyncio
 import discord
 
 _channel_name_prios = {"alert": 1, "tracking": 2, "general": -1}
@@ -39,3 +40,104 @@ def _pick_one_text_announcement_channel(
 
     # pick and return channel with highest priority (items here are tuples)
     return max(desired_channels, key=itemgetter(1))[0]
+
+
+# guild ID > announcement channel; invalidated whenever a guild's channels change
+_announcement_channels: Dict[int, ChannelType] = {}
+
+
+def get_announcement_channel(guild: discord.Guild) -> ChannelType:
+    """
+    Cached version of `_pick_one_text_announcement_channel` (with default preferences).
+
+    Args:
+        guild (discord.Guild): A guild (discord "server")
+
+    Raises:
+        ChannelNotFoundError: If no channel matches pre-defined preferences.
+
+    Returns:
+        ChannelType: The most-preferred channel.
+    """
+    if guild.id not in _announcement_channels:
+        _announcement_channels[guild.id] = _pick_one_text_announcement_channel(guild=guild)
+    return _announcement_channels[guild.id]
+
+
+def invalidate_announcement_channel(guild_id: int) -> None:
+    _announcement_channels.pop(guild_id, None)
+
+
+# discord ID of a tracked member > IDs of the guilds they're in
+# kept up-to-date by `WatchBot` on member join/remove and guild join/remove
+_member_guild_ids: Dict[int, Set[int]] = {}
+
+
+def index_member(discord_id: int, guild_id: int) -> None:
+    _member_guild_ids.setdefault(discord_id, set()).add(guild_id)
+
+
+def unindex_member(discord_id: int, guild_id: int) -> None:
+    _member_guild_ids.get(discord_id, set()).discard(guild_id)
+
+
+def unindex_guild(guild_id: int) -> None:
+    for guild_ids in _member_guild_ids.values():
+        guild_ids.discard(guild_id)
+
+
+def get_member_guild_ids(discord_id: int) -> Set[int]:
+    """
+    Returns:
+        Set[int]: IDs of the guilds a tracked member is in (as far as known)
+    """
+    return set(_member_guild_ids.get(discord_id, ()))
+
+
+# the gateway resolves at most 100 user IDs per member query
+_DEF_MEMBER_QUERY_CHUNK_SIZE = 100
+
+
+async def cache_members(guild: discord.Guild, user_ids: Iterable[int]) -> int:
+    """
+    Loads the members of a guild with the given IDs into discord.py's member cache.
+    The bot doesn't cache any members on its own (see `WatchBot`), so this is how tracked users become resident.
+
+    Args:
+        guild (discord.Guild): A guild (discord "server")
+        user_ids (Iterable[int]): Discord IDs of the members to cache
+
+    Returns:
+        int: Amount of members (of those IDs) in this guild's cache
+    """
+    user_ids = set(user_ids)
+    missing = [user_id for user_id in user_ids if guild.get_member(user_id) is None]
+    for i in range(0, len(missing), _DEF_MEMBER_QUERY_CHUNK_SIZE):
+        chunk = missing[i : i + _DEF_MEMBER_QUERY_CHUNK_SIZE]
+        try:
+            await guild.query_members(user_ids=chunk, limit=len(chunk), cache=True)
+        except asyncio.TimeoutError:
+            # the remaining members are fetched lazily, see `get_or_fetch_member`
+            break
+    return sum(1 for user_id in user_ids if guild.get_member(user_id) is not None)
+
+
+async def get_or_fetch_member(guild: discord.Guild, user_id: int) -> Optional[discord.Member]:
+    """
+    Gets a member from the cache, or fetches (and caches) it from the gateway if it isn't resident.
+
+    Args:
+        guild (discord.Guild): A guild (discord "server")
+        user_id (int): Discord ID of the member
+
+    Returns:
+        Optional[discord.Member]: The member; None, if there's no such member in this guild.
+    """
+    member = guild.get_member(user_id)
+    if member is not None:
+        return member
+    try:
+        members = await guild.query_members(user_ids=[user_id], limit=1, cache=True)
+    except asyncio.TimeoutError:
+        return None
+    return members[0] if members else None
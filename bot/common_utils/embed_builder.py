@@ -1,4 +1,4 @@
-from typing import Tuple, List, Dict, Any, Optional
+from typing import TYPE_CHECKING, Tuple, List, Dict, Any, Optional
 import discord
 from discord.ext import commands
 
@@ -8,6 +8,11 @@ from bot.database_interface.tables.felonies import Felony
 from bot.database_interface.tables.summons import Summon
 from bot.database_interface.tables.users import User
 from bot.database_interface.utils import query_utils
+from bot.common_utils import discord_utils
+from bot.lol_data import champion_catalog
+
+if TYPE_CHECKING:
+    from bot.common_utils.alert_queue import Alert
 
 _WARNING_ICON_URL = (
     r"https://cdn.iconscout.com/icon/free/png-256/warning-notice-sign-symbol-38020.png"
@@ -21,6 +26,10 @@ _LIST_ICON_URL = (
 _POLICE_MAN_ICON_URL = r"https://purepng.com/public/uploads/large/purepng.com-policemanpolicemanhuman-securitysafetypolicecop-142152696325297fsg.png"
 _MAN_FACEPALM_ICON_URL = r"http://www.pctonline.com/fileuploads/publications/18/issues/103518/articles/images/AdobeStock_215878662_Facepalm_Portrait_a_disappointed_mature_man_fmt.png"
 
+# discord's limits for one embed
+_MAX_EMBED_FIELDS = 25
+_MAX_EMBED_LENGTH = 6000
+
 
 def make_error_message_embed(error_message: str, details: Optional[str] = None) -> discord.Embed:
     """
@@ -116,7 +125,7 @@ def group_acc_dict_by_discord_user(
     return grouped
 
 
-def make_list_accounts_embed(
+async def make_list_accounts_embed(
     accounts: List[Dict[str, Any]], ctx: commands.Context
 ) -> discord.Embed:
     """
@@ -140,10 +149,10 @@ def make_list_accounts_embed(
             f"> `[{account['id']}]` {account['league_name']} ({account['server_name'].upper()}) 👉 [opgg]({account['opgg_link']})"
             for account in acc_list
         ]
-        # get the discord user owning these accounts by ID
-        owning_user = ctx.guild.get_member(discord_id) or "AnonymousUser"
+        # get the discord user owning these accounts by ID (fetched, if not cached)
+        owning_user = await discord_utils.get_or_fetch_member(guild=ctx.guild, user_id=discord_id)
         embed.add_field(
-            name=f"👤 {owning_user.display_name}",
+            name=f"👤 {owning_user.display_name if owning_user else 'AnonymousUser'}",
             value="\n".join(accounts_linked),
             inline=False,
         )
@@ -151,25 +160,48 @@ def make_list_accounts_embed(
     return embed
 
 
-def make_announcement_embed(
-    match: Match, url: str, channel: discord.ChannelType, user_id: int
-) -> discord.Embed:
-    # check if we can grab a member of the match's discord_id in that location
-    member = channel.guild.get_member(user_id)
-    if member is None:
-        raise MemberNotFoundError(
-            f"A member of ID {match.user_id} could not be found on this server!"
-        )
+def make_announcement_embeds(alerts: List["Alert"]) -> List[discord.Embed]:
+    """
+    Constructs the announcement of one or more (coalesced) alerts for a channel.
+    Multiple offenders are combined into one embed per message, split to respect discord's embed limits.
 
-    embed = discord.Embed(title="🚨 S10 ABUSE DETECTED 🚨", colour=discord.Colour.red())
-    embed.set_thumbnail(url=_POLICE_MAN_ICON_URL)
+    Args:
+        alerts (List[Alert]): The queued alerts, oldest first
 
-    # TODO(jonas): make the bot join the VC, then play a siren sound
-    return (
-        embed.add_field(name="FELLON", value=member.mention, inline=False)
-        .add_field(name="S10 ABUSE CHAMPION", value=match.champion, inline=False)
-        .add_field(name="LINK", value=url, inline=False)
-    )
+    Returns:
+        List[discord.Embed]: One populated announcement embed per message to send
+    """
+    if len(alerts) == 1:
+        # TODO(jonas): make the bot join the VC, then play a siren sound
+        return [
+            _make_announcement_base_embed(title="🚨 S10 ABUSE DETECTED 🚨")
+            .add_field(name="FELLON", value=alerts[0].mention, inline=False)
+            .add_field(
+                name="S10 ABUSE CHAMPION",
+                value=champion_catalog.get_display_name(alerts[0].champion),
+                inline=False,
+            )
+            .add_field(name="LINK", value=alerts[0].url, inline=False)
+        ]
+
+    title = f"🚨 S10 ABUSE DETECTED ({len(alerts)} FELLONS) 🚨"
+    embeds = [_make_announcement_base_embed(title=title)]
+    for alert in alerts:
+        name = champion_catalog.get_display_name(alert.champion)
+        value = f"{alert.mention} 👉 [op.gg]({alert.url})"
+        if len(embeds[-1].fields) == _MAX_EMBED_FIELDS or (
+            len(embeds[-1]) + len(name) + len(value) > _MAX_EMBED_LENGTH
+        ):
+            embeds.append(_make_announcement_base_embed(title=title))
+        embeds[-1].add_field(name=name, value=value, inline=False)
+
+    return embeds
+
+
+def _make_announcement_base_embed(title: str) -> discord.Embed:
+    embed = discord.Embed(title=title, colour=discord.Colour.red())
+    embed.set_thumbnail(url=_POLICE_MAN_ICON_URL)
+    return embed
 
 
 def make_list_felonies_embed(only_active_ones: bool = True) -> discord.Embed:
@@ -201,7 +233,11 @@ def make_list_felonies_embed(only_active_ones: bool = True) -> discord.Embed:
     active_felony_strings: Dict[bool, List[str]] = {True: [], False: []}
     # we divide the dateset into 2 subgroups: active and inactive felonies
     for felony in felonies:
-        formatted = f"`{felony['id']}`\t{felony['champion'].title()} [{felony['points']}pts] "
+        formatted = f"`{felony['id']}`\t{champion_catalog.get_display_name(felony['champion'])} [{felony['points']}pts] "
+        if felony["map"]:
+            formatted += f"on {felony['map']} "
+        if felony["spells"]:
+            formatted += f"with {felony['spells']} "
         if felony["is_active"]:
             dates_str = f"(added: {felony['date_added'].date()})"
         else:
@@ -226,42 +262,27 @@ def make_list_felonies_embed(only_active_ones: bool = True) -> discord.Embed:
     return embed
 
 
-def make_leaderboard_embed(ctx: commands.Context) -> discord.Embed:
+async def make_leaderboard_embed(
+    ctx: commands.Context, leaderboard: List[Dict[str, Any]], window: str = "all"
+) -> discord.Embed:
+    """
+    Constructs the "hall of shame", listing discord users by their collected summon points.
+
+    Args:
+        ctx (commands.Context): invoking discord context of command (to get user's names)
+        leaderboard (List[Dict[str, Any]]): {"discord_id", "points", "count"} per discord user, sorted
+        window (str, optional): Name of the leaderboard's time window. Defaults to "all".
+
+    Returns:
+        discord.Embed: Populated leaderboard embed
+    """
+    title_suffix = "" if window == "all" else f" (this {window})"
     embed = discord.Embed(
-        title=f"💩 Hall of shame",
+        title=f"💩 Hall of shame{title_suffix}",
         colour=discord.Colour.red(),
     )
     embed.set_thumbnail(url=_MAN_FACEPALM_ICON_URL)
-    summon_entries = query_utils.get_all_instances_of_something(model=Summon)
-    user_points = {}
-    # looks like:
-    # {
-    #     1: {
-    #         "points": 5,
-    #         "count": 2,
-    #     },
-    #     2: {
-    #         "points": 14,
-    #         "count": 6,
-    #     },
-    #     [...]
-    # }
-
-    for summon in summon_entries:
-        user_id = summon["user_id"]
-        if summon["user_id"] in user_points:
-            user_points[user_id]["points"] = user_points[user_id]["points"] + summon["points"]
-        else:
-            user_points[user_id] = {"points": summon["points"]}
-        user_points[user_id]["count"] = user_points[user_id].get("count", 0) + 1
-        if not "discord_id" in user_points[user_id]:
-            bot_user = query_utils.get_one_instance_of_model_by_id(
-                model=User, options={"id": user_id}
-            )
-            user_points[user_id]["discord_id"] = bot_user["discord_id"]
 
-    # sort by points DESC
-    user_points = sorted(user_points.values(), key=lambda i: i["points"], reverse=True)
     entry_icons, default_icon = {
         0: "🥇",
         1: "🥈",
@@ -269,11 +290,12 @@ def make_leaderboard_embed(ctx: commands.Context) -> discord.Embed:
     }, "🥳"
 
     text_lines = []
-    for idx, stat in enumerate(user_points):
-        discord_mention = ctx.guild.get_member(stat["discord_id"])
-        formatted = (
-            f"{entry_icons.get(idx, default_icon)}\t{stat['points']}\t{discord_mention.mention}"
+    for idx, stat in enumerate(leaderboard):
+        discord_member = await discord_utils.get_or_fetch_member(
+            guild=ctx.guild, user_id=stat["discord_id"]
         )
+        mention = discord_member.mention if discord_member else f"<@{stat['discord_id']}>"
+        formatted = f"{entry_icons.get(idx, default_icon)}\t{stat['points']}\t{mention}"
         text_lines.append(formatted)
 
     embed.add_field(
@@ -282,4 +304,106 @@ def make_leaderboard_embed(ctx: commands.Context) -> discord.Embed:
         inline=False,
     )
 
-    return embed
\ No newline at end of file
+    return embed
+
+def make_stats_embed(member: discord.Member, stats: Dict[str, Any]) -> discord.Embed:
+    """
+    Constructs an embed showing a discord user's match statistics.
+
+    Args:
+        member (discord.Member): The discord user the stats belong to
+        stats (Dict[str, Any]): Statistics as computed by `stats_utils.compute_stats`
+
+    Returns:
+        discord.Embed: Populated statistics embed
+    """
+    embed = discord.Embed(title=f"📊 Stats of {member.display_name}", colour=discord.Colour.red())
+    embed.set_thumbnail(url=_POLICE_MAN_ICON_URL)
+    if not stats["games"]:
+        return embed.add_field(name="\u200b", value="No matches recorded yet!", inline=False)
+
+    top_champions = [
+        f"{champion_catalog.get_display_name(champion)} ({games})"
+        for champion, games in list(stats["champions"].items())[:5]
+    ]
+    weekdays = [f"`{day}` {games}" for day, games in stats["weekdays"].items()]
+
+    # --- Layout: ---
+    # [games]   [abuse_rate]
+    # [top_champions]
+    # [games_per_weekday]
+    # [longest_streak]   [current_streak]
+    return (
+        embed.add_field(name="Games", value=stats["games"], inline=True)
+        .add_field(name="Abuse rate", value=f"{stats['abuse_rate']:.0%}", inline=True)
+        .add_field(name="Most played", value="\n".join(top_champions), inline=False)
+        .add_field(name="Games per weekday", value=" | ".join(weekdays), inline=False)
+        .add_field(name="Longest abuse streak", value=stats["longest_abuse_streak"], inline=True)
+        .add_field(name="Current abuse streak", value=stats["current_abuse_streak"], inline=True)
+    )
+
+
+def _format_numbered_lines(lines: List[Tuple[int, str]], max_length: int = 1024) -> str:
+    """
+    Formats (line number, message) pairs for an embed field, cut to the field's maximum length.
+    """
+    formatted = ""
+    for idx, (line_number, message) in enumerate(lines):
+        line = f"`L{line_number}` {message}\n"
+        if len(formatted) + len(line) > max_length - 20:
+            return formatted + f"... and {len(lines) - idx} more"
+        formatted += line
+    return formatted
+
+
+def make_bulk_import_summary_embed(
+    n_added: int,
+    invalid: List[Tuple[int, str]],
+    failed: List[Tuple[int, str]],
+    duplicates: List[Tuple[int, str]],
+) -> discord.Embed:
+    """
+    Constructs a summary embed of a bulk account import.
+
+    Args:
+        n_added (int): Amount of added accounts
+        invalid (List[Tuple[int, str]]): (line number, reason) of rows that couldn't be added
+        failed (List[Tuple[int, str]]): (line number, reason) of rows that couldn't be added for now (e.g. op.gg was down)
+        duplicates (List[Tuple[int, str]]): (line number, account) of rows already existing (or repeated in the file)
+
+    Returns:
+        discord.Embed: Populated summary embed
+    """
+    embed = discord.Embed(title="📥 Bulk import summary", colour=discord.Colour.red())
+    embed.set_thumbnail(url=_SURVEILLANCE_ICON_URL)
+    embed.add_field(name="Added", value=n_added, inline=True)
+    embed.add_field(name="Invalid", value=len(invalid), inline=True)
+    embed.add_field(name="Failed", value=len(failed), inline=True)
+    embed.add_field(name="Duplicates", value=len(duplicates), inline=True)
+    if invalid:
+        embed.add_field(name="Invalid rows", value=_format_numbered_lines(invalid), inline=False)
+    if failed:
+        embed.add_field(name="Failed rows", value=_format_numbered_lines(failed), inline=False)
+    if duplicates:
+        embed.add_field(
+            name="Duplicate rows", value=_format_numbered_lines(duplicates), inline=False
+        )
+
+    return embed
+
+
+def make_admin_stats_embed(title: str, stats: Dict[str, Any]) -> discord.Embed:
+    """
+    Constructs an embed listing (operational) statistics of the bot.
+
+    Args:
+        title (str): Title of the embed
+        stats (Dict[str, Any]): {name: value} of the statistics
+
+    Returns:
+        discord.Embed: Populated statistics embed
+    """
+    embed = discord.Embed(title=title, colour=discord.Colour.red())
+    for name, value in stats.items():
+        embed.add_field(name=name, value=value, inline=True)
+    return embed
@@ -34,4 +34,13 @@ class MemberNotFoundError(commands.CommandError):
     """
 
     def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
\ No newline at end of file
+        super().__init__(*args, **kwargs)
+
+
+class OpGGUnavailableError(OpGGParsingError):
+    """
+    Class used to describe op.gg being (temporarily) unreachable, e.g. during outages or throttling.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
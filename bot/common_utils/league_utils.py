@@ -1,9 +1,24 @@
+from bot.lol_data import champion_catalog
+
+
 def _convert_champ_name(name: str) -> str:
-    return "".join([c for c in name if c.isalpha()]).lower()
+    """
+    Converts a champion name or alias to the champion's canonical key (e.g. "Rek'Sai", "xin" > "reksai", "xinzhao").
+    Champions missing in the catalog (e.g. just released ones) fall back to their lower-cased alphanumeric chars
+    (so the numeric ID of an unresolved champion is kept).
+    """
+    return (
+        champion_catalog.resolve_champion(name) or "".join([c for c in name if c.isalnum()]).lower()
+    )
 
 
 def is_valid_champ_name(name: str) -> bool:
-    if not name.strip() or not any([c.isalpha() for c in name]):
-        return False
+    return champion_catalog.resolve_champion(name) is not None
+
 
-    return True
\ No newline at end of file
+def normalize_summoner_name(name: str) -> str:
+    """
+    Normalizes a summoner name for comparisons: LoL ignores whitespace and case in names
+    (e.g. "Foo Bar" and "foobar" are the same summoner).
+    """
+    return "".join(name.split()).casefold()
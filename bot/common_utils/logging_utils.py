@@ -0,0 +1,37 @@
+from typing import Optional
+import queue
+import logging
+import logging.handlers
+
+_LOGGER_NAME = "lol_watchbot"
+
+
+def setup_queued_logging(
+    handler: Optional[logging.Handler] = None, level: int = logging.INFO
+) -> logging.handlers.QueueListener:
+    """
+    Makes the bot's logger hand its records to a queue, which a background thread writes out.
+    Logging on the event loop thus only costs an enqueue; formatting and I/O happen in that thread.
+
+    Args:
+        handler (Optional[logging.Handler], optional): Where the records are written to. Defaults to stderr.
+        level (int, optional): Level of the bot's logger. Defaults to logging.INFO.
+
+    Returns:
+        logging.handlers.QueueListener: The (started) writer; stop it on shutdown to flush pending records.
+    """
+    if handler is None:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s:%(name)s:%(message)s"))
+
+    # unbounded, so logging never blocks
+    records: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    logger = logging.getLogger(_LOGGER_NAME)
+    logger.setLevel(level)
+    logger.addHandler(logging.handlers.QueueHandler(records))
+    # the root logger's handlers would write synchronously again
+    logger.propagate = False
+
+    listener = logging.handlers.QueueListener(records, handler, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -0,0 +1,130 @@
+from typing import Deque, Dict, List, Optional, Tuple
+from collections import Counter, deque
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+
+# how often the heartbeat is scheduled on the event loop
+_DEF_HEARTBEAT_SECONDS = 0.1
+# the loop counts as blocked once a heartbeat is overdue by this long
+_DEF_LAG_THRESHOLD_SECONDS = float(os.environ.get("LOL_WATCHBOT_LAG_THRESHOLD_MS", 250)) / 1000
+# lag measurements kept to compute the reported percentiles
+_DEF_MAX_LAG_SAMPLES = 3000
+# frames of the blocked stack that are logged
+_DEF_LOGGED_FRAMES = 12
+
+# call sites inside the bot's own package are the interesting ones
+_PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _get_internal_logger() -> logging.Logger:
+    return logging.getLogger("lol_watchbot")
+
+
+def _format_frame(frame: traceback.FrameSummary) -> str:
+    return f"{os.path.basename(frame.filename)}:{frame.lineno} ({frame.name})"
+
+
+def _get_call_site(stack: traceback.StackSummary) -> str:
+    """
+    Condenses a blocked stack to its call site: the innermost frame of the bot's own code,
+    and the innermost frame overall (where it actually blocked, e.g. in a socket read).
+    """
+    innermost = _format_frame(stack[-1])
+    own_frames = [frame for frame in stack if frame.filename.startswith(_PACKAGE_DIR)]
+    if not own_frames or own_frames[-1] is stack[-1]:
+        return innermost
+    return f"{_format_frame(own_frames[-1])} > {innermost}"
+
+
+class LoopWatchdog:
+    """
+    Measures the lag of the event loop with a heartbeat task.
+    A side thread watches the heartbeat; whenever it's overdue, the loop is blocked by synchronous code,
+    so the thread samples the stack of the loop's thread and aggregates the blocking call sites.
+    """
+
+    def __init__(
+        self,
+        heartbeat: float = _DEF_HEARTBEAT_SECONDS,
+        threshold: float = _DEF_LAG_THRESHOLD_SECONDS,
+    ):
+        self.heartbeat = heartbeat
+        self.threshold = threshold
+        self._lags: Deque[float] = deque(maxlen=_DEF_MAX_LAG_SAMPLES)
+        # call site > amount of samples it was found blocking in
+        self._call_sites: Counter = Counter()
+        self._n_stalls = 0
+        self._last_beat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        """
+        Starts the heartbeat on the running event loop and the watching thread.
+        Needs to be called from the loop's thread.
+        """
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        asyncio.get_event_loop().create_task(self._beat())
+        threading.Thread(target=self._watch, name="loop-watchdog", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    async def _beat(self) -> None:
+        while not self._stopped.is_set():
+            scheduled_at = time.monotonic()
+            await asyncio.sleep(self.heartbeat)
+            self._last_beat = time.monotonic()
+            self._lags.append(max(0.0, self._last_beat - scheduled_at - self.heartbeat))
+
+    def _watch(self) -> None:
+        is_stalled = False
+        while not self._stopped.wait(self.heartbeat):
+            overdue = time.monotonic() - self._last_beat - self.heartbeat
+            if overdue < self.threshold:
+                is_stalled = False
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame)
+            self._call_sites[_get_call_site(stack)] += 1
+            if not is_stalled:
+                # log the stack once per stall, the samples are aggregated anyway
+                is_stalled = True
+                self._n_stalls += 1
+                _get_internal_logger().warning(
+                    "Event loop blocked for %.2fs at:\n%s",
+                    overdue,
+                    "".join(traceback.format_list(stack[-_DEF_LOGGED_FRAMES:])),
+                )
+
+    def get_stats(self) -> Dict[str, str]:
+        """
+        Returns:
+            Dict[str, str]: Lag percentiles, and how often the loop was blocked
+        """
+        lags = sorted(self._lags)
+        stats = {"stalls": str(self._n_stalls)}
+        if lags:
+            for name, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+                lag = lags[min(len(lags) - 1, int(fraction * len(lags)))]
+                stats[f"lag {name}"] = f"{lag * 1000:.0f}ms"
+            stats["lag max"] = f"{lags[-1] * 1000:.0f}ms"
+        return stats
+
+    def get_top_call_sites(self, n: int = 5) -> List[Tuple[str, float]]:
+        """
+        Returns:
+            List[Tuple[str, float]]: The `n` call sites that blocked the loop the longest, with the (estimated) seconds they blocked
+        """
+        return [
+            (call_site, samples * self.heartbeat)
+            for call_site, samples in self._call_sites.most_common(n)
+        ]
@@ -0,0 +1,70 @@
+from typing import Iterator, List, Optional
+from contextlib import contextmanager
+import os
+import logging
+import tracemalloc
+
+# frames kept per traced allocation; tracking is disabled if not set (it slows down every allocation)
+_TRACEMALLOC_FRAMES_ENV = "LOL_WATCHBOT_TRACEMALLOC_FRAMES"
+# allocation deltas logged per sweep
+_DEF_TOP_N_DELTAS = 10
+# allocations of the tracker itself (and of imports) are noise
+_IGNORED_FILES = (tracemalloc.__file__, "<frozen importlib._bootstrap>", "<unknown>")
+
+
+def _get_internal_logger() -> logging.Logger:
+    return logging.getLogger("lol_watchbot")
+
+
+class SweepMemoryTracker:
+    """
+    Compares tracemalloc snapshots taken before and after a sweep,
+    to find the lines whose allocations are retained (i.e. grow the memory) across sweeps.
+    """
+
+    def __init__(self, n_frames: Optional[int] = None, top_n: int = _DEF_TOP_N_DELTAS):
+        self.n_frames = n_frames
+        self.top_n = top_n
+        # top deltas of the last tracked sweep
+        self.last_deltas: List[tracemalloc.StatisticDiff] = []
+
+    @property
+    def is_enabled(self) -> bool:
+        return bool(self.n_frames)
+
+    def _take_snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, filename) for filename in _IGNORED_FILES]
+        )
+
+    @contextmanager
+    def track(self, name: str = "sweep") -> Iterator[None]:
+        """
+        Logs the top allocation deltas (by file and line) of the wrapped code. A no-op, if tracking is disabled.
+
+        Args:
+            name (str, optional): What's tracked, for the log. Defaults to "sweep".
+        """
+        if not self.is_enabled:
+            yield
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.n_frames)
+        before = self._take_snapshot()
+        yield
+        after = self._take_snapshot()
+
+        deltas = after.compare_to(before, "lineno")
+        self.last_deltas = [delta for delta in deltas if delta.size_diff][: self.top_n]
+        current, peak = tracemalloc.get_traced_memory()
+        _get_internal_logger().info(
+            "MEMORY:\t%s retained %+.1fKiB (traced: %.1fMiB, peak: %.1fMiB), top deltas:\n%s",
+            name,
+            sum(delta.size_diff for delta in deltas) / 1024,
+            current / 1024**2,
+            peak / 1024**2,
+            "\n".join(str(delta) for delta in self.last_deltas),
+        )
+
+
+memory_tracker = SweepMemoryTracker(n_frames=int(os.environ.get(_TRACEMALLOC_FRAMES_ENV, 0)))
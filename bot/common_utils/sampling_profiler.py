@@ -0,0 +1,82 @@
+from typing import List, Optional, Tuple
+from collections import Counter
+import os
+import sys
+import time
+import threading
+
+# seconds between two stack samples
+_DEF_SAMPLING_INTERVAL = 0.005
+
+
+def _frame_name(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Low-overhead profiler of all threads (the event loop's and e.g. the executor's, which run the DB and HTTP calls):
+    a side thread periodically samples their stacks, nothing is traced.
+    The samples are aggregated per unique stack, rooted at the name of its thread,
+    i.e. in the collapsed-stack format flamegraph tools read.
+    """
+
+    def __init__(self, interval: float = _DEF_SAMPLING_INTERVAL):
+        self.interval = interval
+        # stack (thread name, then outermost frame first) > amount of samples
+        self._stacks: Counter = Counter()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.duration = 0.0
+
+    def start(self) -> None:
+        self._started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self._started_at
+
+    def _sample(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_name(frame.f_code))
+                    frame = frame.f_back
+                if stack:
+                    stack.append(names.get(thread_id, f"thread-{thread_id}"))
+                    self._stacks[tuple(reversed(stack))] += 1
+
+    @property
+    def n_samples(self) -> int:
+        return sum(self._stacks.values())
+
+    def get_collapsed_stacks(self) -> str:
+        """
+        Returns:
+            str: One `frame;frame;...;frame count` line per unique stack (e.g. for flamegraph.pl or speedscope)
+        """
+        return "\n".join(
+            f"{';'.join(stack)} {count}" for stack, count in self._stacks.most_common()
+        )
+
+    def get_top_functions(self, n: int = 10) -> List[Tuple[str, int, int]]:
+        """
+        Returns:
+            List[Tuple[str, int, int]]: The `n` functions with the most samples of their own (self),
+            as (function, self samples, total samples including callees)
+        """
+        own, total = Counter(), Counter()
+        for stack, count in self._stacks.items():
+            own[stack[-1]] += count
+            # recursive functions count once per sample; the thread name isn't a function
+            for name in set(stack[1:]):
+                total[name] += count
+        return [(name, samples, total[name]) for name, samples in own.most_common(n)]
@@ -0,0 +1,139 @@
+from typing import Any, Dict, Optional, TYPE_CHECKING
+import threading
+
+from bot.database_interface.session.session_handler import session_scope
+from bot.database_interface.tables.users import User
+from bot.database_interface.tables.matches import Match
+from bot.database_interface.tables.match_rollups import MatchRollup
+from bot.database_interface.tables.lookups import Champion
+
+if TYPE_CHECKING:
+    # numpy is imported on first use, as only the stats commands need it
+    import numpy as np
+
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+# discord ID > computed stats; dropped whenever a new match of that discord user is saved
+_stats_cache: Dict[int, Dict[str, Any]] = {}
+_stats_cache_lock = threading.Lock()
+
+
+def load_match_columns(discord_id: int) -> Dict[str, "np.ndarray"]:
+    """
+    Loads the matches (and compacted rollups) of all accounts of a discord user as columns.
+
+    Args:
+        discord_id (int): ID of the discord user
+
+    Returns:
+        Dict[str, np.ndarray]: raw matches (`played_at`, `champion`, `is_abuse`, ordered by time)
+            and rollups (`rollup_day`, `rollup_champion`, `rollup_games`, `rollup_abuse_games`)
+    """
+    import numpy as np
+
+    with session_scope() as session:
+        matches = (
+            session.query(Match.played_at, Champion.name, Match.is_abuse)
+            .join(User, Match.user_id == User.id)
+            .outerjoin(Champion, Match.champion_id == Champion.id)
+            .filter(User.discord_id == discord_id)
+            .order_by(Match.played_at)
+            .all()
+        )
+        rollups = (
+            session.query(
+                MatchRollup.day, MatchRollup.champion, MatchRollup.games, MatchRollup.abuse_games
+            )
+            .join(User, MatchRollup.user_id == User.id)
+            .filter(User.discord_id == discord_id)
+            .all()
+        )
+
+    played_at, champion, is_abuse = zip(*matches) if matches else ((), (), ())
+    rollup_day, rollup_champion, rollup_games, rollup_abuse_games = (
+        zip(*rollups) if rollups else ((), (), (), ())
+    )
+    return {
+        "played_at": np.array(played_at, dtype="datetime64[s]"),
+        "champion": np.array(champion, dtype=object),
+        # NULL (never policed) counts as no abuse
+        "is_abuse": np.array([bool(abuse) for abuse in is_abuse], dtype=bool),
+        "rollup_day": np.array(rollup_day, dtype="datetime64[D]"),
+        "rollup_champion": np.array(rollup_champion, dtype=object),
+        "rollup_games": np.array(rollup_games, dtype=np.int64),
+        "rollup_abuse_games": np.array(rollup_abuse_games, dtype=np.int64),
+    }
+
+
+def _weekdays(days: "np.ndarray") -> "np.ndarray":
+    import numpy as np
+
+    # 1970-01-01 (day 0) was a Thursday > shift so that Monday = 0
+    return (days.astype("datetime64[D]").astype(np.int64) + 3) % 7
+
+
+def compute_stats(columns: Dict[str, "np.ndarray"]) -> Dict[str, Any]:
+    """
+    Computes a discord user's statistics from its match columns, fully vectorized.
+    Raw matches count once; rollups count with their amount of games.
+
+    Args:
+        columns (Dict[str, np.ndarray]): as returned by `load_match_columns`
+
+    Returns:
+        Dict[str, Any]: `games`, `abuse_rate`, `champions` (champion > games, most played first),
+            `weekdays` (games per weekday, Monday first), `longest_abuse_streak` and `current_abuse_streak`
+    """
+    import numpy as np
+
+    champions = np.concatenate((columns["champion"], columns["rollup_champion"]))
+    weights = np.concatenate((np.ones(len(columns["champion"])), columns["rollup_games"]))
+    games = int(weights.sum())
+    abuse_games = int(columns["is_abuse"].sum() + columns["rollup_abuse_games"].sum())
+
+    champion_counts = {}
+    if champions.size:
+        names, inverse = np.unique(champions.astype(str), return_inverse=True)
+        counts = np.bincount(inverse, weights=weights)
+        order = np.argsort(-counts, kind="stable")
+        champion_counts = {str(names[i]): int(counts[i]) for i in order}
+
+    weekdays = np.concatenate(
+        (_weekdays(columns["played_at"]), _weekdays(columns["rollup_day"]))
+    ).astype(np.int64)
+    games_per_weekday = np.bincount(weekdays, weights=weights, minlength=7).astype(np.int64)
+
+    # streaks of consecutive abuse games (raw matches only, rollups lost their order)
+    edges = np.diff(np.concatenate(([0], columns["is_abuse"].astype(np.int8), [0])))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    streaks = ends - starts
+    longest_streak = int(streaks.max()) if streaks.size else 0
+    is_ongoing = bool(streaks.size) and ends[-1] == len(columns["is_abuse"])
+    current_streak = int(streaks[-1]) if is_ongoing else 0
+
+    return {
+        "games": games,
+        "abuse_rate": abuse_games / games if games else 0.0,
+        "champions": champion_counts,
+        "weekdays": dict(zip(WEEKDAYS, games_per_weekday.tolist())),
+        "longest_abuse_streak": longest_streak,
+        "current_abuse_streak": current_streak,
+    }
+
+
+def get_user_stats(discord_id: int) -> Dict[str, Any]:
+    """
+    Cached statistics of a discord user (see `compute_stats`).
+    """
+    with _stats_cache_lock:
+        stats: Optional[Dict[str, Any]] = _stats_cache.get(discord_id)
+    if stats is None:
+        stats = compute_stats(load_match_columns(discord_id=discord_id))
+        with _stats_cache_lock:
+            _stats_cache[discord_id] = stats
+    return stats
+
+
+def invalidate_user_stats(discord_id: int) -> None:
+    with _stats_cache_lock:
+        _stats_cache.pop(discord_id, None)
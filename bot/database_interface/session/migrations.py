@@ -0,0 +1,137 @@
+from typing import Callable, Dict
+import logging
+
+import sqlalchemy
+from sqlalchemy.engine import Connection
+
+
+def _get_internal_logger() -> logging.Logger:
+    return logging.getLogger("lol_watchbot")
+
+
+def _has_column(connection: Connection, table: str, column: str) -> bool:
+    return column in {c["name"] for c in sqlalchemy.inspect(connection).get_columns(table)}
+
+
+def _has_index(connection: Connection, table: str, index: str) -> bool:
+    return index in {i["name"] for i in sqlalchemy.inspect(connection).get_indexes(table)}
+
+
+def _add_column_if_missing(connection: Connection, table: str, column: str, ddl_type: str) -> None:
+    """
+    Adds a (nullable) column to an existing table.
+    Tables created by `create_all` in the same run already have it, hence the check.
+    """
+    if not _has_column(connection, table, column):
+        connection.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl_type}")
+
+
+def _create_index_if_missing(
+    connection: Connection, table: str, index: str, columns: str, unique: bool = False
+) -> None:
+    if not _has_index(connection, table, index):
+        connection.execute(
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX {index} ON {table} ({columns})"
+        )
+
+
+def _migrate_to_3(connection: Connection) -> None:
+    # matches are deduplicated by the ID of the game they were detected in
+    _add_column_if_missing(connection, "matches", "game_id", "BIGINT")
+    _create_index_if_missing(connection, "matches", "match_user_game_idx", "user_id, game_id")
+
+
+def _migrate_to_4(connection: Connection) -> None:
+    # leaderboards read pre-aggregated daily buckets > backfill them from all existing summons
+    connection.execute(
+        "INSERT INTO summon_daily_buckets (day, user_id, points, count) "
+        "SELECT DATE(date_added), user_id, SUM(points), COUNT(*) FROM summons "
+        "GROUP BY DATE(date_added), user_id"
+    )
+
+
+def _migrate_to_6(connection: Connection) -> None:
+    # journaled matches and summons are written idempotently, by their journal key
+    for table, index in (
+        ("matches", "match_journal_key_idx"),
+        ("summons", "summon_journal_key_idx"),
+    ):
+        _add_column_if_missing(connection, table, "journal_key", "VARCHAR(32)")
+        _create_index_if_missing(connection, table, index, "journal_key", unique=True)
+
+
+def _migrate_to_7(connection: Connection) -> None:
+    # map, champion and spells of matches move into lookup tables (created by `create_all`)
+    for lookup, name_columns in (
+        ("maps", ("map",)),
+        ("champions", ("champion",)),
+        ("spells", ("summoner_one", "summoner_two")),
+    ):
+        if not _has_column(connection, "matches", name_columns[0]):
+            continue
+        names = " UNION ".join(
+            f"SELECT {column} AS name FROM matches WHERE {column} IS NOT NULL"
+            for column in name_columns
+        )
+        connection.execute(
+            f"INSERT INTO {lookup} (name) SELECT DISTINCT name FROM ({names}) AS names "
+            f"WHERE name NOT IN (SELECT name FROM {lookup})"
+        )
+        for column in name_columns:
+            _add_column_if_missing(connection, "matches", f"{column}_id", "SMALLINT")
+            connection.execute(
+                f"UPDATE matches SET {column}_id = "
+                f"(SELECT id FROM {lookup} WHERE {lookup}.name = matches.{column})"
+            )
+            connection.execute(f"ALTER TABLE matches DROP COLUMN {column}")
+
+
+def _migrate_to_8(connection: Connection) -> None:
+    # felonies can additionally be restricted to a map and summoner spells
+    _add_column_if_missing(connection, "felonies", "map", "VARCHAR")
+    _add_column_if_missing(connection, "felonies", "spells", "VARCHAR")
+
+
+def _migrate_to_10(connection: Connection) -> None:
+    # felonies are looked up by the champion's canonical catalog key (e.g. "xin" > "xinzhao")
+    from bot.lol_data import champion_catalog
+
+    for felony_id, champion in connection.execute("SELECT id, champion FROM felonies").fetchall():
+        key = champion_catalog.resolve_champion(champion)
+        if key is None:
+            _get_internal_logger().warning(
+                "Felony %s: champion %r is not in the catalog, left as is", felony_id, champion
+            )
+        elif key != champion:
+            connection.execute(
+                sqlalchemy.text("UPDATE felonies SET champion = :champion WHERE id = :id"),
+                champion=key,
+                id=felony_id,
+            )
+
+
+# schema version > migration upgrading an existing DB from the previous version to it.
+# Versions only adding whole tables don't need one, `create_all` takes care of those.
+_MIGRATIONS: Dict[int, Callable[[Connection], None]] = {
+    3: _migrate_to_3,
+    4: _migrate_to_4,
+    6: _migrate_to_6,
+    7: _migrate_to_7,
+    8: _migrate_to_8,
+    10: _migrate_to_10,
+}
+
+
+def run_migrations(connection: Connection, from_version: int, to_version: int) -> None:
+    """
+    Upgrades the tables of an existing DB, which were created with the schema version `from_version`.
+
+    Args:
+        connection (Connection): connection (within a transaction) to the DB to upgrade
+        from_version (int): schema version the DB was set up with
+        to_version (int): current schema version
+    """
+    for version in sorted(_MIGRATIONS):
+        if from_version < version <= to_version:
+            _get_internal_logger().info(f"Migrating DB schema to version {version}...")
+            _MIGRATIONS[version](connection)
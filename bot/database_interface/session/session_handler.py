@@ -1,13 +1,65 @@
 import os
+import logging
 from contextlib import contextmanager
+from typing import Optional
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, select, Table, Column, Integer
+import sqlalchemy.exc
 import sqlalchemy.orm
 from sqlalchemy.ext.declarative import declarative_base
 
+from bot.database_interface.session import migrations
+
 # Declarative base that is being used by all our DB interfaces
 bot_declarative_base = declarative_base()
 
+# Version of the table definitions in the "tables" module.
+# Bump this whenever a table is added, so `create_all` runs (once) on the next start.
+# Changes to existing tables additionally need a migration in `migrations`.
+_SCHEMA_VERSION = 10
+
+# single-row table holding the schema version the DB was last set up with
+_schema_version_table = Table(
+    "schema_version",
+    bot_declarative_base.metadata,
+    Column("version", Integer, nullable=False),
+)
+
+
+def _import_all_tables() -> None:
+    """
+    Imports every module of the "tables" module, so all models are registered on the metadata.
+    """
+    from bot.database_interface.tables import (
+        cache_invalidations,
+        felonies,
+        felony_exemptions,
+        guild_settings,
+        lookups,
+        matches,
+        match_rollups,
+        summon_buckets,
+        summons,
+        users,
+    )
+
+
+def _read_schema_version(engine: sqlalchemy.engine.Engine) -> Optional[int]:
+    """
+    Reads the schema version stored in the DB.
+
+    Returns:
+        Optional[int]: The stored version; None, if the DB was never set up.
+    """
+    try:
+        with engine.connect() as connection:
+            return connection.execute(select([_schema_version_table.c.version])).scalar()
+    except sqlalchemy.exc.DBAPIError:
+        # table does not exist (yet)
+        pass
+    # DBs set up before the schema was versioned have the tables of version 1
+    return 1 if "users" in sqlalchemy.inspect(engine).get_table_names() else None
+
 
 class SessionCreator:
     """
@@ -35,9 +87,23 @@ class SessionCreator:
         # create DB engine
         # connection string abstraced into environment to make DB agnostic
         engine = create_engine(os.environ.get("LOL_WATCHBOT_DB_CONNECTION_STRING"))
+        # all models need to be known to resolve the relationships between them
+        _import_all_tables()
 
-        # create all required tables from the "tables" module
-        bot_declarative_base.metadata.create_all(bind=engine)
+        # creating all tables means one round-trip per table > only do it when the schema changed
+        stored_version = _read_schema_version(engine)
+        if stored_version != _SCHEMA_VERSION:
+            logging.getLogger("lol_watchbot").info(
+                f"DB schema version {stored_version} != {_SCHEMA_VERSION}, creating tables..."
+            )
+            # create all required tables from the "tables" module
+            bot_declarative_base.metadata.create_all(bind=engine)
+            with engine.begin() as connection:
+                if stored_version is not None:
+                    # existing tables need to be upgraded
+                    migrations.run_migrations(connection, stored_version, _SCHEMA_VERSION)
+                connection.execute(_schema_version_table.delete())
+                connection.execute(_schema_version_table.insert().values(version=_SCHEMA_VERSION))
 
         # Initial creation of the SessionMaker
         self._session_creator = sqlalchemy.orm.sessionmaker(bind=engine)
@@ -0,0 +1,23 @@
+from bot.database_interface import bot_declarative_base
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Index
+
+
+class CacheInvalidation(bot_declarative_base):
+    """
+    Represents a change to cached data, published to all bot processes (see `invalidation_utils`)
+    """
+
+    __tablename__ = "cache_invalidations"
+
+    # doubles as the event's version: processes poll for IDs above the last one they've seen
+    # (and re-poll recent rows, see `DbPollingBus`)
+    id = Column(Integer, primary_key=True)
+    table_name = Column(String, nullable=False)
+    key = Column(String)
+    # the publishing process, which already invalidated its own caches
+    origin = Column(String(32), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (Index("cache_invalidation_created_at_idx", "created_at"),)
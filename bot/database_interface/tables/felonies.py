@@ -18,6 +18,16 @@ class Felony(bot_declarative_base):
     date_added = Column(DateTime, default=datetime.utcnow)
     date_closed = Column(DateTime)
     is_active = Column(Boolean, default=True)
+    # optional conditions; None matches any map / spells
+    map = Column(String)
+    # lower-cased spell names joined by "+", all of which the match's spells need to include
+    spells = Column(String)
     summons = relationship("Summon", back_populates="felony", cascade="all,delete")
+    exemptions = relationship("FelonyExemption", back_populates="felony", cascade="all,delete")
 
     # __table_args__ = (UniqueConstraint("champion", "is_active", name="only_one_active_champ_uc"),)
+
+
+# registers the related model, so the mappers can be configured wherever `Felony` is loaded
+# (module import, as `felony_exemptions` imports this module in turn)
+import bot.database_interface.tables.felony_exemptions  # noqa: E402, F401
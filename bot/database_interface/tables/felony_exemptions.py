@@ -0,0 +1,22 @@
+from bot.database_interface import bot_declarative_base
+from bot.database_interface.tables.felonies import Felony
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, BigInteger, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+
+
+class FelonyExemption(bot_declarative_base):
+    """
+    Represents a discord user whose accounts may play a felony's champion without being summoned
+    """
+
+    __tablename__ = "felony_exemptions"
+
+    id = Column(Integer, primary_key=True)
+    felony_id = Column(Integer, ForeignKey("felonies.id"), nullable=False)
+    felony = relationship("Felony", back_populates="exemptions")
+    discord_id = Column(BigInteger, nullable=False)
+    date_added = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (UniqueConstraint("felony_id", "discord_id", name="unique_exemption_uc"),)
@@ -0,0 +1,15 @@
+from bot.database_interface import bot_declarative_base
+
+from sqlalchemy import Column, Integer, BigInteger, Boolean
+
+
+class GuildSettings(bot_declarative_base):
+    """
+    Represents the (alerting) settings of a guild the bot is in
+    """
+
+    __tablename__ = "guild_settings"
+
+    id = Column(Integer, primary_key=True)
+    guild_id = Column(BigInteger, unique=True, nullable=False)
+    alerts_enabled = Column(Boolean, default=True)
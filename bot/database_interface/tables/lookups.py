@@ -0,0 +1,36 @@
+from bot.database_interface import bot_declarative_base
+
+from sqlalchemy import Column, Integer, String
+
+
+class Champion(bot_declarative_base):
+    """
+    Represents a (converted) champion name, referenced by matches
+    """
+
+    __tablename__ = "champions"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, nullable=False)
+
+
+class GameMap(bot_declarative_base):
+    """
+    Represents a map (game mode) name, referenced by matches
+    """
+
+    __tablename__ = "maps"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, nullable=False)
+
+
+class Spell(bot_declarative_base):
+    """
+    Represents a summoner spell name, referenced by matches
+    """
+
+    __tablename__ = "spells"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, nullable=False)
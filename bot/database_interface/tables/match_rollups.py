@@ -0,0 +1,23 @@
+from bot.database_interface import bot_declarative_base
+
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+
+
+class MatchRollup(bot_declarative_base):
+    """
+    Represents all (compacted) matches a registered user played on one champion on one day
+    """
+
+    __tablename__ = "match_rollups"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    user = relationship("User", back_populates="match_rollups")
+    day = Column(Date)
+    champion = Column(String)
+    games = Column(Integer, default=0)
+    abuse_games = Column(Integer, default=0)
+
+    # one row per user, day and champion
+    __table_args__ = (UniqueConstraint("user_id", "day", "champion", name="unique_rollup_uc"),)
@@ -1,10 +1,58 @@
 from bot.database_interface import bot_declarative_base
+from bot.database_interface.tables.lookups import Champion, GameMap, Spell
+from bot.database_interface.utils import lookup_utils
+from bot.common_utils import league_utils
 
+from typing import Any, Dict, Tuple
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import (
+    Column,
+    Integer,
+    SmallInteger,
+    BigInteger,
+    String,
+    Boolean,
+    DateTime,
+    ForeignKey,
+    Index,
+    event,
+    select,
+)
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 
 
+def _lookup_name(name: str, id_attribute: str, model: bot_declarative_base) -> hybrid_property:
+    """
+    Exposes an integer foreign key into a lookup table as the name it refers to,
+    both on instances (`match.champion`) and in queries (`session.query(Match.champion)`).
+    """
+    # names of new (unsaved) matches are kept on the instance until their IDs are known
+    pending_attribute = f"_pending_{name}"
+
+    def fget(self) -> str:
+        pending = self.__dict__.get(pending_attribute)
+        if pending is not None or getattr(self, id_attribute) is None:
+            return pending
+        return lookup_utils.get_lookup_cache(model).get_name(getattr(self, id_attribute))
+
+    def fset(self, value: str) -> None:
+        self.__dict__[pending_attribute] = value
+        # unknown names are resolved on insert, see `_resolve_lookup_ids`
+        setattr(self, id_attribute, lookup_utils.get_lookup_cache(model).peek_id(value))
+
+    def expression(cls):
+        # correlated subquery; hot queries join the lookup table instead
+        return (
+            select([model.name])
+            .where(model.id == getattr(cls, id_attribute))
+            .as_scalar()
+            .label(name)
+        )
+
+    return hybrid_property(fget=fget, fset=fset, expr=expression)
+
+
 class Match(bot_declarative_base):
     """
     Represents a LoL match played by a registered user
@@ -16,16 +64,75 @@ class Match(bot_declarative_base):
     played_at = Column(DateTime, default=datetime.utcnow)
     user_id = Column(Integer, ForeignKey("users.id"))
     user = relationship("User", back_populates="matches")
-    map = Column(String)
     is_abuse = Column(Boolean)
-    champion = Column(String)
-    summoner_one = Column(String)
-    summoner_two = Column(String)
+    # map, champion and spells are stored as IDs into small lookup tables
+    map_id = Column(SmallInteger, ForeignKey("maps.id"))
+    champion_id = Column(SmallInteger, ForeignKey("champions.id"))
+    summoner_one_id = Column(SmallInteger, ForeignKey("spells.id"))
+    summoner_two_id = Column(SmallInteger, ForeignKey("spells.id"))
+    # ID of the LoL game, if the live-game provider exposes it
+    game_id = Column(BigInteger)
+    # unique key of the match's journal record, see `journal_utils`
+    journal_key = Column(String(32))
+
+    # public name > (ID column, lookup table)
+    lookup_attributes = {
+        "map": ("map_id", GameMap),
+        "champion": ("champion_id", Champion),
+        "summoner_one": ("summoner_one_id", Spell),
+        "summoner_two": ("summoner_two_id", Spell),
+    }
+    map = _lookup_name("map", "map_id", GameMap)
+    champion = _lookup_name("champion", "champion_id", Champion)
+    summoner_one = _lookup_name("summoner_one", "summoner_one_id", Spell)
+    summoner_two = _lookup_name("summoner_two", "summoner_two_id", Spell)
+
+    __table_args__ = (
+        Index("match_user_game_idx", "user_id", "game_id"),
+        Index("match_journal_key_idx", "journal_key", unique=True),
+    )
+
+    def _get_lookup_key(self) -> Tuple[Any, ...]:
+        # IDs where known; only names new to the lookup tables fall back to the name
+        return tuple(
+            getattr(self, id_attribute) or getattr(self, name)
+            for name, (id_attribute, _) in self.lookup_attributes.items()
+        )
 
     def has_almost_same_info(self, other: "Match") -> bool:
-        return (
-            (self.map == other.map)
-            and (self.champion == other.champion)
-            and (self.summoner_one == other.summoner_one)
-            and (self.summoner_two == other.summoner_two)
+        return self._get_lookup_key() == other._get_lookup_key()
+
+    @classmethod
+    def from_game_data(cls, user_id: int, game_data: Dict[str, Any]) -> "Match":
+        """
+        Constructs a match from the game data of a live-game provider.
+
+        Args:
+            user_id (int): ID of the User that played the match
+            game_data (Dict[str, Any]): as returned by `LiveGameProvider.get_live_game_data`
+
+        Returns:
+            Match: The (unsaved) match
+        """
+        return cls(
+            user_id=user_id,
+            map=game_data["game_mode"],
+            champion=league_utils._convert_champ_name(name=game_data["champion"]),
+            summoner_one=game_data["spells"][0],
+            summoner_two=game_data["spells"][1],
+            game_id=game_data.get("game_id"),
+            # the game's start, if known; else, the time of detection
+            played_at=game_data.get("started_at") or datetime.utcnow(),
         )
+
+
+@event.listens_for(Match, "before_insert")
+def _resolve_lookup_ids(mapper, connection, match: Match) -> None:
+    """
+    Resolves the names that weren't known to the lookup tables when they were set (adding them, if needed).
+    """
+    for name, (id_attribute, model) in Match.lookup_attributes.items():
+        pending = match.__dict__.get(f"_pending_{name}")
+        if getattr(match, id_attribute) is None and pending is not None:
+            cache = lookup_utils.get_lookup_cache(model)
+            setattr(match, id_attribute, cache.get_or_create_id(connection, pending))
@@ -0,0 +1,22 @@
+from bot.database_interface import bot_declarative_base
+
+from sqlalchemy import Column, Integer, Date, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+
+
+class SummonDailyBucket(bot_declarative_base):
+    """
+    Represents the summons a registered user collected on one day (pre-aggregated for leaderboards)
+    """
+
+    __tablename__ = "summon_daily_buckets"
+
+    id = Column(Integer, primary_key=True)
+    day = Column(Date, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    user = relationship("User", back_populates="summon_buckets")
+    points = Column(Integer, default=0)
+    count = Column(Integer, default=0)
+
+    # one row per user and day
+    __table_args__ = (UniqueConstraint("day", "user_id", name="unique_bucket_uc"),)
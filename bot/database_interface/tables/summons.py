@@ -3,7 +3,7 @@ from bot.database_interface.tables.users import User
 from bot.database_interface.tables.felonies import Felony
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 
@@ -21,5 +21,9 @@ class Summon(bot_declarative_base):
     felony = relationship("Felony", back_populates="summons")
     points = Column(Integer)
     date_added = Column(DateTime, default=datetime.utcnow)
+    # unique key of the summon's journal record, see `journal_utils`
+    journal_key = Column(String(32))
+
+    __table_args__ = (Index("summon_journal_key_idx", "journal_key", unique=True),)
 
     # __table_args__ = (UniqueConstraint("champion", "is_active", name="only_one_active_champ_uc"),)
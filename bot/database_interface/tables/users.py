@@ -1,5 +1,7 @@
 from bot.database_interface import bot_declarative_base
 from bot.database_interface.tables.matches import Match
+from bot.database_interface.tables.match_rollups import MatchRollup
+from bot.database_interface.tables.summon_buckets import SummonDailyBucket
 
 from typing import List
 import os
@@ -60,6 +62,8 @@ class User(bot_declarative_base):
     is_punished = Column(Boolean, default=False)
     matches = relationship("Match", back_populates="user", cascade="all,delete")
     summons = relationship("Summon", back_populates="user", cascade="all,delete")
+    match_rollups = relationship("MatchRollup", back_populates="user", cascade="all,delete")
+    summon_buckets = relationship("SummonDailyBucket", back_populates="user", cascade="all,delete")
 
     # account names on a server are unique
     __table_args__ = (UniqueConstraint("league_name", "server_name", name="unique_account_uc"),)
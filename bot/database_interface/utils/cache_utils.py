@@ -0,0 +1,102 @@
+from typing import List, Dict, Any, Optional, Tuple
+from collections import OrderedDict
+import os
+import threading
+
+from bot.database_interface import bot_declarative_base
+from bot.database_interface.tables.users import User
+from bot.database_interface.tables.guild_settings import GuildSettings
+from bot.database_interface.utils import query_utils
+
+
+class InstancesCache:
+    """
+    Caches all instances of a model (optionally filtered) as dictionaries, until invalidated.
+    Every write path touching the model needs to call `invalidate()`.
+    """
+
+    def __init__(self, model: bot_declarative_base, options: Optional[Dict[str, Any]] = None):
+        self.model = model
+        self.options = options
+        self._instances: Optional[List[Dict[str, Any]]] = None
+        # warm-up runs in an executor thread
+        self._lock = threading.Lock()
+
+    def get(self) -> List[Dict[str, Any]]:
+        """
+        Returns:
+            List[Dict[str, Any]]: All (cached) instances of the model
+        """
+        with self._lock:
+            if self._instances is None:
+                self._instances = query_utils.get_all_instances_of_something(
+                    model=self.model, options=self.options
+                )
+            return self._instances
+
+    def warm(self) -> int:
+        """
+        Loads the cache, if it isn't already.
+
+        Returns:
+            int: Amount of cached instances
+        """
+        return len(self.get())
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._instances = None
+
+
+# all linked LoL accounts
+accounts_cache = InstancesCache(model=User)
+# alerting settings of all guilds that changed them
+guild_settings_cache = InstancesCache(model=GuildSettings)
+
+
+def are_alerts_enabled(guild_id: int) -> bool:
+    """
+    Checks whether a guild receives alerts, without querying the DB.
+    Guilds without settings receive them, unless `LOL_WATCHBOT_ALERTS_OPT_IN` is set (to "true").
+
+    Args:
+        guild_id (int): ID of the guild
+
+    Returns:
+        bool: True, if alerts should be sent to the guild; False, if not.
+    """
+    for settings in guild_settings_cache.get():
+        if settings["guild_id"] == guild_id:
+            return settings["alerts_enabled"]
+    return os.environ.get("LOL_WATCHBOT_ALERTS_OPT_IN", "").lower() != "true"
+
+
+class RecentGamesCache:
+    """
+    Bounded LRU set of recently seen (user_id, game_id) pairs,
+    so a game detected in consecutive sweeps is recognized without querying the DB.
+    """
+
+    def __init__(self, max_size: int = 4096):
+        self.max_size = max_size
+        self._games: "OrderedDict[Tuple[int, int], None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key: Tuple[int, int]) -> bool:
+        with self._lock:
+            if key not in self._games:
+                return False
+            self._games.move_to_end(key)
+            return True
+
+    def add(self, key: Tuple[int, int]) -> None:
+        with self._lock:
+            self._games[key] = None
+            self._games.move_to_end(key)
+            if len(self._games) > self.max_size:
+                # evict the least recently seen game
+                self._games.popitem(last=False)
+
+
+# games already saved (or known to be saved) as matches
+recent_games_cache = RecentGamesCache()
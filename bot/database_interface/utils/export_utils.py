@@ -0,0 +1,137 @@
+from typing import Any, Dict, Iterator, IO, List
+from datetime import date, datetime
+import csv
+import enum
+import json
+
+from bot.database_interface.session.session_handler import session_scope
+from bot.database_interface.tables.users import User
+from bot.database_interface.tables.matches import Match
+from bot.database_interface.tables.match_rollups import MatchRollup
+from bot.database_interface.tables.summons import Summon
+from bot.database_interface.tables.felonies import Felony
+from bot.database_interface.tables.lookups import Champion, GameMap, Spell
+
+from sqlalchemy.orm import aliased
+
+_DEF_CHUNK_SIZE = 1000
+# both summoner spells of a match reference the spells table
+_SummonerOne, _SummonerTwo = aliased(Spell), aliased(Spell)
+
+# exportable kind > columns (labelled as in the exported rows) and the models they're joined over
+_EXPORT_COLUMNS = {
+    "matches": [
+        Match.id.label("match_id"),
+        Match.played_at,
+        User.discord_id,
+        User.league_name,
+        User.server_name,
+        GameMap.name.label("map"),
+        Champion.name.label("champion"),
+        _SummonerOne.name.label("summoner_one"),
+        _SummonerTwo.name.label("summoner_two"),
+        Match.is_abuse,
+    ],
+    "summons": [
+        Summon.id.label("summon_id"),
+        Summon.date_added,
+        User.discord_id,
+        User.league_name,
+        User.server_name,
+        Felony.champion,
+        Summon.points,
+    ],
+    "match_rollups": [
+        MatchRollup.day,
+        User.discord_id,
+        User.league_name,
+        User.server_name,
+        MatchRollup.champion,
+        MatchRollup.games,
+        MatchRollup.abuse_games,
+    ],
+}
+
+
+def get_export_kinds() -> List[str]:
+    return list(_EXPORT_COLUMNS)
+
+
+def get_export_header(kind: str) -> List[str]:
+    return [column.key for column in _EXPORT_COLUMNS[kind]]
+
+
+def _to_serializable(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def stream_rows(kind: str, chunk_size: int = _DEF_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Streams all rows of `kind`, joined with their User (and Felony), as dictionaries.
+    Uses a server-side cursor and fetches `chunk_size` rows at a time,
+    so memory usage stays constant no matter how many rows are exported.
+
+    Args:
+        kind (str): One of `get_export_kinds()`
+        chunk_size (int, optional): Rows fetched per round-trip. Defaults to 1000.
+
+    Yields:
+        Dict[str, Any]: One row, with JSON-serializable values
+    """
+    columns = _EXPORT_COLUMNS[kind]
+    header = get_export_header(kind)
+    with session_scope() as session:
+        query = session.query(*columns)
+        if kind == "matches":
+            query = (
+                query.join(User, Match.user_id == User.id)
+                .outerjoin(GameMap, Match.map_id == GameMap.id)
+                .outerjoin(Champion, Match.champion_id == Champion.id)
+                .outerjoin(_SummonerOne, Match.summoner_one_id == _SummonerOne.id)
+                .outerjoin(_SummonerTwo, Match.summoner_two_id == _SummonerTwo.id)
+                .order_by(Match.id)
+            )
+        elif kind == "summons":
+            query = (
+                query.join(User, Summon.user_id == User.id)
+                .join(Felony, Summon.felony_id == Felony.id)
+                .order_by(Summon.id)
+            )
+        else:
+            query = query.join(User, MatchRollup.user_id == User.id).order_by(MatchRollup.id)
+
+        for row in query.execution_options(stream_results=True).yield_per(chunk_size):
+            yield {key: _to_serializable(value) for key, value in zip(header, row)}
+
+
+def write_jsonl(rows: Iterator[Dict[str, Any]], out: IO[str]) -> int:
+    """
+    Writes rows as JSON lines.
+
+    Returns:
+        int: Amount of written rows
+    """
+    n_rows = 0
+    for n_rows, row in enumerate(rows, start=1):
+        out.write(json.dumps(row, ensure_ascii=False))
+        out.write("\n")
+    return n_rows
+
+
+def write_csv(rows: Iterator[Dict[str, Any]], out: IO[str], header: List[str]) -> int:
+    """
+    Writes rows as CSV (with a header line).
+
+    Returns:
+        int: Amount of written rows
+    """
+    writer = csv.DictWriter(out, fieldnames=header)
+    writer.writeheader()
+    n_rows = 0
+    for n_rows, row in enumerate(rows, start=1):
+        writer.writerow(row)
+    return n_rows
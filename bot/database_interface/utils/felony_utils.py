@@ -0,0 +1,159 @@
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional
+from datetime import datetime
+import threading
+
+from bot.database_interface.session.session_handler import session_scope
+from bot.database_interface.tables.felonies import Felony
+from bot.database_interface.tables.felony_exemptions import FelonyExemption
+
+
+def normalize_spells(spells: Iterable[str]) -> Optional[str]:
+    """
+    Normalizes summoner spells into how a felony stores them, e.g. ["Ignite", "flash"] > "flash+ignite".
+
+    Returns:
+        Optional[str]: The normalized spells; None, if there are none.
+    """
+    spells = sorted({spell.strip().lower() for spell in spells if spell and spell.strip()})
+    return "+".join(spells) or None
+
+
+class FelonyRule(NamedTuple):
+    """
+    An active felony, compiled for evaluation: its conditions beyond the champion and its exemptions.
+    """
+
+    id: int
+    points: int
+    date_added: datetime
+    # lower-cased; None matches any map
+    map: Optional[str]
+    # lower-cased; the match's spells need to include all of them
+    spells: FrozenSet[str]
+    exempt_discord_ids: FrozenSet[int]
+
+    @classmethod
+    def from_felony(cls, felony: Felony, exempt_discord_ids: Iterable[int]) -> "FelonyRule":
+        return cls(
+            id=felony.id,
+            points=felony.points,
+            date_added=felony.date_added,
+            map=felony.map.lower() if felony.map else None,
+            spells=frozenset(felony.spells.split("+")) if felony.spells else frozenset(),
+            exempt_discord_ids=frozenset(exempt_discord_ids),
+        )
+
+    @property
+    def specificity(self) -> int:
+        return (self.map is not None) + len(self.spells)
+
+    def matches(self, map_name: str, spells: FrozenSet[str], discord_id: int) -> bool:
+        return (
+            (self.map is None or self.map == map_name)
+            and self.spells <= spells
+            and discord_id not in self.exempt_discord_ids
+        )
+
+
+class FelonyIndex:
+    """
+    All active felonies, compiled into an in-memory index keyed by champion.
+    A match only evaluates the (few) rules of its champion, so it costs the same for any amount of felonies.
+    The index is rebuilt per champion, whenever felonies of that champion (or their exemptions) change.
+    """
+
+    def __init__(self):
+        # champion > its rules, most specific (then latest) first
+        self._rules: Optional[Dict[str, List[FelonyRule]]] = None
+        # warm-up runs in an executor thread
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _compile(champions: Optional[Iterable[str]] = None) -> Dict[str, List[FelonyRule]]:
+        """
+        Loads and compiles the active felonies (of some champions, or all).
+        """
+        with session_scope() as session:
+            query = session.query(Felony).filter_by(is_active=True)
+            if champions is not None:
+                query = query.filter(Felony.champion.in_(list(champions)))
+            felonies = query.all()
+            exemptions: Dict[int, List[int]] = {}
+            if felonies:
+                for felony_id, discord_id in session.query(
+                    FelonyExemption.felony_id, FelonyExemption.discord_id
+                ).filter(FelonyExemption.felony_id.in_([felony.id for felony in felonies])):
+                    exemptions.setdefault(felony_id, []).append(discord_id)
+
+            rules: Dict[str, List[FelonyRule]] = {}
+            for felony in felonies:
+                rule = FelonyRule.from_felony(felony, exemptions.get(felony.id, ()))
+                rules.setdefault(felony.champion, []).append(rule)
+        for champion_rules in rules.values():
+            champion_rules.sort(key=lambda r: (r.specificity, r.date_added), reverse=True)
+        return rules
+
+    def _get_rules(self) -> Dict[str, List[FelonyRule]]:
+        with self._lock:
+            if self._rules is None:
+                self._rules = self._compile()
+            return self._rules
+
+    def warm(self) -> int:
+        """
+        Compiles the index, if it isn't already.
+
+        Returns:
+            int: Amount of active felonies
+        """
+        return sum(len(rules) for rules in self._get_rules().values())
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._rules = None
+
+    def refresh(self, champion: str) -> None:
+        """
+        Recompiles the rules of a champion, after its felonies (or their exemptions) changed.
+
+        Args:
+            champion (str): (converted) champion name
+        """
+        if self._rules is None:
+            # compiled completely on first use anyway
+            return
+        rules = self._compile(champions=[champion])
+        with self._lock:
+            if champion in rules:
+                self._rules[champion] = rules[champion]
+            else:
+                self._rules.pop(champion, None)
+
+    def evaluate(
+        self, champion: str, map_name: Optional[str], spells: Iterable[str], discord_id: int
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Finds the felony committed by a match, without querying the DB.
+
+        Args:
+            champion (str): (converted) champion name
+            map_name (Optional[str]): the match's map
+            spells (Iterable[str]): the match's summoner spells
+            discord_id (int): discord ID of the player
+
+        Returns:
+            Optional[Dict[str, Any]]: The most specific (then latest) felony's `id` and `points`; None, if it's no felony.
+        """
+        rules = self._get_rules().get(champion)
+        if not rules:
+            return None
+        map_name = map_name.lower() if map_name else None
+        spells = frozenset(spell.lower() for spell in spells if spell)
+        for rule in rules:
+            if rule.matches(map_name=map_name, spells=spells, discord_id=discord_id):
+                return {"id": rule.id, "points": rule.points}
+        return None
+
+
+# all active felonies
+felony_index = FelonyIndex()
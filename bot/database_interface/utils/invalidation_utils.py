@@ -0,0 +1,254 @@
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from datetime import datetime, timedelta
+import os
+import json
+import time
+import uuid
+import socket
+import logging
+import threading
+
+from sqlalchemy import func, or_
+
+from bot.database_interface.session.session_handler import session_scope
+from bot.database_interface.tables.cache_invalidations import CacheInvalidation
+
+# which bus to use, one of `_BUSES`' keys
+_DEF_BUS_NAME = "db"
+# published events are kept this long (processes poll far more often)
+_DEF_EVENT_TTL_SECONDS = 3600.0
+# db bus: rows this recent are polled again, as IDs are assigned in insert (not commit) order
+_DEF_OVERLAP_SECONDS = 60.0
+# local socket bus: port this process listens on (0: any free one), and "host:port" of the other processes
+_DEF_SOCKET_PORT = int(os.environ.get("LOL_WATCHBOT_INVALIDATION_PORT", 0))
+_DEF_SOCKET_PEERS = os.environ.get("LOL_WATCHBOT_INVALIDATION_PEERS", "")
+
+
+def _get_internal_logger() -> logging.Logger:
+    return logging.getLogger("lol_watchbot")
+
+
+class InvalidationEvent(NamedTuple):
+    """
+    A change to cached data: the changed table, the affected key (None: everything) and a version.
+    """
+
+    table: str
+    key: Optional[str]
+    version: int
+    origin: str
+
+
+class InvalidationBus(ABC):
+    """
+    Publishes changes to cached data to the other bot processes,
+    and drops the affected cache entries of this process when they publish changes.
+    The publishing process invalidates its own caches directly (as every write path already does).
+    """
+
+    name: str = ""
+
+    def __init__(self):
+        # ID of this process, so it skips its own events
+        self.origin = uuid.uuid4().hex
+        self._subscribers: Dict[str, List[Callable[[Optional[str]], None]]] = {}
+
+    def subscribe(self, table: str, callback: Callable[[Optional[str]], None]) -> None:
+        """
+        Registers a callback, called with the key of every change to `table` published by another process.
+        """
+        self._subscribers.setdefault(table, []).append(callback)
+
+    def publish(self, table: str, key: Optional[object] = None) -> None:
+        """
+        Publishes a change to the other processes. Never raises:
+        the change itself already happened, at worst the other processes serve stale data for a while.
+
+        Args:
+            table (str): The changed table, e.g. "felonies"
+            key (Optional[object], optional): The affected key (e.g. a champion). Defaults to None (everything).
+        """
+        try:
+            self._send(table=table, key=None if key is None else str(key))
+        except Exception as e:
+            _get_internal_logger().error("Could not publish change to %s (%s): %s", table, key, e)
+
+    def poll(self) -> int:
+        """
+        Receives the changes published by the other processes, and calls their subscribers.
+
+        Returns:
+            int: Amount of received events
+        """
+        events = [event for event in self._receive() if event.origin != self.origin]
+        for event in events:
+            for callback in self._subscribers.get(event.table, []):
+                try:
+                    callback(event.key)
+                except Exception as e:
+                    # a failing subscriber must not keep the others (or later events) from running
+                    _get_internal_logger().error(
+                        "Could not apply change to %s (%s): %s", event.table, event.key, e
+                    )
+        return len(events)
+
+    @abstractmethod
+    def _send(self, table: str, key: Optional[str]) -> None:
+        pass
+
+    @abstractmethod
+    def _receive(self) -> List[InvalidationEvent]:
+        """
+        Returns:
+            List[InvalidationEvent]: The events published since the last call (including own ones)
+        """
+
+
+class DbPollingBus(InvalidationBus):
+    """
+    Publishes events as rows of the `cache_invalidations` table; processes poll for rows above the last seen ID.
+    Needs nothing but the DB all processes share already.
+    IDs are assigned on insert, so a row may commit after a higher one (e.g. on Postgres):
+    rows of the last `overlap` seconds are polled again, skipping the IDs already seen.
+    """
+
+    name = "db"
+
+    def __init__(self, ttl: float = _DEF_EVENT_TTL_SECONDS, overlap: float = _DEF_OVERLAP_SECONDS):
+        super().__init__()
+        self.ttl = ttl
+        self.overlap = overlap
+        self._last_version: Optional[int] = None
+        # ID > creation time of the rows seen within the overlap window
+        self._seen: Dict[int, datetime] = {}
+        self._last_pruned_at = time.monotonic()
+
+    def _send(self, table: str, key: Optional[str]) -> None:
+        with session_scope() as session:
+            session.add(CacheInvalidation(table_name=table, key=key, origin=self.origin))
+
+    def _receive(self) -> List[InvalidationEvent]:
+        overlap_start = datetime.utcnow() - timedelta(seconds=self.overlap)
+        with session_scope() as session:
+            if self._last_version is None:
+                # caches are loaded after the start anyway > only events from now on matter
+                self._last_version = session.query(func.max(CacheInvalidation.id)).scalar() or 0
+                self._seen = dict(
+                    session.query(CacheInvalidation.id, CacheInvalidation.created_at).filter(
+                        CacheInvalidation.created_at >= overlap_start
+                    )
+                )
+                return []
+            rows = (
+                session.query(
+                    CacheInvalidation.table_name,
+                    CacheInvalidation.key,
+                    CacheInvalidation.id,
+                    CacheInvalidation.origin,
+                    CacheInvalidation.created_at,
+                )
+                .filter(
+                    or_(
+                        CacheInvalidation.id > self._last_version,
+                        CacheInvalidation.created_at >= overlap_start,
+                    )
+                )
+                .order_by(CacheInvalidation.id)
+                .all()
+            )
+            if time.monotonic() - self._last_pruned_at > self.ttl:
+                # every process prunes now and then; deleting twice is harmless
+                self._last_pruned_at = time.monotonic()
+                session.query(CacheInvalidation).filter(
+                    CacheInvalidation.created_at < datetime.utcnow() - timedelta(seconds=self.ttl)
+                ).delete(synchronize_session=False)
+
+        events = []
+        for table_name, key, version, origin, created_at in rows:
+            if version in self._seen:
+                continue
+            self._seen[version] = created_at or datetime.utcnow()
+            self._last_version = max(self._last_version, version)
+            events.append(InvalidationEvent(table_name, key, version, origin))
+        # rows older than the window aren't polled again (and are at most the last seen ID)
+        self._seen = {
+            version: created_at
+            for version, created_at in self._seen.items()
+            if created_at >= overlap_start or version == self._last_version
+        }
+        return events
+
+
+class LocalSocketBus(InvalidationBus):
+    """
+    Sends events as UDP datagrams to the other processes on this machine, without touching the DB.
+    Meant for tests and local multi-process setups; datagrams may get lost under load.
+    """
+
+    name = "socket"
+
+    def __init__(self, port: int = _DEF_SOCKET_PORT, peers: Optional[List[Tuple[str, int]]] = None):
+        super().__init__()
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.bind(("127.0.0.1", port))
+        self._socket.setblocking(False)
+        if peers is None:
+            peers = [
+                (host, int(peer_port))
+                for host, _, peer_port in (
+                    peer.strip().rpartition(":") for peer in _DEF_SOCKET_PEERS.split(",") if peer
+                )
+            ]
+        self.peers = peers
+        self._version = 0
+        self._lock = threading.Lock()
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._socket.getsockname()
+
+    def _send(self, table: str, key: Optional[str]) -> None:
+        with self._lock:
+            self._version += 1
+            event = InvalidationEvent(table, key, self._version, self.origin)
+        datagram = json.dumps(event._asdict()).encode("utf-8")
+        for peer in self.peers:
+            self._socket.sendto(datagram, peer)
+
+    def _receive(self) -> List[InvalidationEvent]:
+        events = []
+        while True:
+            try:
+                datagram, _ = self._socket.recvfrom(65536)
+            except BlockingIOError:
+                return events
+            try:
+                events.append(InvalidationEvent(**json.loads(datagram)))
+            except Exception as e:
+                # e.g. a truncated or foreign datagram > skip it, keep receiving the others
+                _get_internal_logger().warning("Dropped malformed invalidation datagram: %s", e)
+
+
+_BUSES = {bus.name: bus for bus in (DbPollingBus, LocalSocketBus)}
+_invalidation_bus: Optional[InvalidationBus] = None
+
+
+def get_invalidation_bus() -> InvalidationBus:
+    """
+    Returns the (process-wide) invalidation bus,
+    chosen by the `LOL_WATCHBOT_INVALIDATION_BUS` environment variable.
+
+    Raises:
+        ValueError: If the configured bus does not exist
+
+    Returns:
+        InvalidationBus: The configured bus
+    """
+    global _invalidation_bus
+    if _invalidation_bus is None:
+        name = os.environ.get("LOL_WATCHBOT_INVALIDATION_BUS", _DEF_BUS_NAME).lower()
+        if name not in _BUSES:
+            raise ValueError(f"Invalidation bus needs to be one of {list(_BUSES)}!")
+        _invalidation_bus = _BUSES[name]()
+    return _invalidation_bus
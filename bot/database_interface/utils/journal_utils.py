@@ -0,0 +1,320 @@
+from typing import Any, Dict, Iterator, List, Optional
+from datetime import datetime
+import os
+import json
+import uuid
+import fcntl
+import logging
+import threading
+
+from sqlalchemy import DateTime
+import sqlalchemy.exc
+
+from bot.database_interface import bot_declarative_base
+from bot.database_interface.session.session_handler import session_scope
+from bot.database_interface.tables.matches import Match
+from bot.database_interface.tables.summons import Summon
+from bot.database_interface.tables.users import User
+from bot.database_interface.utils import (
+    invalidation_utils,
+    leaderboard_utils,
+    lookup_utils,
+    query_utils,
+)
+from bot.common_utils import stats_utils
+
+# directory of the journal files
+_DEF_JOURNAL_DIR = os.environ.get("LOL_WATCHBOT_JOURNAL_DIR", "journal")
+# the files new records are appended to (one per process, locked by it); sealed into a `.sealed` file for every flush
+_ACTIVE_SUFFIX = ".active"
+_SEALED_SUFFIX = ".sealed"
+# held while a process flushes the sealed files (of all processes sharing the directory)
+_FLUSH_LOCK_FILE_NAME = "flush.lock"
+# records (and lines) that can't be written, kept for inspection instead of blocking all newer ones
+_POISON_FILE_NAME = "poison.jsonl"
+# bound parameters per `IN (...)`; SQLite allows at most 999
+_DEF_IN_CHUNK_SIZE = 500
+# errors of the DB (connection) itself > the file is retried by the next flush
+_TRANSIENT_ERRORS = (
+    sqlalchemy.exc.OperationalError,
+    sqlalchemy.exc.TimeoutError,
+    sqlalchemy.exc.DisconnectionError,
+)
+# errors of a bad record (rejected by the DB, or not even a valid row) > it's quarantined
+_DATA_ERRORS = (
+    sqlalchemy.exc.IntegrityError,
+    sqlalchemy.exc.DataError,
+    ValueError,
+    KeyError,
+    TypeError,
+)
+
+# journaled record kind > model
+_MODELS = {"match": Match, "summon": Summon}
+
+
+def _get_internal_logger() -> logging.Logger:
+    return logging.getLogger("lol_watchbot")
+
+
+def _chunk(values: List[Any], size: int = _DEF_IN_CHUNK_SIZE) -> Iterator[List[Any]]:
+    for i in range(0, len(values), size):
+        yield values[i : i + size]
+
+
+def _to_record(kind: str, instance: bot_declarative_base, discord_id: int) -> Dict[str, Any]:
+    row = query_utils.object_as_dict(instance)
+    row.pop("id")
+    # IDs of lookup tables may not be known yet > journal the names
+    for name, (id_attribute, _) in getattr(instance, "lookup_attributes", {}).items():
+        row.pop(id_attribute)
+        row[name] = getattr(instance, name)
+    row = {k: v.isoformat() if isinstance(v, datetime) else v for k, v in row.items()}
+    return {"kind": kind, "discord_id": discord_id, "row": row}
+
+
+def _is_data_error(error: Exception) -> bool:
+    if isinstance(error, _TRANSIENT_ERRORS):
+        return False
+    if isinstance(error, sqlalchemy.exc.DBAPIError) and error.connection_invalidated:
+        return False
+    return isinstance(error, _DATA_ERRORS)
+
+
+def _from_record(record: Dict[str, Any]) -> bot_declarative_base:
+    model = _MODELS[record["kind"]]
+    row = dict(record["row"])
+    for column in model.__table__.columns:
+        if isinstance(column.type, DateTime) and row.get(column.name) is not None:
+            row[column.name] = datetime.fromisoformat(row[column.name])
+    return model(**row)
+
+
+class WriteJournal:
+    """
+    Write-behind journal of new `Match` and `Summon` rows.
+    The sweep only appends to a local file; `flush()` (run periodically in the background) writes
+    the journaled rows to the DB in one transaction per journal file.
+    Processes may share the directory: each appends to an active file of its own, and one flushes at a time.
+    Every row carries a unique `journal_key`, so replaying a file that was (partly) written already is a no-op.
+    """
+
+    def __init__(self, directory: str = _DEF_JOURNAL_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._seal_orphaned_files()
+        self._open_active_file()
+        self._n_appended = self._n_synced = 0
+
+    def append(self, instance: bot_declarative_base, discord_id: int) -> None:
+        """
+        Journals a new (unsaved) match or summon; it's written to the DB by the next flush.
+
+        Args:
+            instance (bot_declarative_base): The new `Match` or `Summon`
+            discord_id (int): discord ID of the instance's user (to invalidate their caches once it's written)
+        """
+        kind = "match" if isinstance(instance, Match) else "summon"
+        instance.journal_key = uuid.uuid4().hex
+        line = json.dumps(_to_record(kind=kind, instance=instance, discord_id=discord_id))
+        with self._lock:
+            self._file.write(line + "\n")
+            # hand it to the OS right away (survives a crash of the bot); fsync is batched in `sync()`
+            self._file.flush()
+            self._n_appended += 1
+
+    def sync(self) -> None:
+        """
+        Forces all appended records to disk, with a single fsync.
+        """
+        with self._lock:
+            if self._n_synced != self._n_appended:
+                os.fsync(self._file.fileno())
+                self._n_synced = self._n_appended
+
+    def _make_sealed_path(self) -> str:
+        # sealed files are flushed in order of their names
+        name = f"journal-{datetime.utcnow():%Y%m%d%H%M%S%f}-{uuid.uuid4().hex[:8]}.jsonl{_SEALED_SUFFIX}"
+        return os.path.join(self.directory, name)
+
+    def _open_active_file(self) -> None:
+        # a new name for every active file > an orphaned file is never mistaken for its successor
+        path = os.path.join(self.directory, f"journal-{uuid.uuid4().hex}.jsonl")
+        self._file = open(path, "a", encoding="utf-8")
+        # locked as long as this process appends to it, and only then named as active
+        # (so no other process ever sees it unlocked)
+        fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        self._active_path = path + _ACTIVE_SUFFIX
+        os.replace(path, self._active_path)
+
+    def _seal_orphaned_files(self) -> None:
+        """
+        Seals the active files of processes that ended without a flush, so they're replayed by the first flush.
+        Active files of running processes are locked by them, and left alone.
+        """
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(_ACTIVE_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path, "a", encoding="utf-8") as f:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    os.replace(path, self._make_sealed_path())
+            except (BlockingIOError, FileNotFoundError):
+                # in use, or sealed by its process in the meantime
+                continue
+
+    def _seal_active_file(self) -> None:
+        with self._lock:
+            if not self._n_appended:
+                return
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            # renamed while still locked > never taken for an orphaned file
+            os.replace(self._active_path, self._make_sealed_path())
+            self._file.close()
+            self._open_active_file()
+            self._n_appended = self._n_synced = 0
+
+    def flush(self) -> int:
+        """
+        Writes all journaled records to the DB, oldest file first.
+        A file is only deleted once its records were written (or quarantined, see `_write_file`);
+        if the DB is unavailable, it's retried by the next flush.
+
+        Returns:
+            int: Amount of newly written rows
+        """
+        self._seal_active_file()
+        with open(os.path.join(self.directory, _FLUSH_LOCK_FILE_NAME), "a") as lock_file:
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # another process is flushing > whatever it doesn't pick up is written by the next flush
+                return 0
+            n_written = 0
+            sealed_names = sorted(
+                n for n in os.listdir(self.directory) if n.endswith(_SEALED_SUFFIX)
+            )
+            for name in sealed_names:
+                path = os.path.join(self.directory, name)
+                n_written += self._write_file(path)
+                os.remove(path)
+        return n_written
+
+    def _write_file(self, path: str) -> int:
+        """
+        Writes the records of a sealed file in one transaction. If a record is bad (see `_DATA_ERRORS`),
+        the records are written one by one instead, and the bad ones are quarantined.
+
+        Raises:
+            Exception: Any other error, e.g. the DB being unavailable (the file is retried by the next flush)
+
+        Returns:
+            int: Amount of newly written rows
+        """
+        records = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    # a crash cut off the last line
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError as e:
+                    self._quarantine(record=line.rstrip("\n"), error=e)
+
+        try:
+            return write_records(records)
+        except Exception as e:
+            if not _is_data_error(e):
+                raise
+            _get_internal_logger().exception(
+                "Could not write %s, writing its records one by one", path
+            )
+
+        n_written = 0
+        for record in records:
+            try:
+                n_written += write_records([record])
+            except Exception as e:
+                if not _is_data_error(e):
+                    raise
+                self._quarantine(record=record, error=e)
+        return n_written
+
+    def _quarantine(self, record: Any, error: Exception) -> None:
+        _get_internal_logger().error("Quarantined journal record %s: %r", record, error)
+        with open(os.path.join(self.directory, _POISON_FILE_NAME), "a", encoding="utf-8") as f:
+            f.write(json.dumps({"record": record, "error": repr(error)}) + "\n")
+
+
+def write_records(records: List[Dict[str, Any]]) -> int:
+    """
+    Writes journaled records to the DB in one transaction, skipping the ones written already.
+    New summons are also counted in their user's leaderboard bucket.
+
+    Returns:
+        int: Amount of newly written rows
+    """
+    keys = [record["row"]["journal_key"] for record in records]
+    user_ids = list({record["row"]["user_id"] for record in records})
+    # names new to the lookup tables are added up front, in a transaction of their own
+    lookup_utils.ensure_lookup_names(
+        model=Match, rows=[record["row"] for record in records if record["kind"] == "match"]
+    )
+    with session_scope() as session:
+        written_keys = set()
+        for model in _MODELS.values():
+            for chunk in _chunk(keys):
+                written_keys.update(
+                    key
+                    for (key,) in session.query(model.journal_key).filter(
+                        model.journal_key.in_(chunk)
+                    )
+                )
+        existing_user_ids = set()
+        for chunk in _chunk(user_ids):
+            existing_user_ids.update(
+                user_id for (user_id,) in session.query(User.id).filter(User.id.in_(chunk))
+            )
+
+        new_records = []
+        for record in records:
+            if record["row"]["journal_key"] in written_keys:
+                continue
+            if record["row"]["user_id"] not in existing_user_ids:
+                # the account was deleted since > its matches and summons went with it
+                _get_internal_logger().info(
+                    "Dropped journaled %s of deleted user %s",
+                    record["kind"],
+                    record["row"]["user_id"],
+                )
+                continue
+            new_records.append(record)
+        for record in new_records:
+            instance = _from_record(record)
+            if isinstance(instance, Summon):
+                leaderboard_utils.record_summon(session=session, summon=instance)
+            else:
+                session.add(instance)
+
+    for discord_id in {record["discord_id"] for record in new_records}:
+        stats_utils.invalidate_user_stats(discord_id=discord_id)
+        invalidation_utils.get_invalidation_bus().publish("matches", key=discord_id)
+    return len(new_records)
+
+
+_write_journal: Optional[WriteJournal] = None
+
+
+def get_write_journal() -> WriteJournal:
+    """
+    Returns:
+        WriteJournal: The (process-wide) journal
+    """
+    global _write_journal
+    if _write_journal is None:
+        _write_journal = WriteJournal()
+    return _write_journal
@@ -0,0 +1,85 @@
+from typing import Any, Dict, List, Optional
+from datetime import date, datetime, timedelta
+import os
+
+import sqlalchemy.orm
+from sqlalchemy import func
+
+from bot.database_interface.session.session_handler import session_scope
+from bot.database_interface.tables.users import User
+from bot.database_interface.tables.summons import Summon
+from bot.database_interface.tables.summon_buckets import SummonDailyBucket
+
+# leaderboard window > days it reaches back (None: since the season's start / all-time)
+LEADERBOARD_WINDOWS = {"week": 7, "month": 30, "season": None, "all": None}
+
+
+def _get_season_start() -> date:
+    """
+    Returns:
+        date: Start of the current season (`LOL_WATCHBOT_SEASON_START`, ISO format); defaults to January 1st.
+    """
+    season_start = os.environ.get("LOL_WATCHBOT_SEASON_START")
+    if season_start:
+        return date.fromisoformat(season_start)
+    return date(datetime.utcnow().year, 1, 1)
+
+
+def get_window_start(window: str) -> Optional[date]:
+    """
+    Args:
+        window (str): One of `LEADERBOARD_WINDOWS`
+
+    Returns:
+        Optional[date]: First day included in the window; None, for all-time.
+    """
+    if window == "season":
+        return _get_season_start()
+    if LEADERBOARD_WINDOWS[window] is None:
+        return None
+    return datetime.utcnow().date() - timedelta(days=LEADERBOARD_WINDOWS[window] - 1)
+
+
+def record_summon(session: sqlalchemy.orm.session.Session, summon: Summon) -> None:
+    """
+    Adds a summon, and adds it to its user's bucket of the day (in the same transaction).
+
+    Args:
+        session (Session): The session to add both in
+        summon (Summon): The new summon
+    """
+    session.add(summon)
+    day = (summon.date_added or datetime.utcnow()).date()
+    bucket = session.query(SummonDailyBucket).filter_by(day=day, user_id=summon.user_id).first()
+    if bucket is None:
+        bucket = SummonDailyBucket(day=day, user_id=summon.user_id, points=0, count=0)
+        session.add(bucket)
+    bucket.points += summon.points
+    bucket.count += 1
+
+
+def get_leaderboard(since: Optional[date] = None) -> List[Dict[str, Any]]:
+    """
+    Sums the daily buckets of every user (per discord user), optionally starting from a day.
+
+    Args:
+        since (Optional[date], optional): First day to include. Defaults to None (all-time).
+
+    Returns:
+        List[Dict[str, Any]]: {"discord_id", "points", "count"} per discord user, most points first
+    """
+    with session_scope() as session:
+        query = session.query(
+            User.discord_id,
+            func.sum(SummonDailyBucket.points),
+            func.sum(SummonDailyBucket.count),
+        ).join(User, SummonDailyBucket.user_id == User.id)
+        if since is not None:
+            query = query.filter(SummonDailyBucket.day >= since)
+        rows = query.group_by(User.discord_id).all()
+
+    leaderboard = [
+        {"discord_id": discord_id, "points": int(points), "count": int(count)}
+        for discord_id, points, count in rows
+    ]
+    return sorted(leaderboard, key=lambda i: i["points"], reverse=True)
@@ -0,0 +1,114 @@
+from typing import Any, Dict, Iterable, List, Optional, Set
+import threading
+
+from sqlalchemy import select
+from sqlalchemy.engine import Connection
+
+from bot.database_interface import bot_declarative_base
+from bot.database_interface.session.session_handler import session_scope
+from bot.database_interface.tables.lookups import Champion, GameMap, Spell
+
+
+class LookupCache:
+    """
+    All rows (name <> ID) of a lookup table, in memory; lookup tables only hold a few hundred names.
+    Only committed rows are ever cached, so a cached ID is always valid.
+    """
+
+    def __init__(self, model: bot_declarative_base):
+        self.model = model
+        self._ids: Optional[Dict[str, int]] = None
+        self._names: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def _load(self) -> None:
+        with session_scope() as session:
+            rows = session.query(self.model.id, self.model.name).all()
+        with self._lock:
+            self._ids = {name: id_ for id_, name in rows}
+            self._names = {id_: name for id_, name in rows}
+
+    def warm(self) -> int:
+        """
+        Loads the cache, if it isn't already.
+
+        Returns:
+            int: Amount of cached names
+        """
+        if self._ids is None:
+            self._load()
+        return len(self._ids)
+
+    def peek_id(self, name: str) -> Optional[int]:
+        """
+        Returns:
+            Optional[int]: The ID of a name, if it's cached; never queries the DB.
+        """
+        return (self._ids or {}).get(name)
+
+    def get_name(self, id_: int) -> Optional[str]:
+        """
+        Returns:
+            Optional[str]: The name of an ID; reloads the cache once, if the ID is unknown (e.g. added by another process).
+        """
+        if id_ not in self._names:
+            self._load()
+        return self._names.get(id_)
+
+    def ensure(self, names: Iterable[str]) -> None:
+        """
+        Adds all names not in the lookup table yet, in a transaction of their own, and caches their IDs.
+        """
+        self.warm()
+        missing = {name for name in names if name is not None and name not in self._ids}
+        if not missing:
+            return
+        with session_scope() as session:
+            # another process might have added some of them in the meantime
+            existing = {
+                name
+                for (name,) in session.query(self.model.name).filter(self.model.name.in_(missing))
+            }
+            session.add_all([self.model(name=name) for name in missing - existing])
+        self._load()
+
+    def get_or_create_id(self, connection: Connection, name: str) -> int:
+        """
+        Resolves a name within an ongoing transaction, adding it if needed.
+        The ID isn't cached, as the transaction might still be rolled back.
+        """
+        table = self.model.__table__
+        id_ = connection.execute(select([table.c.id]).where(table.c.name == name)).scalar()
+        if id_ is None:
+            id_ = connection.execute(table.insert().values(name=name)).inserted_primary_key[0]
+        return id_
+
+
+_lookup_caches = {model: LookupCache(model=model) for model in (Champion, GameMap, Spell)}
+
+
+def get_lookup_cache(model: bot_declarative_base) -> LookupCache:
+    return _lookup_caches[model]
+
+
+def warm_lookup_caches() -> int:
+    """
+    Returns:
+        int: Amount of cached names over all lookup tables
+    """
+    return sum(cache.warm() for cache in _lookup_caches.values())
+
+
+def ensure_lookup_names(model: bot_declarative_base, rows: List[Dict[str, Any]]) -> None:
+    """
+    Adds the names of rows (of a model with `lookup_attributes`) that are new to the lookup tables.
+
+    Args:
+        model (bot_declarative_base): e.g. `Match`
+        rows (List[Dict[str, Any]]): Rows with public (name) attributes, e.g. {"champion": "yasuo", ...}
+    """
+    names: Dict[bot_declarative_base, Set[str]] = {}
+    for name, (_, lookup_model) in model.lookup_attributes.items():
+        names.setdefault(lookup_model, set()).update(row.get(name) for row in rows)
+    for lookup_model, lookup_names in names.items():
+        get_lookup_cache(lookup_model).ensure(lookup_names)
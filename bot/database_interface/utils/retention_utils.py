@@ -0,0 +1,68 @@
+from typing import Dict, Tuple
+from datetime import datetime, date
+
+from bot.database_interface.session.session_handler import session_scope
+from bot.database_interface.tables.matches import Match
+from bot.database_interface.tables.match_rollups import MatchRollup
+from bot.database_interface.tables.lookups import Champion
+
+
+def compact_matches_chunk(older_than: datetime, chunk_size: int) -> int:
+    """
+    Rolls up to `chunk_size` of the oldest matches played before `older_than` into
+    per-user, per-day, per-champion `MatchRollup` rows, then deletes them.
+    Both happen in one transaction, so a match is never counted twice (or lost).
+
+    Args:
+        older_than (datetime): Only matches played before this point in time are compacted
+        chunk_size (int): Maximum amount of matches to compact
+
+    Returns:
+        int: Amount of compacted matches (0, if there's nothing left to compact)
+    """
+    with session_scope() as session:
+        matches = (
+            session.query(
+                Match.id,
+                Match.user_id,
+                Match.played_at,
+                Champion.name.label("champion"),
+                Match.is_abuse,
+            )
+            .outerjoin(Champion, Match.champion_id == Champion.id)
+            .filter(Match.played_at < older_than)
+            .order_by(Match.played_at)
+            .limit(chunk_size)
+            .all()
+        )
+        if not matches:
+            return 0
+
+        # (user_id, day, champion) > [games, abuse_games]
+        aggregates: Dict[Tuple[int, date, str], list] = {}
+        for match in matches:
+            key = (match.user_id, match.played_at.date(), match.champion)
+            counts = aggregates.setdefault(key, [0, 0])
+            counts[0] += 1
+            counts[1] += int(bool(match.is_abuse))
+
+        # merge into the already existing rollups of those days
+        days = {day for _, day, _ in aggregates}
+        existing = {
+            (rollup.user_id, rollup.day, rollup.champion): rollup
+            for rollup in session.query(MatchRollup).filter(MatchRollup.day.in_(days))
+        }
+        for (user_id, day, champion), (games, abuse_games) in aggregates.items():
+            rollup = existing.get((user_id, day, champion))
+            if rollup is None:
+                rollup = MatchRollup(
+                    user_id=user_id, day=day, champion=champion, games=0, abuse_games=0
+                )
+                session.add(rollup)
+            rollup.games += games
+            rollup.abuse_games += abuse_games
+
+        session.query(Match).filter(Match.id.in_([match.id for match in matches])).delete(
+            synchronize_session=False
+        )
+        return len(matches)
@@ -0,0 +1,112 @@
+from typing import Dict, List, Optional, Set
+from functools import lru_cache
+import os
+import json
+
+# bundled catalog; bump its "version" whenever champions or aliases are added
+_CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "champions.json")
+# minimum trigram similarity for a champion to be suggested
+_DEF_MIN_SIMILARITY = 0.3
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalizes a champion name or alias, e.g. "Rek'Sai" > "reksai", "J4" > "j4".
+    """
+    return "".join([c for c in name if c.isalnum()]).lower()
+
+
+def _trigrams(normalized: str) -> Set[str]:
+    # pad, so short names (and their first/last letters) still yield trigrams
+    padded = f"  {normalized} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _load_catalog():
+    with open(_CATALOG_PATH, encoding="utf-8") as f:
+        catalog = json.load(f)
+
+    # canonical key (normalized name, as stored in the DB) > display name
+    display_names: Dict[str, str] = {}
+    # normalized name or alias > canonical key
+    lookup: Dict[str, str] = {}
+    # riot's numeric champion ID > canonical key
+    ids: Dict[int, str] = {}
+    # trigram > normalized names/aliases containing it
+    trigram_index: Dict[str, Set[str]] = {}
+
+    for champion in catalog["champions"]:
+        key = normalize_name(champion["name"])
+        display_names[key] = champion["name"]
+        ids[champion["id"]] = key
+        for name in [champion["name"], *champion["aliases"]]:
+            normalized = normalize_name(name)
+            lookup[normalized] = key
+            for trigram in _trigrams(normalized):
+                trigram_index.setdefault(trigram, set()).add(normalized)
+
+    return catalog["version"], display_names, lookup, ids, trigram_index
+
+
+CATALOG_VERSION, _DISPLAY_NAMES, _LOOKUP, _IDS, _TRIGRAM_INDEX = _load_catalog()
+
+
+@lru_cache(maxsize=1024)
+def resolve_champion(name: str) -> Optional[str]:
+    """
+    Resolves a champion name or alias (any case, any punctuation) to its canonical key.
+
+    Args:
+        name (str): e.g. "Xin Zhao", "xin", "MF", "Kha'Zix"
+
+    Returns:
+        Optional[str]: The canonical key (e.g. "xinzhao"); None, if it's not a known champion.
+    """
+    return _LOOKUP.get(normalize_name(name))
+
+
+def get_champion_by_id(champion_id: int) -> Optional[str]:
+    """
+    Returns:
+        Optional[str]: The canonical key of riot's numeric champion ID; None, if unknown.
+    """
+    return _IDS.get(champion_id)
+
+
+def get_display_name(key: str) -> str:
+    """
+    Returns:
+        str: The display name of a canonical key (e.g. "reksai" > "Rek'Sai"), or the title-cased key if unknown.
+    """
+    return _DISPLAY_NAMES.get(key, key.title())
+
+
+@lru_cache(maxsize=1024)
+def suggest_champions(name: str, limit: int = 3) -> List[str]:
+    """
+    Suggests champions for a misspelled name, using the prebuilt trigram index.
+
+    Args:
+        name (str): The (misspelled) name
+        limit (int, optional): Maximum amount of suggestions. Defaults to 3.
+
+    Returns:
+        List[str]: Display names of the most similar champions, most similar first
+    """
+    trigrams = _trigrams(normalize_name(name))
+    # count shared trigrams only for names sharing at least one trigram
+    shared: Dict[str, int] = {}
+    for trigram in trigrams:
+        for candidate in _TRIGRAM_INDEX.get(trigram, ()):
+            shared[candidate] = shared.get(candidate, 0) + 1
+
+    scores: Dict[str, float] = {}
+    for candidate, n_shared in shared.items():
+        # dice coefficient of both trigram sets
+        similarity = 2 * n_shared / (len(trigrams) + len(_trigrams(candidate)))
+        key = _LOOKUP[candidate]
+        if similarity >= _DEF_MIN_SIMILARITY and similarity > scores.get(key, 0.0):
+            scores[key] = similarity
+
+    best = sorted(scores, key=lambda key: (-scores[key], key))[:limit]
+    return [_DISPLAY_NAMES[key] for key in best]
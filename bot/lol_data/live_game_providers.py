@@ -0,0 +1,255 @@
+from bot.common_utils.exceptions import OpGGParsingError
+from bot.lol_data import opgg_handler, champion_catalog
+from bot.common_utils import league_utils
+from bot.lol_data.resilience import resilient_get
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, Optional, Set
+from datetime import datetime, timedelta
+from urllib.parse import quote
+import os
+import logging
+from requests.exceptions import HTTPError
+
+# which provider to use for live-game lookups, one of `_PROVIDERS`' keys
+_DEF_PROVIDER_NAME = "opgg"
+# base URL of a Riot spectator-style JSON API; `{platform}` is replaced by the server's platform id
+_DEF_SPECTATOR_API_URL = "https://{platform}.api.riotgames.com"
+# accounts that didn't play for longer are skipped by the sweep (op.gg only); 0 disables the pre-filter
+_DEF_ACTIVE_WITHIN_DAYS = float(os.environ.get("LOL_WATCHBOT_MULTI_SEARCH_ACTIVE_DAYS", 7.0))
+
+# op.gg server names > Riot platform ids
+_PLATFORM_IDS = {
+    "br": "br1",
+    "eune": "eun1",
+    "euw": "euw1",
+    "jp": "jp1",
+    "kr": "kr",
+    "lan": "la1",
+    "las": "la2",
+    "na": "na1",
+    "oce": "oc1",
+    "ru": "ru",
+    "tr": "tr1",
+}
+
+# names as displayed by op.gg, so both providers yield the same data
+_MAP_NAMES = {11: "Summoner's Rift", 12: "Howling Abyss", 21: "Nexus Blitz"}
+_SPELL_NAMES = {
+    1: "Cleanse",
+    3: "Exhaust",
+    4: "Flash",
+    6: "Ghost",
+    7: "Heal",
+    11: "Smite",
+    12: "Teleport",
+    13: "Clarity",
+    14: "Ignite",
+    21: "Barrier",
+    32: "Mark",
+}
+
+
+def _get_internal_logger() -> logging.Logger:
+    return logging.getLogger("lol_watchbot")
+
+
+class LiveGameProvider(ABC):
+    """
+    Source of live-game information for LoL accounts.
+    """
+
+    name: str = ""
+
+    @abstractmethod
+    def get_live_game_data(self, league_name: str, server_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Looks up the live game of a summoner.
+
+        Args:
+            league_name (str): name of summoner to search for
+            server_name (str): (valid) server to look for
+
+        Raises:
+            OpGGUnavailableError: when the provider can't be reached (after retries)
+
+        Returns:
+            Optional[Dict[str, Any]]: game data (`game_mode`, `spells`, `champion`, `game_id`, `started_at`), if summoner is ingame; None, if not ingame
+        """
+
+    @abstractmethod
+    def does_account_exist(self, league_name: str, server_name: str) -> bool:
+        """
+        Verifies whether a summoner exists on a given server.
+
+        Returns:
+            bool: True, if summoner is valid. False, if invalid.
+        """
+
+    def get_accounts_worth_checking(
+        self, league_names: Iterable[str], server_name: str
+    ) -> Set[str]:
+        """
+        Cheaply pre-filters the summoners of a server before their live games are looked up one by one.
+        Providers without a batched lookup keep all of them.
+
+        Args:
+            league_names (Iterable[str]): names of summoners to check
+            server_name (str): (valid) server to look for
+
+        Raises:
+            OpGGUnavailableError: when the provider can't be reached (after retries)
+
+        Returns:
+            Set[str]: the (normalized, see `league_utils.normalize_summoner_name`) names whose live game should be looked up
+        """
+        return {league_utils.normalize_summoner_name(league_name) for league_name in league_names}
+
+
+class OpGGProvider(LiveGameProvider):
+    """
+    Scrapes the op.gg HTML pages.
+    """
+
+    name = "opgg"
+
+    def get_live_game_data(self, league_name: str, server_name: str) -> Optional[Dict[str, Any]]:
+        return opgg_handler.get_live_game_data_played(
+            league_name=league_name, server_name=server_name
+        )
+
+    def does_account_exist(self, league_name: str, server_name: str) -> bool:
+        return opgg_handler.verify_summoner_on_server(
+            league_name=league_name, server_name=server_name
+        )
+
+    def get_accounts_worth_checking(
+        self, league_names: Iterable[str], server_name: str
+    ) -> Set[str]:
+        if not _DEF_ACTIVE_WITHIN_DAYS:
+            return super().get_accounts_worth_checking(league_names, server_name)
+        # one multi-search request per few summoners instead of one spectator request each
+        return opgg_handler.get_recently_active_summoners(
+            league_names=league_names,
+            server_name=server_name,
+            active_within=timedelta(days=_DEF_ACTIVE_WITHIN_DAYS),
+        )
+
+
+class SpectatorApiProvider(LiveGameProvider):
+    """
+    Consumes a compact JSON API shaped like Riot's summoner-v4 and spectator-v4 endpoints.
+    The base URL is configurable, so a local stub server can stand in for the real API.
+    """
+
+    name = "spectator_api"
+
+    def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None):
+        self.base_url = base_url or os.environ.get(
+            "LOL_WATCHBOT_SPECTATOR_API_URL", _DEF_SPECTATOR_API_URL
+        )
+        api_key = api_key or os.environ.get("LOL_WATCHBOT_RIOT_API_KEY")
+        self.headers = {"accept": "application/json"}
+        if api_key:
+            self.headers["X-Riot-Token"] = api_key
+        # (server, lower-cased name) > encrypted summoner id; names rarely change, ids never do
+        self._summoner_ids: Dict[tuple, str] = {}
+
+    def _construct_url(self, server_name: str, path: str) -> str:
+        if server_name not in _PLATFORM_IDS:
+            raise OpGGParsingError(f"server needs to be one of\n`{list(_PLATFORM_IDS)}`!")
+        return self.base_url.format(platform=_PLATFORM_IDS[server_name]).rstrip("/") + path
+
+    def _get_json(self, url: str) -> Optional[Any]:
+        """
+        Returns:
+            Optional[Any]: The decoded JSON body; None, if the resource does not exist (404).
+        """
+        r = resilient_get(url=url, headers=self.headers)
+        if r.status_code == 404:
+            return None
+        try:
+            r.raise_for_status()
+        except HTTPError as e:
+            raise OpGGParsingError(f"Unsuccessful HTTP request for URL=`{url}`: {e}")
+        return r.json()
+
+    def _get_summoner_id(self, league_name: str, server_name: str) -> Optional[str]:
+        key = (server_name, league_name.lower())
+        if key not in self._summoner_ids:
+            summoner = self._get_json(
+                self._construct_url(
+                    server_name, f"/lol/summoner/v4/summoners/by-name/{quote(league_name)}"
+                )
+            )
+            if summoner is None:
+                return None
+            self._summoner_ids[key] = summoner["id"]
+        return self._summoner_ids[key]
+
+    def get_live_game_data(self, league_name: str, server_name: str) -> Optional[Dict[str, Any]]:
+        summoner_id = self._get_summoner_id(league_name=league_name, server_name=server_name)
+        if summoner_id is None:
+            _get_internal_logger().error("Summoner %s (%s) not found", league_name, server_name)
+            return None
+        game = self._get_json(
+            self._construct_url(
+                server_name, f"/lol/spectator/v4/active-games/by-summoner/{summoner_id}"
+            )
+        )
+        if game is None:
+            # 404 > not in a live game
+            return None
+
+        for participant in game["participants"]:
+            if participant.get("summonerId") == summoner_id or (
+                participant["summonerName"].lower() == league_name.lower()
+            ):
+                break
+        else:
+            raise OpGGParsingError(f"Could not locate summoner {league_name} in the live game!")
+
+        return {
+            "game_mode": _MAP_NAMES.get(game["mapId"], str(game["mapId"])),
+            "spells": [
+                _SPELL_NAMES.get(participant["spell1Id"], str(participant["spell1Id"])),
+                _SPELL_NAMES.get(participant["spell2Id"], str(participant["spell2Id"])),
+            ],
+            # champions missing in the bundled catalog keep their numeric ID
+            "champion": champion_catalog.get_champion_by_id(participant["championId"])
+            or str(participant["championId"]),
+            "game_id": game["gameId"],
+            # epoch milliseconds; 0 while the game is still loading
+            "started_at": (
+                datetime.utcfromtimestamp(game["gameStartTime"] / 1000)
+                if game.get("gameStartTime")
+                else None
+            ),
+        }
+
+    def does_account_exist(self, league_name: str, server_name: str) -> bool:
+        return self._get_summoner_id(league_name=league_name, server_name=server_name) is not None
+
+
+_PROVIDERS = {provider.name: provider for provider in (OpGGProvider, SpectatorApiProvider)}
+_live_game_provider: Optional[LiveGameProvider] = None
+
+
+def get_live_game_provider() -> LiveGameProvider:
+    """
+    Returns the (process-wide) live-game provider,
+    chosen by the `LOL_WATCHBOT_LIVE_GAME_PROVIDER` environment variable.
+
+    Raises:
+        ValueError: If the configured provider does not exist
+
+    Returns:
+        LiveGameProvider: The configured provider
+    """
+    global _live_game_provider
+    if _live_game_provider is None:
+        name = os.environ.get("LOL_WATCHBOT_LIVE_GAME_PROVIDER", _DEF_PROVIDER_NAME).lower()
+        if name not in _PROVIDERS:
+            raise ValueError(f"Live game provider needs to be one of {list(_PROVIDERS)}!")
+        _live_game_provider = _PROVIDERS[name]()
+    return _live_game_provider
@@ -1,15 +1,21 @@
 from bot.common_utils.exceptions import OpGGParsingError
 from bot.database_interface.tables.users import Server
 from bot.common_utils import league_utils
+from bot.lol_data import page_archive
+from bot.lol_data.resilience import resilient_get, resilient_read
 
-from typing import Tuple, Optional, Dict, Iterable
+from typing import Tuple, Optional, Dict, Iterable, List, Set, TYPE_CHECKING
+from datetime import datetime, timedelta
 from urllib.parse import quote_plus
-from bs4 import BeautifulSoup
 import re
 import logging
 import requests
 from requests.exceptions import HTTPError
 
+if TYPE_CHECKING:
+    # bs4 is slow to import > only imported once the first page is parsed
+    from bs4 import BeautifulSoup
+
 # standard headers for a "regular" user
 _HTTP_STANDARD_HEADERS = {
     "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/85.0.4183.83 Safari/537.36",
@@ -29,6 +35,22 @@ _OPGG_TEMPLATES = {
     "league": "https://{server}.op.gg/summoner/league/userName={ign}&",
 }
 
+# multi-search: the summaries (incl. recent games) of several summoners of a server in one page
+_OPGG_MULTI_SEARCH_TEMPLATE = "https://{server}.op.gg/multi/query={igns}"
+# summoners op.gg accepts per multi-search
+_MULTI_SEARCH_MAX_NAMES = 5
+
+# divs telling a spectator page's outcome (not in game / no such summoner) without parsing it
+_SPECTATOR_MARKER_RE = re.compile(
+    rb'<div[^>]*\bclass="[^"]*\b(SpectatorError|SummonerNotFoundLayout)\b', re.IGNORECASE
+)
+# bytes re-scanned per chunk, so markers split between two chunks are found
+_SPECTATOR_MARKER_OVERLAP = 256
+_STREAM_CHUNK_SIZE = 8192
+
+# fallbacks to find the game ID in the livegame page's scripts and the summoner's links
+_GAME_ID_RE = re.compile(r"(?:observer/id=|gameId[\"']?\s*[:=]\s*)(\d+)")
+
 
 def _get_internal_logger() -> logging.Logger:
     """
@@ -40,6 +62,21 @@ def _get_internal_logger() -> logging.Logger:
     return logging.getLogger("lol_watchbot")
 
 
+def _make_soup(content: bytes) -> "BeautifulSoup":
+    """
+    Parses an HTML page, importing bs4 on first use.
+
+    Args:
+        content (bytes): raw HTML
+
+    Returns:
+        BeautifulSoup: The parsed page
+    """
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(content, features="html.parser")
+
+
 def _validate_opgg_params(
     server_name: Optional[str] = None,
     mode: Optional[str] = None,
@@ -127,26 +164,29 @@ def _does_url_belong_to_valid_account(url: str) -> bool:
     Args:
         url (str): URL to request.
 
+    Raises:
+        OpGGUnavailableError: when op.gg can't be reached (after retries)
+
     Returns:
         bool: True, if the request yielded a valid op.gg; False, if not.
     """
     # get the default logger of the bot
     logger = _get_internal_logger()
     try:
-        # request the URL
-        r = requests.get(url=url, headers=_HTTP_STANDARD_HEADERS)
+        # request the URL (retried on temporary failures)
+        r = resilient_get(url=url, headers=_HTTP_STANDARD_HEADERS)
         r.raise_for_status()
     except HTTPError as e:
         # raise_for_status() raises HTTPError
-        logger.error(f"Unsuccessful HTTP request for URL=`{url}`")
+        logger.error("Unsuccessful HTTP request for URL=`%s`", url)
         return False
 
     # HTTP request was successful > check HTML content
-    soup = BeautifulSoup(r.content, features="html.parser")
+    soup = _make_soup(r.content)
     # if this class is found, the summoner could not be found (on that server)
     summoner_not_found_div = soup.find("div", {"class": "SummonerNotFoundLayout"})
     if summoner_not_found_div is not None:
-        logger.error(f"Summoner not found for URL=`{url}`")
+        logger.error("Summoner not found for URL=`%s`", url)
         return False
 
     # all verification steps passed > summoner name exists on that server
@@ -165,8 +205,8 @@ def verify_summoner_on_server(league_name: str, server_name: str) -> bool:
 
 
 def get_table_row_of_summoner_from_table(
-    table_bodies: Iterable[BeautifulSoup], league_name: str
-) -> BeautifulSoup:
+    table_bodies: Iterable["BeautifulSoup"], league_name: str
+) -> "BeautifulSoup":
     """
     Iterates over the live-game table, and returns the row of the `league_name`.
     Structure of the `table_bodies` looks like:
@@ -200,8 +240,46 @@ def get_table_row_of_summoner_from_table(
     raise ValueError(f"Could not locate summoner {league_name} in either of the table bodies!")
 
 
+def _extract_game_identity_from_live_game_soup(
+    soup: "BeautifulSoup", summoner_table_row: "BeautifulSoup"
+) -> Tuple[Optional[int], Optional[datetime]]:
+    """
+    Extracts the game's ID and start time from the opgg livegame HTML.
+    The ID is attached to the spectate button / observer link,
+    the start time is the unix timestamp the game timer counts up from.
+
+    Args:
+        soup (BeautifulSoup): The soup of the opgg livegame endpoint response
+        summoner_table_row (BeautifulSoup): The summoner's row of the live-game table
+
+    Returns:
+        Tuple[Optional[int], Optional[datetime]]: game ID and (UTC) start time; each None, if not found.
+    """
+    game_id = None
+    game_id_tag = soup.find(attrs={"data-game-id": True})
+    if game_id_tag is not None:
+        game_id = int(game_id_tag["data-game-id"])
+    else:
+        # e.g. "gameId: 4912345678" in a script, or "/match/observer/id=4912345678" in the summoner's links;
+        # not anywhere on the page, which may link other games (e.g. in widgets or ads)
+        texts = [script.string or "" for script in soup.find_all("script")]
+        texts += [link["href"] for link in summoner_table_row.find_all("a", href=True)]
+        for text in texts:
+            match = _GAME_ID_RE.search(text)
+            if match is not None:
+                game_id = int(match.group(1))
+                break
+
+    started_at = None
+    timer_tag = soup.find(attrs={"class": "_countdown", "data-datetime": True})
+    if timer_tag is not None:
+        started_at = datetime.utcfromtimestamp(int(timer_tag["data-datetime"]))
+
+    return game_id, started_at
+
+
 def _extract_data_from_live_game_soup(
-    soup: BeautifulSoup, league_name: str
+    soup: "BeautifulSoup", league_name: str
 ) -> Optional[Dict[str, str]]:
     """
     Extracts data from live-gaem played by scraping the opgg livegame HTML.
@@ -210,7 +288,7 @@ def _extract_data_from_live_game_soup(
         soup (BeautifulSoup): The soup of the opgg livegame endpoint response
 
     Returns:
-        Optional[Dict[str, str]]: None, if summoner not ingame; the champ name, if ingame.
+        Optional[Dict[str, str]]: None, if summoner not ingame; the game data (map, spells, champ, game ID and start), if ingame.
     """
     logger = _get_internal_logger()
     # if this div exists, the summoner is not currently in a live game
@@ -221,11 +299,15 @@ def _extract_data_from_live_game_soup(
     data = {}
     # GAME MODE (e.g. HA, SR etc.)
     data["game_mode"] = soup.find("small", {"class": "MapName"}).contents[0]
-
     # find both table bodies (1 for each team)
     table_bodies = soup.findAll("tbody", {"class": "Body"})
     summoner_table_row = get_table_row_of_summoner_from_table(table_bodies, league_name)
 
+    # GAME IDENTITY (used to tell games apart)
+    data["game_id"], data["started_at"] = _extract_game_identity_from_live_game_soup(
+        soup, summoner_table_row=summoner_table_row
+    )
+
     # SUMMONER SPELLS
     spell_container = summoner_table_row.find("td", {"class": "SummonerSpell Cell"})
     # one cell per summoner
@@ -237,10 +319,45 @@ def _extract_data_from_live_game_soup(
     # lower case and remove non alpha-chars
     data["champion"] = league_utils._convert_champ_name(champ_cell.find("a")["title"])
 
-    logger.info(f"\tFound data: {data}!")
+    logger.debug("\tFound data: %s!", data)
     return data
 
 
+def _read_spectator_page(url: str, r: requests.Response) -> Tuple[Optional[str], bytes]:
+    """
+    Reads a streamed spectator page only until its outcome is known:
+    if a not-in-game / not-found marker shows up, the connection is closed right away;
+    only pages of live games are read (and later parsed) completely.
+
+    Args:
+        url (str): The requested URL (to archive the page by)
+        r (requests.Response): The response, requested with `stream=True`
+
+    Returns:
+        Tuple[Optional[str], bytes]: the found marker ("SpectatorError" or "SummonerNotFoundLayout"),
+            None if there's a live game; and the body read so far.
+    """
+    if page_archive.get_page_archive() is not None:
+        # archived pages are replayed through the extractors later > they need to be complete
+        content = r.content
+        page_archive.maybe_archive(url=url, status=r.status_code, content=content)
+        marker = _SPECTATOR_MARKER_RE.search(content)
+        return (marker.group(1).decode() if marker else None), content
+
+    body = bytearray()
+    try:
+        for chunk in r.iter_content(chunk_size=_STREAM_CHUNK_SIZE):
+            search_from = max(0, len(body) - _SPECTATOR_MARKER_OVERLAP)
+            body += chunk
+            marker = _SPECTATOR_MARKER_RE.search(body, search_from)
+            if marker is not None:
+                return marker.group(1).decode(), bytes(body)
+    finally:
+        # releases the connection, without reading the rest of the body
+        r.close()
+    return None, bytes(body)
+
+
 def get_live_game_data_played(league_name: str, server_name: str) -> Optional[Dict[str, str]]:
     """
     Finds the currently played champion IF a given summoner is ingame;
@@ -250,6 +367,9 @@ def get_live_game_data_played(league_name: str, server_name: str) -> Optional[Di
         league_name (str): name of summoner to search for
         server_name (str): (valid) server to look for
 
+    Raises:
+        OpGGUnavailableError: when op.gg can't be reached (after retries)
+
     Returns:
         Optional[Dict[str, str]]: game data (map, summoners, champ), if summoner is ingame; None, if not ingame
     """
@@ -260,15 +380,132 @@ def get_live_game_data_played(league_name: str, server_name: str) -> Optional[Di
     url = construct_url_by_name_and_server(
         league_name=league_name, server_name=server_name, mode="spectator"
     )
-    logger.info(f"Retrieving live game for {league_name}...")
+    logger.debug("Retrieving live game for %s...", league_name)
 
-    # send the HTTP request
-    r = requests.get(url=url, headers=_HTTP_STANDARD_HEADERS)
-    try:
+    def read(r: requests.Response) -> Tuple[Optional[str], bytes]:
+        # don't try to scrape (or even download) an error page
         r.raise_for_status()
+        # most summoners aren't ingame > usually done after the first few KiB, without parsing
+        return _read_spectator_page(url=url, r=r)
+
+    # send the HTTP request and read the body on demand (both retried on temporary failures)
+    try:
+        marker, content = resilient_read(
+            url=url, read=read, headers=_HTTP_STANDARD_HEADERS, stream=True
+        )
     except HTTPError as e:
-        logger.error(f"Encountered error getting live game for {league_name}: {e}")
+        logger.error("Encountered error getting live game for %s: %s", league_name, e)
+        return None
+    if marker == "SpectatorError":
+        return None
+    if marker == "SummonerNotFoundLayout":
+        logger.error("Summoner not found for URL=`%s`", url)
+        return None
 
     # scrape champ played for given league_name
-    soup = BeautifulSoup(r.content, features="html.parser")
+    soup = _make_soup(content)
     return _extract_data_from_live_game_soup(soup, league_name)
+
+
+def construct_multi_search_url(league_names: List[str], server_name: str) -> str:
+    """
+    Constructs an OP.GG multi-search URL for several summoners of a server.
+
+    Args:
+        league_names (List[str]): lol ingame names (at most `_MULTI_SEARCH_MAX_NAMES`)
+        server_name (str): a (valid) league of legends server endpoint on op.gg
+
+    Raises:
+        OPGGParsingError: when input parameters are invalid
+
+    Returns:
+        str: a valid ready-to-query op.gg multi-search page.
+    """
+    if not league_names or len(league_names) > _MULTI_SEARCH_MAX_NAMES:
+        raise OpGGParsingError(f"multi-search needs 1 to {_MULTI_SEARCH_MAX_NAMES} names!")
+    for league_name in league_names:
+        _validate_opgg_params(server_name=server_name, league_name=league_name)
+
+    return _OPGG_MULTI_SEARCH_TEMPLATE.format(
+        server=server_name,
+        igns=quote_plus(",".join(league_names), encoding="UTF-8"),
+    )
+
+
+def _extract_last_played_from_multi_search_soup(
+    soup: "BeautifulSoup",
+) -> Dict[str, Optional[datetime]]:
+    """
+    Extracts when each found summoner last played from the opgg multi-search HTML.
+    Summoners that don't exist (on that server) have no row in the page.
+
+    Args:
+        soup (BeautifulSoup): The soup of the opgg multi-search endpoint response
+
+    Returns:
+        Dict[str, Optional[datetime]]: normalized name > (UTC) start of their latest game; None, if unknown.
+    """
+    last_played = {}
+    for row in soup.findAll("div", {"class": "MultiSearchResultRow"}):
+        name_tag = row.find("a", {"class": "SummonerName"})
+        if name_tag is None or not name_tag.contents:
+            continue
+        # recent games carry their (unix) start time, like the livegame timer
+        started_ats = [
+            datetime.utcfromtimestamp(int(tag["data-datetime"]))
+            for tag in row.findAll(attrs={"class": "_timeago", "data-datetime": True})
+        ]
+        name = league_utils.normalize_summoner_name(str(name_tag.contents[0]))
+        last_played[name] = max(started_ats, default=None)
+    return last_played
+
+
+def get_recently_active_summoners(
+    league_names: Iterable[str], server_name: str, active_within: timedelta
+) -> Set[str]:
+    """
+    Finds the summoners of a server worth a live-game lookup, with one multi-search request per
+    `_MULTI_SEARCH_MAX_NAMES` summoners: all but the ones shown as not having played within `active_within`.
+    Summoners whose status can't be told (failed request, unknown layout, missing from the page,
+    no recent games shown) are kept, so a broken multi-search only costs the requests it was meant to save.
+
+    Args:
+        league_names (Iterable[str]): names of summoners to check
+        server_name (str): (valid) server to look for
+        active_within (timedelta): how recently a summoner must have played to be kept
+
+    Raises:
+        OpGGUnavailableError: when op.gg can't be reached (after retries)
+
+    Returns:
+        Set[str]: the (normalized, see `league_utils.normalize_summoner_name`) names to look up
+    """
+    logger = _get_internal_logger()
+    league_names = list(league_names)
+    active_since = datetime.utcnow() - active_within
+    active = set()
+    for i in range(0, len(league_names), _MULTI_SEARCH_MAX_NAMES):
+        requested = league_names[i : i + _MULTI_SEARCH_MAX_NAMES]
+        url = construct_multi_search_url(league_names=requested, server_name=server_name)
+        r = resilient_get(url=url, headers=_HTTP_STANDARD_HEADERS)
+        try:
+            r.raise_for_status()
+        except HTTPError as e:
+            logger.error("Encountered error in multi-search of %s: %s", requested, e)
+            active.update(map(league_utils.normalize_summoner_name, requested))
+            continue
+
+        last_played = _extract_last_played_from_multi_search_soup(_make_soup(r.content))
+        if not last_played:
+            # nobody found at all is far more likely a changed layout than 5 deleted accounts
+            logger.warning("Found no summoners in multi-search URL=`%s`", url)
+            active.update(map(league_utils.normalize_summoner_name, requested))
+            continue
+        for name in map(league_utils.normalize_summoner_name, requested):
+            if name not in last_played:
+                # renamed, or shown differently than we know it > can't tell, check it
+                logger.debug("Summoner %s missing in multi-search URL=`%s`", name, url)
+                active.add(name)
+            elif last_played[name] is None or last_played[name] >= active_since:
+                active.add(name)
+    return active
@@ -0,0 +1,243 @@
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+from datetime import datetime
+import os
+import time
+import gzip
+import mmap
+import zlib
+import struct
+import logging
+import threading
+
+try:
+    # optional: zstd compresses HTML far better (and faster) than gzip
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# directory to archive fetched pages in; archiving is disabled if not set
+_ARCHIVE_DIR_ENV = "LOL_WATCHBOT_PAGE_ARCHIVE_DIR"
+# a new segment is started once the current one exceeds this size
+_DEF_SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+
+# raised when decompressing a corrupt record, for either codec
+_CORRUPT_RECORD_ERRORS = (zlib.error,) if zstandard is None else (zlib.error, zstandard.ZstdError)
+
+# segments without an index are scanned in chunks of this size
+_SCAN_CHUNK_BYTES = 64 * 1024
+
+# one index entry per record: offset (Q), length (I) and timestamp (d) of the record in the segment
+_INDEX_ENTRY = struct.Struct("<QId")
+
+
+class ArchivedPage(NamedTuple):
+    url: str
+    status: int
+    fetched_at: datetime
+    content: bytes
+
+
+def _get_internal_logger() -> logging.Logger:
+    return logging.getLogger("lol_watchbot")
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zst":
+        return zstandard.ZstdCompressor().compress(data)
+    return gzip.compress(data)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zst":
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def _encode_record(url: str, status: int, content: bytes) -> bytes:
+    # header line, then the raw body
+    return f"{status} {url}\n".encode("utf-8") + content
+
+
+def _decode_record(record: bytes, fetched_at: float) -> ArchivedPage:
+    header, content = record.split(b"\n", 1)
+    status, url = header.decode("utf-8").split(" ", 1)
+    return ArchivedPage(
+        url=url,
+        status=int(status),
+        fetched_at=datetime.utcfromtimestamp(fetched_at),
+        content=content,
+    )
+
+
+class PageArchive:
+    """
+    Append-only archive of fetched pages.
+    Records are compressed one by one and appended to segment files (`segment-00001.zst` / `.gz`);
+    a fixed-size entry per record in the segment's index file (`segment-00001.idx`)
+    allows random access through a memory-mapped segment.
+    """
+
+    def __init__(self, directory: str, segment_max_bytes: int = _DEF_SEGMENT_MAX_BYTES):
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.codec = "zst" if zstandard is not None else "gz"
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        segments = self.list_segments()
+        self._segment_number = int(segments[-1].split("-")[1].split(".")[0]) if segments else 0
+        self._segment_path: Optional[str] = None
+
+    def list_segments(self) -> List[str]:
+        """
+        Returns:
+            List[str]: File names of all segments, oldest first
+        """
+        return sorted(
+            name
+            for name in os.listdir(self.directory)
+            if name.startswith("segment-") and name.endswith((".zst", ".gz"))
+        )
+
+    def _current_segment_path(self) -> str:
+        if self._segment_path is None or os.path.getsize(self._segment_path) >= (
+            self.segment_max_bytes
+        ):
+            # (only) start a new segment on startup and once the current one is full
+            self._segment_number += 1
+            self._segment_path = os.path.join(
+                self.directory, f"segment-{self._segment_number:05d}.{self.codec}"
+            )
+            open(self._segment_path, "ab").close()
+        return self._segment_path
+
+    def append(self, url: str, status: int, content: bytes) -> None:
+        """
+        Archives a fetched page.
+
+        Args:
+            url (str): The requested URL
+            status (int): The response's HTTP status code
+            content (bytes): The response's body
+        """
+        record = _compress(_encode_record(url, status, content), self.codec)
+        with self._lock:
+            segment_path = self._current_segment_path()
+            with open(segment_path, "ab") as segment:
+                offset = segment.tell()
+                segment.write(record)
+            with open(_index_path(segment_path), "ab") as index:
+                index.write(_INDEX_ENTRY.pack(offset, len(record), time.time()))
+
+    def iter_pages(self) -> Iterator[ArchivedPage]:
+        """
+        Yields all archived pages, oldest first.
+        """
+        for name in self.list_segments():
+            yield from SegmentReader(os.path.join(self.directory, name))
+
+
+def _index_path(segment_path: str) -> str:
+    return segment_path.rsplit(".", 1)[0] + ".idx"
+
+
+def _rebuild_index(segment_path: str, codec: str) -> List[Tuple[int, int, float]]:
+    """
+    Recovers the index entries of a segment whose index file is missing, by scanning its records
+    (each one is a complete gzip member / zstd frame). Records don't store when they were fetched,
+    the segment's modification time stands in for it.
+    A truncated last record (e.g. after a crash while appending) ends the scan.
+    """
+    fetched_at = os.path.getmtime(segment_path)
+    entries = []
+    with open(segment_path, "rb") as segment:
+        data = memoryview(segment.read())
+    offset = 0
+    while offset < len(data):
+        if codec == "zst":
+            decompressor = zstandard.ZstdDecompressor().decompressobj()
+        else:
+            decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+        # fed in chunks, so only the rest of the last chunk ends up in `unused_data`
+        position = offset
+        try:
+            while not decompressor.eof and position < len(data):
+                decompressor.decompress(data[position : position + _SCAN_CHUNK_BYTES])
+                position += _SCAN_CHUNK_BYTES
+        except _CORRUPT_RECORD_ERRORS as e:
+            _get_internal_logger().warning(
+                "Corrupt record in %s at %d: %s", segment_path, offset, e
+            )
+            break
+        if not decompressor.eof:
+            break
+        length = min(position, len(data)) - offset - len(decompressor.unused_data)
+        entries.append((offset, length, fetched_at))
+        offset += length
+    return entries
+
+
+class SegmentReader:
+    """
+    Random access to the records of one segment, through its index and a memory-mapped segment file.
+    """
+
+    def __init__(self, segment_path: str):
+        self.codec = segment_path.rsplit(".", 1)[1]
+        self._segment_path = segment_path
+        if self.codec == "zst" and zstandard is None:
+            # can't be read without the optional dependency
+            _get_internal_logger().warning("Skipped %s, zstandard is not installed", segment_path)
+            self._entries = []
+        elif not os.path.exists(_index_path(segment_path)):
+            _get_internal_logger().warning("Index of %s is missing, rebuilding it", segment_path)
+            self._entries = _rebuild_index(segment_path, self.codec)
+        else:
+            with open(_index_path(segment_path), "rb") as index:
+                self._entries = [entry for entry in _INDEX_ENTRY.iter_unpack(index.read())]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __getitem__(self, position: int) -> ArchivedPage:
+        return next(self._iter_range(position, position + 1))
+
+    def __iter__(self) -> Iterator[ArchivedPage]:
+        return self._iter_range(0, len(self))
+
+    def _iter_range(self, start: int, stop: int) -> Iterator[ArchivedPage]:
+        if not self._entries:
+            return
+        with open(self._segment_path, "rb") as segment:
+            with mmap.mmap(segment.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for offset, length, fetched_at in self._entries[start:stop]:
+                    record = _decompress(mapped[offset : offset + length], self.codec)
+                    yield _decode_record(record, fetched_at)
+
+
+_page_archive: Optional[PageArchive] = None
+
+
+def get_page_archive() -> Optional[PageArchive]:
+    """
+    Returns:
+        Optional[PageArchive]: The (process-wide) archive; None, if archiving is disabled.
+    """
+    global _page_archive
+    directory = os.environ.get(_ARCHIVE_DIR_ENV)
+    if _page_archive is None and directory:
+        _page_archive = PageArchive(directory=directory)
+    return _page_archive
+
+
+def maybe_archive(url: str, status: int, content: bytes) -> None:
+    """
+    Archives a fetched page, if archiving is enabled. Never raises.
+    """
+    archive = get_page_archive()
+    if archive is None:
+        return
+    try:
+        archive.append(url=url, status=status, content=content)
+    except OSError as e:
+        # archiving is best-effort, it must never break a sweep
+        _get_internal_logger().error("Could not archive page %s: %s", url, e)
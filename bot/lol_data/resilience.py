@@ -0,0 +1,341 @@
+from bot.common_utils.exceptions import OpGGUnavailableError
+from bot.lol_data import page_archive
+
+from typing import Callable, Dict, Optional, Mapping, TypeVar
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+import os
+import time
+import random
+import logging
+import threading
+import requests
+from requests.exceptions import (
+    ChunkedEncodingError,
+    ConnectionError,
+    ContentDecodingError,
+    Timeout,
+)
+
+# consecutive failures until a host's circuit opens
+_DEF_FAILURE_THRESHOLD = int(os.environ.get("LOL_WATCHBOT_BREAKER_FAILURE_THRESHOLD", 5))
+# seconds an opened circuit stays open before letting a probe request through
+_DEF_RESET_TIMEOUT_SECONDS = float(os.environ.get("LOL_WATCHBOT_BREAKER_RESET_SECONDS", 120.0))
+# attempts per request (1 original + retries)
+_DEF_MAX_ATTEMPTS = 3
+# base and cap of the exponential backoff; the requests are blocking, so keep this short
+_DEF_BACKOFF_BASE_SECONDS = 0.5
+_DEF_BACKOFF_CAP_SECONDS = 4.0
+# share of original requests that may additionally be retried (+ a small reserve)
+_DEF_RETRY_BUDGET_RATIO = 0.2
+_DEF_RETRY_BUDGET_RESERVE = 5.0
+_DEF_HTTP_TIMEOUT_SECONDS = 10.0
+
+# status codes signaling a (temporary) problem on the remote end
+_RETRYABLE_STATUS_CODES = frozenset((429, 500, 502, 503, 504))
+# errors of a failed request, or of a body breaking off while being read (e.g. a dropped connection)
+_TRANSIENT_ERRORS = (ConnectionError, Timeout, ChunkedEncodingError, ContentDecodingError)
+
+T = TypeVar("T")
+
+
+def _get_internal_logger() -> logging.Logger:
+    return logging.getLogger("lol_watchbot")
+
+
+class CircuitBreaker:
+    """
+    Tracks the health of a single remote host.
+    After `failure_threshold` consecutive failures the circuit "opens" and requests are refused
+    without touching the network; after `reset_timeout` seconds one probe request is let through
+    ("half-open"), which either closes the circuit again or re-opens it.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+    def __init__(
+        self,
+        failure_threshold: int = _DEF_FAILURE_THRESHOLD,
+        reset_timeout: float = _DEF_RESET_TIMEOUT_SECONDS,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self._opened_until = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self._opened_until == 0.0:
+            return self.CLOSED
+        if time.monotonic() < self._opened_until:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def allow_request(self) -> bool:
+        """
+        Returns:
+            bool: True, if a request to this host may be sent right now; False, if not.
+        """
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                # let exactly one probe through
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.consecutive_failures = 0
+            self._opened_until = 0.0
+            self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """
+        Frees the half-open probe of a request that ended without telling anything about the host's health
+        (e.g. an invalid URL), so the next request probes instead.
+        """
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self, open_for: Optional[float] = None) -> None:
+        """
+        Registers a failed request.
+
+        Args:
+            open_for (Optional[float], optional): Open the circuit for at least this many seconds right away (e.g. a `Retry-After`). Defaults to None.
+        """
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+            if open_for is not None or self.consecutive_failures >= self.failure_threshold:
+                timeout = max(open_for or 0.0, self.reset_timeout)
+                self._opened_until = time.monotonic() + timeout
+
+
+class RetryBudget:
+    """
+    Limits retries to a share of the original requests,
+    so an outage doesn't multiply the amount of requests we send.
+    """
+
+    def __init__(
+        self, ratio: float = _DEF_RETRY_BUDGET_RATIO, reserve: float = _DEF_RETRY_BUDGET_RESERVE
+    ):
+        self.ratio = ratio
+        self.reserve = reserve
+        self._balance = reserve
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        """Called once per original request."""
+        with self._lock:
+            # cap the balance, so a long healthy period doesn't allow a retry storm
+            self._balance = min(self._balance + self.ratio, self.reserve)
+
+    def try_withdraw(self) -> bool:
+        """
+        Returns:
+            bool: True, if a retry may be spent; False, if the budget is exhausted.
+        """
+        with self._lock:
+            if self._balance < 1.0:
+                return False
+            self._balance -= 1.0
+            return True
+
+
+# one circuit breaker per host (i.e. per op.gg subdomain / region)
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+_BREAKERS_LOCK = threading.Lock()
+_RETRY_BUDGET = RetryBudget()
+
+
+def get_circuit_breaker(url: str) -> CircuitBreaker:
+    """
+    Fetches (or creates) the circuit breaker of the host `url` points to.
+
+    Args:
+        url (str): Any URL
+
+    Returns:
+        CircuitBreaker: The breaker of the URL's host
+    """
+    host = urlparse(url).hostname or ""
+    with _BREAKERS_LOCK:
+        if host not in _BREAKERS:
+            _BREAKERS[host] = CircuitBreaker()
+        return _BREAKERS[host]
+
+
+def compute_backoff(
+    attempt: int,
+    base: float = _DEF_BACKOFF_BASE_SECONDS,
+    cap: float = _DEF_BACKOFF_CAP_SECONDS,
+) -> float:
+    """
+    Exponential backoff with "full jitter".
+
+    Args:
+        attempt (int): 0-based number of the attempt that just failed
+
+    Returns:
+        float: seconds to wait before the next attempt
+    """
+    return random.uniform(0.0, min(cap, base * (2**attempt)))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parses a `Retry-After` header, which is either a number of seconds or an HTTP date.
+
+    Returns:
+        Optional[float]: seconds to wait; None, if the header is missing or malformed.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def resilient_get(
+    url: str,
+    headers: Optional[Mapping[str, str]] = None,
+    max_attempts: int = _DEF_MAX_ATTEMPTS,
+    record_success: bool = True,
+    **kwargs,
+) -> requests.Response:
+    """
+    Sends a GET request through the circuit breaker of the URL's host.
+    Connection errors, timeouts and retryable status codes are retried with jittered exponential backoff,
+    as long as the retry budget allows it. Any other response (including 4xx) is returned as-is.
+
+    Args:
+        url (str): URL to request
+        headers (Optional[Mapping[str, str]], optional): HTTP headers. Defaults to None.
+        max_attempts (int, optional): Maximum amount of attempts. Defaults to 3.
+        record_success (bool, optional): False, if the caller records the success itself
+            (e.g. once the body was read, see `resilient_read`). Defaults to True.
+        kwargs: Passed on to `requests.get`. Streamed responses (`stream=True`) aren't archived here,
+            as that would read their whole body.
+
+    Raises:
+        OpGGUnavailableError: If the host's circuit is open, or all (allowed) attempts failed.
+
+    Returns:
+        requests.Response: The response of the first non-failing attempt
+    """
+    logger = _get_internal_logger()
+    breaker = get_circuit_breaker(url)
+    if not breaker.allow_request():
+        raise OpGGUnavailableError(
+            f"Skipped request, circuit for `{urlparse(url).hostname}` is open."
+        )
+    kwargs.setdefault("timeout", _DEF_HTTP_TIMEOUT_SECONDS)
+    _RETRY_BUDGET.deposit()
+
+    for attempt in range(max_attempts):
+        retry_after = None
+        try:
+            r = requests.get(url=url, headers=headers, **kwargs)
+        except _TRANSIENT_ERRORS as e:
+            logger.warning("Request to `%s` failed (attempt %d): %s", url, attempt + 1, e)
+        except Exception:
+            # e.g. an invalid URL or too many redirects > passed on, but mustn't keep a probe in flight forever
+            breaker.release_probe()
+            raise
+        else:
+            if not kwargs.get("stream"):
+                page_archive.maybe_archive(url=url, status=r.status_code, content=r.content)
+            if r.status_code not in _RETRYABLE_STATUS_CODES:
+                # the host answered properly (even if it's e.g. a 404) > it's healthy
+                if record_success:
+                    breaker.record_success()
+                return r
+            retry_after = parse_retry_after(r.headers.get("Retry-After"))
+            # hands a (streamed) connection back to the pool before retrying
+            r.close()
+            logger.warning(
+                "Request to `%s` returned %d (attempt %d)", url, r.status_code, attempt + 1
+            )
+
+        if retry_after is not None and retry_after > _DEF_BACKOFF_CAP_SECONDS:
+            # the host asked us to back off for longer than we're willing to block > open the circuit
+            breaker.record_failure(open_for=retry_after)
+            break
+        breaker.record_failure()
+
+        is_last_attempt = attempt + 1 >= max_attempts
+        if is_last_attempt or not breaker.allow_request() or not _RETRY_BUDGET.try_withdraw():
+            break
+        time.sleep(max(compute_backoff(attempt), retry_after or 0.0))
+
+    raise OpGGUnavailableError(f"Request to `{url}` failed, giving up.")
+
+
+def resilient_read(
+    url: str,
+    read: Callable[[requests.Response], T],
+    headers: Optional[Mapping[str, str]] = None,
+    max_attempts: int = _DEF_MAX_ATTEMPTS,
+    **kwargs,
+) -> T:
+    """
+    Sends a GET request through `resilient_get` and reads its response with `read`, e.g. a streamed body.
+    A body breaking off while it's read counts as a failure of the host, just like a failed request:
+    it's recorded on the circuit breaker, and retried with backoff as long as the retry budget allows it.
+
+    Args:
+        url (str): URL to request
+        read (Callable[[requests.Response], T]): Reads the response; other errors it raises are passed on
+        headers (Optional[Mapping[str, str]], optional): HTTP headers. Defaults to None.
+        max_attempts (int, optional): Maximum amount of attempts. Defaults to 3.
+        kwargs: Passed on to `resilient_get`
+
+    Raises:
+        OpGGUnavailableError: If the host's circuit is open, or all (allowed) attempts failed.
+
+    Returns:
+        T: What `read` returned
+    """
+    logger = _get_internal_logger()
+    breaker = get_circuit_breaker(url)
+    for attempt in range(max_attempts):
+        r = resilient_get(
+            url=url, headers=headers, max_attempts=max_attempts, record_success=False, **kwargs
+        )
+        try:
+            result = read(r)
+        except _TRANSIENT_ERRORS as e:
+            logger.warning("Reading `%s` failed (attempt %d): %s", url, attempt + 1, e)
+        except Exception:
+            # e.g. an error status raised by `read` > the host answered properly
+            breaker.record_success()
+            raise
+        else:
+            breaker.record_success()
+            return result
+        finally:
+            # releases the connection, even if the body wasn't read completely
+            r.close()
+
+        breaker.record_failure()
+        is_last_attempt = attempt + 1 >= max_attempts
+        if is_last_attempt or not breaker.allow_request() or not _RETRY_BUDGET.try_withdraw():
+            break
+        time.sleep(compute_backoff(attempt))
+
+    raise OpGGUnavailableError(f"Reading `{url}` failed, giving up.")
@@ -1,16 +1,31 @@
 import os
+import time
+import asyncio
 import logging
+from typing import List, Optional, Set
 import discord
 from discord.ext import commands
-from bot.database_interface import bot_declarative_base
-from bot.common_utils.embed_builder import make_error_message_embed
 from bot.common_utils.exceptions import OpGGParsingError, BadArgumentError
+from bot.common_utils import discord_utils
+from bot.common_utils.alert_queue import AlertQueue
+from bot.common_utils.loop_watchdog import LoopWatchdog
+from bot.common_utils.exceptions import ChannelNotFoundError
+
+# DB (SQLAlchemy), HTTP and numpy dependent modules are imported where they're used,
+# so importing the bot stays cheap (see `benchmark_startup.py`)
 
 COMMAND_PREFIX = "s10!"
 
 # explicitely declare intents to enable member privileges
 intents = discord.Intents.default()
 intents.members = True
+# presence-driven surveillance: tracked members starting a game of League are checked right away.
+# Presences are a privileged intent, it needs to be enabled for the bot in the developer portal, too.
+is_presence_mode = os.environ.get("LOL_WATCHBOT_PRESENCE_MODE", "").lower() == "true"
+intents.presences = is_presence_mode
+# ...but don't keep every member of every guild in memory: only tracked users are made resident
+# (see `WatchBot.cache_tracked_members`), everyone else is fetched on demand
+member_cache_flags = discord.MemberCacheFlags.none()
 
 
 class WatchBot(commands.Bot):
@@ -18,15 +33,34 @@ class WatchBot(commands.Bot):
     A bot that can track linked lol accounts and judge them for their champion choices.
     """
 
-    def __init__(self, **options):
+    def __init__(self, started_at: Optional[float] = None, **options):
         super().__init__(
             COMMAND_PREFIX,
             intents=intents,
+            member_cache_flags=member_cache_flags,
+            chunk_guilds_at_startup=False,
             case_insensitive=True,
             **options,
         )
 
         self.logger = logging.getLogger("lol_watchbot")
+        # `time.perf_counter()` at process start, to measure how long it takes to become ready
+        self.started_at = started_at or time.perf_counter()
+        self._is_warmed_up = False
+        from bot.database_interface.utils import invalidation_utils, journal_utils
+        from bot.lol_data.live_game_providers import get_live_game_provider
+
+        # where live-game data comes from (op.gg scraper or JSON API), see `live_game_providers`
+        self.live_game_provider = get_live_game_provider()
+        # new matches and summons, written to the DB in the background
+        self.write_journal = journal_utils.get_write_journal()
+        # outbound alerts, coalesced per announcement channel
+        self.alert_queue = AlertQueue()
+        # measures event-loop lag and finds the code blocking the loop
+        self.loop_watchdog = LoopWatchdog()
+        # changes to cached data, shared with other bot processes (see `MaintenanceCog.poll_invalidations`)
+        self.invalidation_bus = invalidation_utils.get_invalidation_bus()
+        self._subscribe_to_invalidations()
 
         # local import so that the cogs can import the bot (e.g. for logging)
         from bot.cogs.test_cog import TestCog
@@ -34,14 +68,29 @@ class WatchBot(commands.Bot):
         from bot.cogs.surveillance_cog import SurveillanceCog
         from bot.cogs.felony_cog import FelonyCog
         from bot.cogs.summons_cog import SummonsCog
+        from bot.cogs.maintenance_cog import MaintenanceCog
+        from bot.cogs.admin_cog import AdminCog
 
         self.add_cog(TestCog(bot=self))
         self.add_cog(LolAccCog(bot=self))
         self.add_cog(SurveillanceCog(bot=self))
         self.add_cog(FelonyCog(bot=self))
         self.add_cog(SummonsCog(bot=self))
+        self.add_cog(MaintenanceCog(bot=self))
+        self.add_cog(AdminCog(bot=self))
 
         self.add_listener(func=self.command_logging, name="on_command")
+        # keep the guild subscription index (tracked member > guilds) up-to-date
+        self.add_listener(func=self.cache_tracked_members, name="on_guild_join")
+        self.add_listener(func=self.unindex_guild, name="on_guild_remove")
+        self.add_listener(func=self.index_joined_member, name="on_member_join")
+        self.add_listener(func=self.unindex_removed_member, name="on_member_remove")
+        for event in (
+            "on_guild_channel_create",
+            "on_guild_channel_delete",
+            "on_guild_channel_update",
+        ):
+            self.add_listener(func=self.invalidate_channel_cache, name=event)
 
     def run(self, *args, **kwargs):
         super().run(os.environ.get("LOL_WATCHBOT_DISCORD_TOKEN"), *args, **kwargs)
@@ -49,6 +98,140 @@ class WatchBot(commands.Bot):
     async def on_ready(self):
         self.logger.info(f"{self.user.name} connected to Discord and online.")
         self.logger.info(f"Joined guilds: {self.guilds}")
+        if not self._is_warmed_up:
+            # on_ready is also called after reconnects > only warm up once
+            self.loop_watchdog.start()
+            await self.warm_up()
+            self._is_warmed_up = True
+            self.logger.info(f"Ready {time.perf_counter() - self.started_at:.2f}s after start.")
+
+    async def warm_up(self):
+        """
+        Preloads the caches needed by the first sweep concurrently,
+        so it doesn't have to wait on (sequential) DB round-trips.
+        """
+        from bot.database_interface.utils import cache_utils, felony_utils, lookup_utils
+
+        warm_up_start = time.perf_counter()
+        loop = asyncio.get_event_loop()
+        # DB caches are loaded in executor threads (blocking I/O)...
+        db_warm_ups = asyncio.gather(
+            loop.run_in_executor(None, cache_utils.accounts_cache.warm),
+            loop.run_in_executor(None, felony_utils.felony_index.warm),
+            loop.run_in_executor(None, cache_utils.guild_settings_cache.warm),
+            loop.run_in_executor(None, lookup_utils.warm_lookup_caches),
+        )
+        # ... while the channels are resolved from discord.py's cache in the meantime
+        for guild in self.guilds:
+            try:
+                discord_utils.get_announcement_channel(guild=guild)
+            except ChannelNotFoundError:
+                self.logger.warning(f"No announcement channel found in {guild.name}")
+        n_accounts, n_felonies, _, n_lookup_names = await db_warm_ups
+        # tracked members can only be loaded once the accounts are
+        n_members = sum(
+            await asyncio.gather(*[self.cache_tracked_members(guild) for guild in self.guilds])
+        )
+        self.logger.info(
+            f"Warmed up caches ({n_accounts} accounts, {n_felonies} felonies, {n_members} members, "
+            f"{n_lookup_names} champion/map/spell names, "
+            f"{len(self.guilds)} guilds) in {time.perf_counter() - warm_up_start:.2f}s."
+        )
+
+    def _subscribe_to_invalidations(self) -> None:
+        """
+        Drops the cache entries changed by other bot processes.
+        The callbacks run in an executor thread.
+        """
+        from bot.common_utils import stats_utils
+        from bot.database_interface.utils import cache_utils, felony_utils
+
+        def on_users_changed(key: Optional[str]) -> None:
+            cache_utils.accounts_cache.invalidate()
+            if key is not None:
+                stats_utils.invalidate_user_stats(discord_id=int(key))
+                # newly tracked members need to be cached and indexed (on the event loop)
+                asyncio.run_coroutine_threadsafe(self.track_member(discord_id=int(key)), self.loop)
+
+        def on_felonies_changed(key: Optional[str]) -> None:
+            if key is None:
+                felony_utils.felony_index.invalidate()
+            else:
+                felony_utils.felony_index.refresh(champion=key)
+
+        def on_matches_changed(key: Optional[str]) -> None:
+            if key is not None:
+                stats_utils.invalidate_user_stats(discord_id=int(key))
+
+        self.invalidation_bus.subscribe("users", on_users_changed)
+        self.invalidation_bus.subscribe("felonies", on_felonies_changed)
+        self.invalidation_bus.subscribe(
+            "guild_settings", lambda key: cache_utils.guild_settings_cache.invalidate()
+        )
+        self.invalidation_bus.subscribe("matches", on_matches_changed)
+
+    def get_tracked_discord_ids(self) -> Set[int]:
+        from bot.database_interface.utils import cache_utils
+
+        return {account["discord_id"] for account in cache_utils.accounts_cache.get()}
+
+    async def cache_tracked_members(
+        self, guild: discord.Guild, discord_ids: Optional[Set[int]] = None
+    ) -> int:
+        """
+        Makes the members owning a linked LoL account resident in a guild's member cache,
+        and adds the guild to their subscriptions.
+
+        Args:
+            guild (discord.Guild): A guild (discord "server")
+            discord_ids (Optional[Set[int]], optional): Discord IDs to cache. Defaults to all tracked ones.
+
+        Returns:
+            int: Amount of cached tracked members
+        """
+        discord_ids = discord_ids or self.get_tracked_discord_ids()
+        await discord_utils.cache_members(guild=guild, user_ids=discord_ids)
+        n_members = 0
+        for discord_id in discord_ids:
+            if guild.get_member(discord_id) is not None:
+                discord_utils.index_member(discord_id=discord_id, guild_id=guild.id)
+                n_members += 1
+        return n_members
+
+    async def track_member(self, discord_id: int) -> None:
+        """
+        Caches and indexes a newly tracked discord user in all guilds.
+        """
+        await asyncio.gather(
+            *[self.cache_tracked_members(guild, discord_ids={discord_id}) for guild in self.guilds]
+        )
+
+    async def unindex_guild(self, guild: discord.Guild):
+        discord_utils.unindex_guild(guild_id=guild.id)
+
+    async def index_joined_member(self, member: discord.Member):
+        if member.id in self.get_tracked_discord_ids():
+            await self.cache_tracked_members(member.guild, discord_ids={member.id})
+
+    async def unindex_removed_member(self, member: discord.Member):
+        discord_utils.unindex_member(discord_id=member.id, guild_id=member.guild.id)
+
+    def get_alert_guilds(self, discord_id: int) -> List[discord.Guild]:
+        """
+        Returns:
+            List[discord.Guild]: Guilds an alert about a tracked member should be sent to:
+            the ones the member is in, and which didn't opt out of alerts.
+        """
+        from bot.database_interface.utils import cache_utils
+
+        return [
+            guild
+            for guild in map(self.get_guild, discord_utils.get_member_guild_ids(discord_id))
+            if guild is not None and cache_utils.are_alerts_enabled(guild_id=guild.id)
+        ]
+
+    async def invalidate_channel_cache(self, channel: discord.abc.GuildChannel, *args):
+        discord_utils.invalidate_announcement_channel(guild_id=channel.guild.id)
 
     async def command_logging(self, ctx: discord.ext.commands.Context):
         self.logger.info(
@@ -59,6 +242,8 @@ class WatchBot(commands.Bot):
         """
         Custom error handler to relay inforation back to user and log.
         """
+        from bot.common_utils.embed_builder import make_error_message_embed
+
         if isinstance(error, commands.CommandNotFound):
             embed = make_error_message_embed(
                 error_message=f"Command `{ctx.invoked_with}` was not found!"
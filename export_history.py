@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+"""
+Exports the bot's history (matches, summons or match rollups, joined with their accounts)
+to a gzip-compressed JSONL or CSV file, streaming the rows in constant memory.
+
+Usage: ./export_history.py matches matches.jsonl.gz [--format csv] [--chunk-size 1000]
+Connects to the DB given by `LOL_WATCHBOT_DB_CONNECTION_STRING`.
+"""
+import gzip
+import logging
+import argparse
+from bot.database_interface.utils import export_utils
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("kind", choices=export_utils.get_export_kinds())
+    parser.add_argument("output", help="path of the .gz file to write")
+    parser.add_argument("--format", choices=("jsonl", "csv"), default="jsonl")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="rows fetched at a time")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    rows = export_utils.stream_rows(kind=args.kind, chunk_size=args.chunk_size)
+    with gzip.open(args.output, "wt", encoding="utf-8", newline="") as out:
+        if args.format == "jsonl":
+            n_rows = export_utils.write_jsonl(rows=rows, out=out)
+        else:
+            header = export_utils.get_export_header(kind=args.kind)
+            n_rows = export_utils.write_csv(rows=rows, out=out, header=header)
+
+    logging.info(f"Exported {n_rows} {args.kind} to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+"""
+Replays archived op.gg pages through the surveillance pipeline (live-game extraction, duplicate check, policing),
+as fast as possible. Doubles as a parser regression check and a throughput benchmark on real data.
+
+Usage: ./replay_archive.py ARCHIVE_DIR [--strict]
+Pages are archived by the bot when `LOL_WATCHBOT_PAGE_ARCHIVE_DIR` is set.
+Accounts and felonies are read from the configured DB; nothing is written to it and no alerts are sent.
+"""
+
+import re
+import sys
+import time
+import asyncio
+import logging
+import argparse
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional, Tuple
+from urllib.parse import unquote_plus
+from bot.cogs.surveillance_cog import SurveillanceCog
+from bot.common_utils import league_utils
+from bot.database_interface.tables.matches import Match
+from bot.database_interface.utils import cache_utils
+from bot.lol_data import opgg_handler
+from bot.lol_data.page_archive import ArchivedPage, PageArchive
+
+_SPECTATOR_URL_RE = re.compile(r"^https?://([^/.]+)\.op\.gg/summoner/spectator/userName=([^&]+)&?$")
+
+
+class ArchiveProvider:
+    """
+    Live-game provider serving the archived page currently replayed, instead of fetching it.
+    """
+
+    def __init__(self):
+        self.content = b""
+
+    def get_live_game_data(self, league_name: str, server_name: str) -> Optional[Dict[str, Any]]:
+        soup = opgg_handler._make_soup(self.content)
+        return opgg_handler._extract_data_from_live_game_soup(soup, league_name)
+
+
+class ReplayJournal:
+    """
+    Counts the journaled matches and summons, instead of writing them.
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def append(self, instance: Any, discord_id: int) -> None:
+        self.counts[type(instance).__name__] += 1
+
+
+class ReplayBot:
+    """
+    Stands in for the `WatchBot`: just the attributes the surveillance pipeline uses.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger("lol_watchbot")
+        self.live_game_provider = ArchiveProvider()
+        self.write_journal = ReplayJournal()
+        self.sent_alerts = 0
+
+    def get_alert_guilds(self, discord_id: int) -> Tuple[None]:
+        # one (stubbed) alert per felony
+        return (None,)
+
+
+class ReplayCog(SurveillanceCog):
+    """
+    The surveillance cog, without its background tasks and with a stubbed alert sender.
+    """
+
+    def __init__(self, bot: ReplayBot):
+        self.bot = bot
+        self._profile_requests = []
+        self._pending_presence_checks = {}
+
+    async def push_punish_message(self, guild: None, account: Dict[str, Any], match: Match) -> None:
+        self.bot.sent_alerts += 1
+
+
+def _get_account(
+    accounts: Dict[Tuple[str, str], Dict[str, Any]], server_name: str, league_name: str
+) -> Dict[str, Any]:
+    """
+    Returns the linked account of a summoner; one made up for unlinked summoners,
+    with an ID (per summoner) no user has.
+    """
+    key = (server_name, league_utils.normalize_summoner_name(league_name))
+    if key not in accounts:
+        accounts[key] = {
+            "id": -len(accounts) - 1,
+            "discord_id": 0,
+            "league_name": league_name,
+            "server_name": server_name,
+        }
+    return accounts[key]
+
+
+async def replay(pages: Iterable[ArchivedPage], cog: ReplayCog) -> Counter:
+    """
+    Replays pages through the cog's account check, like a sweep finding them live.
+
+    Returns:
+        Counter: The outcomes of the checks (as in a sweep's summary) and skipped pages
+    """
+    accounts = {
+        (
+            account["server_name"],
+            league_utils.normalize_summoner_name(account["league_name"]),
+        ): account
+        for account in cache_utils.accounts_cache.get()
+    }
+    outcomes = Counter()
+    for page in pages:
+        url_match = _SPECTATOR_URL_RE.match(page.url)
+        if url_match is None or page.status != 200:
+            outcomes["skipped"] += 1
+            continue
+        server_name, league_name = url_match.group(1), unquote_plus(url_match.group(2))
+        cog.bot.live_game_provider.content = page.content
+        account = _get_account(accounts, server_name=server_name, league_name=league_name)
+        outcomes[await cog._check_account(account=account)] += 1
+    return outcomes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("archive_dir")
+    parser.add_argument(
+        "--strict", action="store_true", help="exit with an error if any page failed to parse"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    # the extractors log every found game, which would dominate the measurement
+    logging.getLogger("lol_watchbot").setLevel(logging.WARNING)
+
+    bot = ReplayBot()
+    cog = ReplayCog(bot=bot)
+    n_bytes = 0
+
+    def iter_pages():
+        nonlocal n_bytes
+        for page in PageArchive(directory=args.archive_dir).iter_pages():
+            n_bytes += len(page.content)
+            yield page
+
+    started_at = time.perf_counter()
+    outcomes = asyncio.get_event_loop().run_until_complete(replay(iter_pages(), cog=cog))
+    elapsed = time.perf_counter() - started_at
+
+    n_pages = sum(outcomes.values())
+    print(f"Replayed {n_pages} pages ({n_bytes / 1e6:.1f}MB) in {elapsed:.2f}s")
+    if elapsed > 0:
+        print(f"Throughput: {n_pages / elapsed:.1f} pages/s, {n_bytes / 1e6 / elapsed:.1f}MB/s")
+    for outcome, count in sorted(outcomes.items()):
+        print(f"  {outcome:<12} {count}")
+    print(f"Journaled: {dict(bot.write_journal.counts)}, alerts: {bot.sent_alerts}")
+
+    if args.strict and outcomes["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,24 @@
 #!/usr/bin/env python
+import time
+
+# measure the startup time including all imports
+started_at = time.perf_counter()
+
 import logging
 from bot import watchbot
+from bot.common_utils.logging_utils import setup_queued_logging
 
 root = logging.getLogger()
 root.setLevel(logging.INFO)
 # need to "kick off" root logger for some reason
 logging.info("Starting root logger")
+logging.info("Imported the bot in %.2fs", time.perf_counter() - started_at)
+# the bot's own logger writes from a background thread, off the event loop
+log_listener = setup_queued_logging()
 
-watchbot = watchbot.WatchBot()
-watchbot.run()
+watchbot = watchbot.WatchBot(started_at=started_at)
+try:
+    watchbot.run()
+finally:
+    # flush the records still queued
+    log_listener.stop()
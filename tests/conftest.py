@@ -0,0 +1,7 @@
+import os
+import tempfile
+
+# tests run against a throwaway SQLite DB; set before the bot's session is first created
+os.environ["LOL_WATCHBOT_DB_CONNECTION_STRING"] = "sqlite:///" + os.path.join(
+    tempfile.mkdtemp(prefix="lol_watchbot_tests_"), "watchbot.db"
+)
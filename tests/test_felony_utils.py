@@ -0,0 +1,91 @@
+import os
+import sys
+import subprocess
+import pytest
+from bot.database_interface.session.session_handler import session_scope
+from bot.database_interface.tables.felonies import Felony
+from bot.database_interface.tables.felony_exemptions import FelonyExemption
+from bot.database_interface.utils import felony_utils
+from bot.database_interface.utils.felony_utils import FelonyIndex, normalize_spells
+
+_EXEMPT_DISCORD_ID = 42
+
+
+@pytest.fixture
+def felony_ids():
+    with session_scope() as session:
+        # any Yuumi; more on ARAM; even more with exhaust and ignite (someone is exempt from that one)
+        felonies = {
+            "any": Felony(champion="yuumi", points=1),
+            "map": Felony(champion="yuumi", points=2, map="Howling Abyss"),
+            "spells": Felony(
+                champion="yuumi", points=5, spells=normalize_spells(["Ignite", "Exhaust"])
+            ),
+            "inactive": Felony(champion="teemo", points=9, is_active=False),
+        }
+        session.add_all(felonies.values())
+        session.flush()
+        session.add(FelonyExemption(felony_id=felonies["spells"].id, discord_id=_EXEMPT_DISCORD_ID))
+        ids = {name: felony.id for name, felony in felonies.items()}
+    yield ids
+    with session_scope() as session:
+        session.query(FelonyExemption).delete()
+        session.query(Felony).delete()
+    felony_utils.felony_index.invalidate()
+
+
+def test_normalize_spells():
+    assert normalize_spells(["Ignite ", "flash", "", "IGNITE"]) == "flash+ignite"
+    assert normalize_spells([]) is None
+
+
+@pytest.mark.parametrize(
+    "map_name, spells, discord_id, expected",
+    [
+        ("Summoner's Rift", ["Flash", "Heal"], 1, "any"),
+        ("Howling Abyss", ["Flash", "Heal"], 1, "map"),
+        # spells are matched case-insensitively, and the most specific felony wins
+        ("Howling Abyss", ["exhaust", "IGNITE"], 1, "spells"),
+        # the exempt user only commits the less specific felonies
+        ("Howling Abyss", ["Exhaust", "Ignite"], _EXEMPT_DISCORD_ID, "map"),
+        (None, ["Exhaust", "Ignite"], _EXEMPT_DISCORD_ID, "any"),
+    ],
+)
+def test_evaluate(felony_ids, map_name, spells, discord_id, expected):
+    index = FelonyIndex()
+
+    felony = index.evaluate(
+        champion="yuumi", map_name=map_name, spells=spells, discord_id=discord_id
+    )
+
+    assert felony["id"] == felony_ids[expected]
+
+
+def test_no_felony(felony_ids):
+    index = FelonyIndex()
+
+    assert index.evaluate(champion="ahri", map_name=None, spells=[], discord_id=1) is None
+    # inactive felonies aren't compiled
+    assert index.evaluate(champion="teemo", map_name=None, spells=[], discord_id=1) is None
+    assert index.warm() == 3
+
+
+def test_refresh(felony_ids):
+    index = FelonyIndex()
+    index.warm()
+    with session_scope() as session:
+        session.query(Felony).filter_by(champion="yuumi").update({"is_active": False})
+
+    # compiled rules are served until the champion is refreshed
+    assert index.evaluate(champion="yuumi", map_name=None, spells=[], discord_id=1) is not None
+    index.refresh(champion="yuumi")
+    assert index.evaluate(champion="yuumi", map_name=None, spells=[], discord_id=1) is None
+
+
+def test_mappers_configure_wherever_felony_is_loaded():
+    # a fresh interpreter, as this one has all models registered already
+    subprocess.run(
+        [sys.executable, "-c", "from bot.database_interface.utils import export_utils"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        check=True,
+    )
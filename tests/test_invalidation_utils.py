@@ -0,0 +1,101 @@
+import time
+import pytest
+from bot.database_interface.session.session_handler import session_scope
+from bot.database_interface.tables.cache_invalidations import CacheInvalidation
+from bot.database_interface.utils.invalidation_utils import DbPollingBus, LocalSocketBus
+
+
+@pytest.fixture
+def db_buses():
+    buses = DbPollingBus(), DbPollingBus()
+    # the first poll only marks where a bus starts listening
+    for bus in buses:
+        assert bus.poll() == 0
+    yield buses
+    with session_scope() as session:
+        session.query(CacheInvalidation).delete()
+
+
+@pytest.fixture
+def socket_buses():
+    first, second = LocalSocketBus(port=0, peers=[]), LocalSocketBus(port=0, peers=[])
+    # both send to everyone, including themselves
+    first.peers = second.peers = [first.address, second.address]
+    yield first, second
+    for bus in (first, second):
+        bus._socket.close()
+
+
+def _subscribe(bus, table):
+    received = []
+    bus.subscribe(table, received.append)
+    return received
+
+
+def _poll_until(bus, received, n, timeout=2.0):
+    # datagrams arrive asynchronously
+    deadline = time.monotonic() + timeout
+    while len(received) < n and time.monotonic() < deadline:
+        bus.poll()
+        time.sleep(0.01)
+
+
+@pytest.mark.parametrize("bus_fixture", ["db_buses", "socket_buses"])
+def test_events_reach_the_other_process(request, bus_fixture):
+    publisher, subscriber = request.getfixturevalue(bus_fixture)
+    own = _subscribe(publisher, "felonies")
+    received = _subscribe(subscriber, "felonies")
+    other = _subscribe(subscriber, "users")
+
+    publisher.publish("felonies", key="yuumi")
+    publisher.publish("felonies")
+    _poll_until(subscriber, received, n=2)
+
+    assert received == ["yuumi", None]
+    assert other == []
+    # a bus skips its own events (the publisher invalidated its caches already)
+    time.sleep(0.05)
+    publisher.poll()
+    assert own == []
+    # and every event is delivered once
+    assert subscriber.poll() == 0
+
+
+def test_late_committed_row_is_delivered(db_buses):
+    publisher, subscriber = db_buses
+    received = _subscribe(subscriber, "felonies")
+    for key in ("a", "b", "c"):
+        publisher.publish("felonies", key=key)
+    with session_scope() as session:
+        late = session.query(CacheInvalidation).filter_by(key="b").one()
+        late_id, late_origin = late.id, late.origin
+        session.delete(late)
+
+    assert subscriber.poll() == 2
+    # the insert that got the lower ID only commits now
+    with session_scope() as session:
+        session.add(
+            CacheInvalidation(id=late_id, table_name="felonies", key="b", origin=late_origin)
+        )
+
+    assert subscriber.poll() == 1
+    assert received == ["a", "c", "b"]
+    assert subscriber.poll() == 0
+
+
+@pytest.mark.parametrize("bus_fixture", ["db_buses", "socket_buses"])
+def test_failing_subscriber_is_isolated(request, bus_fixture):
+    publisher, subscriber = request.getfixturevalue(bus_fixture)
+
+    def fail(key):
+        raise RuntimeError(f"could not drop {key}")
+
+    subscriber.subscribe("felonies", fail)
+    received = _subscribe(subscriber, "felonies")
+
+    publisher.publish("felonies", key="yuumi")
+    publisher.publish("felonies", key="teemo")
+    _poll_until(subscriber, received, n=2)
+
+    # the other subscriber (and the later event) still ran
+    assert received == ["yuumi", "teemo"]
@@ -0,0 +1,101 @@
+import os
+import json
+import pytest
+import sqlalchemy.exc
+from bot.database_interface.utils import journal_utils
+from bot.database_interface.utils.journal_utils import WriteJournal
+
+_RECORDS = [{"kind": "match", "row": {"journal_key": key}} for key in ("good", "bad")]
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = WriteJournal(directory=str(tmp_path))
+    with open(journal._make_sealed_path(), "w", encoding="utf-8") as f:
+        for record in _RECORDS:
+            f.write(json.dumps(record) + "\n")
+    return journal
+
+
+def _sealed_names(journal):
+    return [n for n in os.listdir(journal.directory) if n.endswith(journal_utils._SEALED_SUFFIX)]
+
+
+def _read_poison(journal):
+    path = os.path.join(journal.directory, journal_utils._POISON_FILE_NAME)
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line)["record"] for line in f]
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        sqlalchemy.exc.OperationalError("INSERT", {}, Exception("database is locked")),
+        sqlalchemy.exc.TimeoutError("QueuePool limit reached"),
+        sqlalchemy.exc.DisconnectionError("connection lost"),
+        sqlalchemy.exc.DBAPIError(
+            "INSERT", {}, Exception("server closed the connection"), connection_invalidated=True
+        ),
+    ],
+)
+def test_transient_errors_keep_the_file(journal, monkeypatch, error):
+    def write_records(records):
+        raise error
+
+    monkeypatch.setattr(journal_utils, "write_records", write_records)
+
+    with pytest.raises(type(error)):
+        journal.flush()
+    # retried by the next flush, nothing quarantined
+    assert len(_sealed_names(journal)) == 1
+    assert _read_poison(journal) == []
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        sqlalchemy.exc.IntegrityError("INSERT", {}, Exception("NOT NULL constraint failed")),
+        sqlalchemy.exc.DataError("INSERT", {}, Exception("value too long")),
+        KeyError("kind"),
+    ],
+)
+def test_bad_records_are_quarantined(journal, monkeypatch, error):
+    written = []
+
+    def write_records(records):
+        if any(record["row"]["journal_key"] == "bad" for record in records):
+            raise error
+        written.extend(records)
+        return len(records)
+
+    monkeypatch.setattr(journal_utils, "write_records", write_records)
+
+    assert journal.flush() == 1
+    assert written == _RECORDS[:1]
+    assert _read_poison(journal) == _RECORDS[1:]
+    assert _sealed_names(journal) == []
+
+
+def _active_names(directory):
+    return [n for n in os.listdir(directory) if n.endswith(journal_utils._ACTIVE_SUFFIX)]
+
+
+def test_processes_keep_their_active_files(tmp_path):
+    first = WriteJournal(directory=str(tmp_path))
+    first._file.write(json.dumps(_RECORDS[0]) + "\n")
+
+    # another process starting up leaves the running one's active file alone
+    second = WriteJournal(directory=str(tmp_path))
+    assert len(_active_names(tmp_path)) == 2
+    assert os.path.exists(first._active_path)
+
+    # once the first one is gone (without a flush), its records are sealed for a replay
+    first._file.close()
+    WriteJournal(directory=str(tmp_path))
+    assert not os.path.exists(first._active_path)
+    assert len(_active_names(tmp_path)) == 2
+    assert os.path.exists(second._active_path)
+    with open(os.path.join(tmp_path, _sealed_names(second)[0]), encoding="utf-8") as f:
+        assert [json.loads(line) for line in f] == _RECORDS[:1]
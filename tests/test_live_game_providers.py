@@ -0,0 +1,135 @@
+import json
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+import pytest
+from bot.common_utils import league_utils
+from bot.lol_data.live_game_providers import SpectatorApiProvider
+
+# summoner name > encrypted summoner id, as known to the stub API
+_SUMMONERS = {"Foo Bar": "enc-foo", "idle": "enc-idle", "early": "enc-early"}
+# encrypted summoner id > their live game; everyone else is not in game
+_ACTIVE_GAMES = {
+    "enc-foo": {
+        "gameId": 4912345678,
+        "mapId": 11,
+        "gameStartTime": 1600000000000,
+        "participants": [
+            {
+                "summonerId": "enc-other",
+                "summonerName": "Teammate",
+                "championId": 5,
+                "spell1Id": 4,
+                "spell2Id": 11,
+            },
+            {
+                "summonerId": "enc-foo",
+                "summonerName": "Foo Bar",
+                "championId": 350,
+                "spell1Id": 3,
+                "spell2Id": 14,
+            },
+        ],
+    },
+    # on a champion released after the bundled catalog
+    "enc-early": {
+        "gameId": 4912345679,
+        "mapId": 12,
+        "gameStartTime": 0,
+        "participants": [
+            {
+                "summonerId": "enc-early",
+                "summonerName": "early",
+                "championId": 999,
+                "spell1Id": 4,
+                "spell2Id": 32,
+            },
+        ],
+    },
+}
+
+
+class _StubApiHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requests.append((self.path, self.headers.get("X-Riot-Token")))
+        body = None
+        if self.path.startswith("/lol/summoner/v4/summoners/by-name/"):
+            name = unquote(self.path.rsplit("/", 1)[1])
+            if name in _SUMMONERS:
+                body = {"id": _SUMMONERS[name], "name": name}
+        elif self.path.startswith("/lol/spectator/v4/active-games/by-summoner/"):
+            body = _ACTIVE_GAMES.get(self.path.rsplit("/", 1)[1])
+
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        content = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def stub_api():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubApiHandler)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def provider(stub_api):
+    stub_api.requests.clear()
+    host, port = stub_api.server_address
+    return SpectatorApiProvider(base_url=f"http://{host}:{port}", api_key="test-key")
+
+
+def test_live_game(provider, stub_api):
+    game_data = provider.get_live_game_data(league_name="Foo Bar", server_name="euw")
+
+    assert game_data == {
+        "game_mode": "Summoner's Rift",
+        "spells": ["Exhaust", "Ignite"],
+        "champion": "yuumi",
+        "game_id": 4912345678,
+        "started_at": datetime(2020, 9, 13, 12, 26, 40),
+    }
+    assert all(api_key == "test-key" for _, api_key in stub_api.requests)
+
+
+def test_not_in_game(provider):
+    assert provider.get_live_game_data(league_name="idle", server_name="euw") is None
+    assert provider.does_account_exist(league_name="idle", server_name="euw")
+
+
+def test_unknown_summoner(provider):
+    assert provider.get_live_game_data(league_name="nobody", server_name="euw") is None
+    assert not provider.does_account_exist(league_name="nobody", server_name="euw")
+
+
+def test_summoner_id_is_looked_up_once(provider, stub_api):
+    for _ in range(3):
+        provider.get_live_game_data(league_name="Foo Bar", server_name="euw")
+
+    summoner_lookups = [path for path, _ in stub_api.requests if "/summoners/by-name/" in path]
+    assert len(summoner_lookups) == 1
+
+
+def test_unknown_champion_keeps_its_id(provider):
+    game_data = provider.get_live_game_data(league_name="early", server_name="euw")
+
+    assert game_data["champion"] == "999"
+    assert game_data["game_mode"] == "Howling Abyss"
+    assert game_data["started_at"] is None
+    # and so does its match (see `Match.from_game_data`)
+    assert league_utils._convert_champ_name(name=game_data["champion"]) == "999"
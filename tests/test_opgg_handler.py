@@ -0,0 +1,39 @@
+import pytest
+from bot.lol_data import opgg_handler
+
+_ROW = (
+    '<tr><td class="SummonerName Cell"><a href="{link}">Foo Bar</a></td>'
+    '<td class="SummonerSpell Cell"><div class="Spell" title="Exhaust"></div>'
+    '<div class="Spell" title="Ignite"></div></td>'
+    '<td class="ChampionImage Cell"><a title="Yuumi"></a></td></tr>'
+)
+# a widget linking another (e.g. a featured) game
+_OTHER_GAME = '<div class="Featured"><a href="/match/observer/id=1111111111">Watch</a></div>'
+
+
+def _page(row_link="/summoner/userName=Foo+Bar", script=""):
+    return (
+        '<html><body><small class="MapName">Howling Abyss</small>'
+        f"{_OTHER_GAME}<script>{script}</script>"
+        f'<table><tbody class="Body">{_ROW.format(link=row_link)}</tbody></table>'
+        "</body></html>"
+    ).encode("utf-8")
+
+
+@pytest.mark.parametrize(
+    "page, game_id",
+    [
+        (_page(script="var game = {gameId: 4912345678};"), 4912345678),
+        (_page(row_link="/match/observer/id=4912345678"), 4912345678),
+        # other games linked on the page aren't the summoner's
+        (_page(), None),
+    ],
+)
+def test_game_id_fallbacks(page, game_id):
+    soup = opgg_handler._make_soup(page)
+
+    data = opgg_handler._extract_data_from_live_game_soup(soup, league_name="foo bar")
+
+    assert data["game_id"] == game_id
+    assert data["champion"] == "yuumi"
+    assert data["spells"] == ["Exhaust", "Ignite"]
@@ -0,0 +1,71 @@
+import time
+import pytest
+import requests
+from bot.common_utils.exceptions import OpGGUnavailableError
+from bot.lol_data import resilience
+
+_URL = "http://flaky.example/summoner"
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    monkeypatch.setattr(resilience, "_BREAKERS", {})
+    monkeypatch.setattr(resilience, "_RETRY_BUDGET", resilience.RetryBudget())
+    monkeypatch.setattr(time, "sleep", lambda seconds: None)
+    breaker = resilience.get_circuit_breaker(_URL)
+    # opened a while ago > half-open
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    breaker._opened_until = time.monotonic() - 1.0
+    assert breaker.state == resilience.CircuitBreaker.HALF_OPEN
+    return breaker
+
+
+def _raise(error):
+    def get(**kwargs):
+        raise error
+
+    return get
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        requests.exceptions.TooManyRedirects("Exceeded 30 redirects."),
+        requests.exceptions.InvalidHeader("Invalid return character in header"),
+        requests.exceptions.InvalidURL("Failed to parse"),
+    ],
+)
+def test_non_transient_error_releases_the_probe(breaker, monkeypatch, error):
+    monkeypatch.setattr(requests, "get", _raise(error))
+
+    with pytest.raises(type(error)):
+        resilience.resilient_get(_URL)
+
+    # the next request probes again, instead of the circuit staying stuck
+    assert breaker.allow_request()
+
+
+def test_failed_probe_reopens_the_circuit(breaker, monkeypatch):
+    monkeypatch.setattr(requests, "get", _raise(requests.exceptions.ConnectionError("refused")))
+
+    with pytest.raises(OpGGUnavailableError):
+        resilience.resilient_get(_URL)
+
+    assert breaker.state == resilience.CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+
+def test_failing_read_resolves_the_probe(breaker, monkeypatch):
+    response = requests.Response()
+    response.status_code = 200
+    monkeypatch.setattr(requests, "get", lambda **kwargs: response)
+
+    def read(r):
+        raise ValueError("not the expected page")
+
+    with pytest.raises(ValueError):
+        resilience.resilient_read(_URL, read=read)
+
+    # the host answered properly
+    assert breaker.state == resilience.CircuitBreaker.CLOSED
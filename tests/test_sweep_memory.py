@@ -0,0 +1,91 @@
+"""
+Replays the fixture archive as repeated sweeps through the surveillance pipeline
+(extraction, duplicate check and policing against the DB, journal flush), and fails if retained memory keeps growing.
+
+The fixture archive (`fixtures/sweep_archive`) holds the spectator pages of:
+linked accounts in a game of a felony champion ("Foo Bar") and of another champion ("baz"),
+a linked account not in game ("qux"), an unlinked summoner in game ("stranger"), and a non-spectator page.
+"""
+
+import gc
+import os
+import asyncio
+import tracemalloc
+import pytest
+from bot.common_utils.memory_tracker import SweepMemoryTracker
+from bot.database_interface.session.session_handler import session_scope
+from bot.database_interface.tables.felonies import Felony
+from bot.database_interface.tables.matches import Match
+from bot.database_interface.tables.users import User, Server
+from bot.database_interface.utils import cache_utils, felony_utils
+from bot.database_interface.utils.journal_utils import WriteJournal
+from bot.lol_data.page_archive import PageArchive
+from replay_archive import ReplayBot, ReplayCog, replay
+
+_FIXTURE_ARCHIVE_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "sweep_archive")
+# sweeps measured after the first one (which warms up caches: champion catalog, regexes, mappers, ...)
+_N_SWEEPS = 5
+# allowed growth of retained memory over the measured sweeps
+_BUDGET_KIB = 256.0
+
+
+@pytest.fixture
+def accounts():
+    with session_scope() as session:
+        session.add_all(
+            [
+                User(discord_id=1, league_name=name, server_name=Server.euw)
+                for name in ("Foo Bar", "baz", "qux")
+            ]
+        )
+        session.add(Felony(champion="yuumi", points=3))
+    yield
+    with session_scope() as session:
+        for model in (Match, Felony, User):
+            session.query(model).delete()
+    for cache in (cache_utils.accounts_cache, felony_utils.felony_index):
+        cache.invalidate()
+
+
+def test_sweeps_retain_no_memory(accounts, tmp_path, monkeypatch):
+    # no recently seen games > every sweep's duplicate check goes through the DB
+    monkeypatch.setattr(cache_utils, "recent_games_cache", cache_utils.RecentGamesCache(max_size=0))
+    pages = list(PageArchive(directory=_FIXTURE_ARCHIVE_DIR).iter_pages())
+    bot = ReplayBot()
+    bot.write_journal = WriteJournal(directory=str(tmp_path / "journal"))
+    cog = ReplayCog(bot=bot)
+    loop = asyncio.new_event_loop()
+
+    def sweep():
+        # reloaded through the ORM every sweep, as after a change by another process
+        cache_utils.accounts_cache.invalidate()
+        felony_utils.felony_index.invalidate()
+        outcomes = loop.run_until_complete(replay(pages, cog=cog))
+        bot.write_journal.flush()
+        return outcomes
+
+    try:
+        first = sweep()
+        assert first == {"abuse": 1, "new match": 2, "not ingame": 1, "skipped": 1}
+        assert bot.sent_alerts == 1
+
+        tracker = SweepMemoryTracker(n_frames=1)
+        tracemalloc.start(1)
+        retained = []
+        for i in range(_N_SWEEPS):
+            with tracker.track(name=f"sweep {i + 1}"):
+                outcomes = sweep()
+            # parsed pages are reference cycles > only count what survives a collection
+            gc.collect()
+            retained.append(tracemalloc.get_traced_memory()[0])
+    finally:
+        tracemalloc.stop()
+        loop.close()
+
+    # the linked accounts' games were written by the first sweep's flush
+    assert outcomes["duplicate"] == 2
+    growth = (retained[-1] - retained[0]) / 1024
+    assert growth <= _BUDGET_KIB, (
+        f"Retained memory grew by {growth:.1f}KiB over {_N_SWEEPS - 1} sweeps, "
+        f"top deltas of the last one:\n" + "\n".join(map(str, tracker.last_deltas))
+    )